@@ -0,0 +1,73 @@
+"""Concurrent tool-call throughput: blocking (sync) tools vs async tools.
+
+Runs against the local mock DigiKey server (tests/mock_digikey.py) with a fixed
+per-request latency, and drives tools through an in-memory FastMCP client so
+the MCP server's event loop is exercised the same way a gateway would.
+
+- before: a synchronous tool doing the same request on the blocking client,
+  i.e. how every tool worked before they became async
+- after:  the real async `get_product_pricing` tool
+
+Usage:
+    python benchmarks/bench_async_tools.py [--calls 100] [--latency 0.05]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastmcp import Client, FastMCP  # noqa: E402
+
+import digikey_http  # noqa: E402
+import digikey_mcp_server  # noqa: E402
+from tests.mock_digikey import MockDigiKey, pointed_at  # noqa: E402
+
+
+def _blocking_server() -> FastMCP:
+    sync_mcp = FastMCP("bench-sync")
+
+    @sync_mcp.tool()
+    def get_product_pricing(product_number: str) -> dict:
+        token = digikey_mcp_server._token_manager.get_token()
+        url = f"{digikey_mcp_server.API_BASE}/products/v4/search/{product_number}/pricing"
+        return digikey_http.request("GET", url, headers={"Authorization": f"Bearer {token}"}).json()
+
+    return sync_mcp
+
+
+async def _drive(server, calls: int) -> float:
+    async with Client(server) as client:
+        # Warm up: token fetch and first connection
+        await client.call_tool("get_product_pricing", {"product_number": "WARMUP"})
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            client.call_tool("get_product_pricing", {"product_number": f"P{i}"})
+            for i in range(calls)
+        ))
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=100, help="concurrent tool calls")
+    parser.add_argument("--latency", type=float, default=0.05, help="mock upstream latency (s)")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)  # per-request INFO logs would dominate the timings
+
+    with MockDigiKey(latency=args.latency) as server, pointed_at(server):
+        before = asyncio.run(_drive(_blocking_server(), args.calls))
+        after = asyncio.run(_drive(digikey_mcp_server.mcp, args.calls))
+
+    print(f"{args.calls} concurrent calls, {args.latency * 1000:.0f} ms upstream latency")
+    print(f"{'mode':<10}{'total (s)':>12}{'calls/s':>12}")
+    for name, elapsed in (("before", before), ("after", after)):
+        print(f"{name:<10}{elapsed:>12.3f}{args.calls / elapsed:>12.1f}")
+    print(f"speedup: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
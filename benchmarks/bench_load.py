@@ -0,0 +1,210 @@
+"""Load test: tool latency, throughput and allocations against the mock DigiKey API.
+
+Each scenario drives one MCP tool through an in-memory FastMCP client at a
+fixed concurrency against the local mock server (tests/mock_digikey.py) with
+configurable upstream latency, error rate and payload size. Reports p50/p99
+latency, throughput, failed calls, and memory retained per call (traced with
+tracemalloc in a separate pass, excluding the mock server's own allocations).
+
+Results can be saved as a baseline and later runs compared against it; a
+comparison exits non-zero when a scenario regresses beyond --tolerance, so it
+can gate CI. Baselines are only comparable with the same mock settings.
+
+Usage:
+    python benchmarks/bench_load.py [--calls 200] [--concurrency 20] [--latency 0.005]
+        [--error-rate 0] [--payload-size 0] [--scenario product_details ...]
+        [--save-baseline benchmarks/baseline.json | --compare benchmarks/baseline.json]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastmcp import Client  # noqa: E402
+
+import digikey_mcp_server  # noqa: E402
+from tests.mock_digikey import MockDigiKey, pointed_at  # noqa: E402
+
+BASELINE_VERSION = 1
+
+# Settings that must match for two runs to be comparable
+CONFIG_KEYS = ("calls", "concurrency", "latency", "error_rate", "payload_size", "distinct")
+
+
+def _bom(i: int, lines: int = 50) -> list[dict]:
+    return [{"part_number": f"B{i}-{n}", "quantity": 10 * (n + 1)} for n in range(lines)]
+
+
+# name -> (tool, arguments for call i)
+SCENARIOS = {
+    "keyword_search": ("keyword_search", lambda i: {"keywords": f"RES{i}", "limit": 10}),
+    "product_details": ("product_details", lambda i: {"product_number": f"P{i}"}),
+    "get_product_pricing": ("get_product_pricing", lambda i: {"product_number": f"P{i}"}),
+    "get_order_status": ("get_order_status", lambda i: {"sales_order_id": 1000 + i}),
+    "create_mylist_link": ("create_mylist_link", lambda i: {
+        "list_name": f"List {i}", "parts": [{"part_number": f"P{n}", "quantity": 1} for n in range(20)],
+    }),
+    "resolve_bom": ("resolve_bom", lambda i: {"lines": _bom(i)}),
+}
+
+
+def percentile(samples: list[float], q: float) -> float:
+    """Nearest-rank percentile of `samples` (q in 0..1)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = math.ceil(round(q * len(ordered), 9))  # round: 0.99 * 100 is 99.00000000000001
+    return ordered[min(max(rank, 1), len(ordered)) - 1]
+
+
+async def _run_calls(tool: str, args, calls: int, concurrency: int, distinct: int) -> tuple[list[float], int, float]:
+    """Call `tool` `calls` times with at most `concurrency` in flight.
+
+    Returns (per-call latencies in seconds, failed calls, wall time).
+    """
+    latencies: list[float] = []
+    failed = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with Client(digikey_mcp_server.mcp) as client:
+        # Warm up: token fetch and first connection
+        await client.call_tool(tool, args(-1), raise_on_error=False)
+
+        async def one(i: int):
+            nonlocal failed
+            async with semaphore:
+                start = time.perf_counter()
+                result = await client.call_tool(tool, args(i % distinct), raise_on_error=False)
+                latencies.append(time.perf_counter() - start)
+                if result.is_error:
+                    failed += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(calls)))
+        return latencies, failed, time.perf_counter() - start
+
+
+def _mock(opts) -> MockDigiKey:
+    return MockDigiKey(
+        latency=opts.latency, error_rate=opts.error_rate, payload_size=opts.payload_size, seed=0
+    ).install_catalog()
+
+
+def run_scenario(name: str, opts) -> dict:
+    tool, args = SCENARIOS[name]
+    distinct = opts.distinct or opts.calls
+
+    with _mock(opts) as server, pointed_at(server):
+        latencies, failed, elapsed = asyncio.run(_run_calls(tool, args, opts.calls, opts.concurrency, distinct))
+        upstream = len(server.requests)
+
+    result = {
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "throughput": round(opts.calls / elapsed, 1),
+        "failed": failed,
+        "upstream_requests": upstream,
+    }
+
+    if opts.alloc_calls:
+        # Separate pass: tracing slows every allocation and would skew the timings
+        calls = min(opts.alloc_calls, opts.calls)
+        with _mock(opts) as server, pointed_at(server):
+            tracemalloc.start(25)
+            before = tracemalloc.take_snapshot()
+            asyncio.run(_run_calls(tool, args, calls, opts.concurrency, distinct))
+            after = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+        exclude = [
+            tracemalloc.Filter(False, "*mock_digikey.py", all_frames=True),
+            tracemalloc.Filter(False, "*socketserver.py", all_frames=True),
+            tracemalloc.Filter(False, tracemalloc.__file__),
+        ]
+        retained = sum(
+            s.size_diff for s in after.filter_traces(exclude).compare_to(before.filter_traces(exclude), "filename")
+        )
+        result["retained_kib_per_call"] = round(retained / 1024 / calls, 2)
+    return result
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Regressions of `results` against `baseline` beyond `tolerance` (fractional)."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for key in ("p50_ms", "p99_ms"):
+            if current[key] > previous[key] * (1 + tolerance):
+                regressions.append(f"{name}: {key} {previous[key]} -> {current[key]}")
+        if current["throughput"] < previous["throughput"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {previous['throughput']} -> {current['throughput']}")
+        if current["failed"] > previous["failed"]:
+            regressions.append(f"{name}: failed {previous['failed']} -> {current['failed']}")
+    return regressions
+
+
+def _print(results: dict, baseline: dict | None) -> None:
+    print(f"{'scenario':<22}{'p50 ms':>10}{'p99 ms':>10}{'calls/s':>10}{'failed':>8}{'upstream':>10}{'KiB/call':>10}")
+    for name, r in results.items():
+        print(
+            f"{name:<22}{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['throughput']:>10.1f}"
+            f"{r['failed']:>8}{r['upstream_requests']:>10}{r.get('retained_kib_per_call', float('nan')):>10.2f}"
+        )
+        if baseline and name in baseline:
+            b = baseline[name]
+            print(f"{'  baseline':<22}{b['p50_ms']:>10.2f}{b['p99_ms']:>10.2f}{b['throughput']:>10.1f}{b['failed']:>8}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200, help="tool calls per scenario")
+    parser.add_argument("--concurrency", type=int, default=20, help="tool calls in flight")
+    parser.add_argument("--latency", type=float, default=0.005, help="mock upstream latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of upstream requests answered with 503")
+    parser.add_argument("--payload-size", type=int, default=0, help="bytes of padding per upstream response")
+    parser.add_argument("--distinct", type=int, default=0, help="distinct arguments per scenario (default: one per call, no cache hits)")
+    parser.add_argument("--alloc-calls", type=int, default=50, help="calls in the allocation pass (0: skip)")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="run only these (repeatable)")
+    parser.add_argument("--save-baseline", metavar="PATH", help="write results as a baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a baseline; exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown vs the baseline")
+    opts = parser.parse_args(argv)
+    logging.disable(logging.WARNING)  # error-rate runs would otherwise log every retry
+
+    config = {key: getattr(opts, key) for key in CONFIG_KEYS}
+    baseline = None
+    if opts.compare:
+        with open(opts.compare) as f:
+            stored = json.load(f)
+        if stored.get("version") != BASELINE_VERSION or stored.get("config") != config:
+            print(f"Baseline {opts.compare} was recorded with {stored.get('config')}, not {config}", file=sys.stderr)
+            return 2
+        baseline = stored["results"]
+
+    results = {name: run_scenario(name, opts) for name in (opts.scenario or SCENARIOS)}
+    print(f"{opts.calls} calls per scenario, concurrency {opts.concurrency}, "
+          f"{opts.latency * 1000:.0f} ms upstream latency, error rate {opts.error_rate:.0%}")
+    _print(results, baseline)
+
+    if opts.save_baseline:
+        with open(opts.save_baseline, "w") as f:
+            json.dump({"version": BASELINE_VERSION, "config": config, "results": results}, f, indent=2)
+            f.write("\n")
+    if baseline is not None:
+        regressions = compare(results, baseline, opts.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""Cold start: module import time and time to the first `tools/list` response.
+
+Each run starts a fresh interpreter, so nothing is shared between runs:
+
+- import:     `python -c "import digikey_mcp_server"`
+- tools/list: `python digikey_mcp_server.py` over stdio, timed from process
+              start until the server answers initialize and then tools/list,
+              i.e. what a gateway spinning the server up on demand waits for
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--importtime]
+
+--importtime also prints the slowest imports (python -X importtime).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER = os.path.join(ROOT, "digikey_mcp_server.py")
+
+_INITIALIZE = {
+    "jsonrpc": "2.0", "id": 1, "method": "initialize",
+    "params": {"protocolVersion": "2025-03-26", "capabilities": {}, "clientInfo": {"name": "bench-startup", "version": "0"}},
+}
+_INITIALIZED = {"jsonrpc": "2.0", "method": "notifications/initialized"}
+_TOOLS_LIST = {"jsonrpc": "2.0", "id": 2, "method": "tools/list"}
+
+
+def time_import() -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import digikey_mcp_server"], cwd=ROOT, check=True, capture_output=True)
+    return time.perf_counter() - start
+
+
+def _send(proc, message: dict) -> None:
+    proc.stdin.write(json.dumps(message) + "\n")
+    proc.stdin.flush()
+
+
+def _read_response(proc, request_id: int) -> dict:
+    while True:
+        line = proc.stdout.readline()
+        if not line:
+            raise RuntimeError(f"server exited before answering request {request_id}")
+        message = json.loads(line)
+        if message.get("id") == request_id:
+            return message
+
+
+def time_first_tools_list() -> tuple[float, int]:
+    """Seconds from spawn to the tools/list response, and the number of tools listed."""
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, SERVER], cwd=ROOT, text=True,
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+    )
+    try:
+        _send(proc, _INITIALIZE)
+        _read_response(proc, 1)
+        _send(proc, _INITIALIZED)
+        _send(proc, _TOOLS_LIST)
+        tools = _read_response(proc, 2)["result"]["tools"]
+        return time.perf_counter() - start, len(tools)
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+def slowest_imports(limit: int = 15) -> list[tuple[int, str]]:
+    """(cumulative microseconds, module) for the slowest imports of digikey_mcp_server."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import digikey_mcp_server"],
+        cwd=ROOT, check=True, capture_output=True, text=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), module.rstrip()))
+    return sorted(rows, reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per measurement")
+    parser.add_argument("--importtime", action="store_true", help="print the slowest imports")
+    args = parser.parse_args()
+
+    imports = [time_import() for _ in range(args.runs)]
+    listed = [time_first_tools_list() for _ in range(args.runs)]
+    first_list = [elapsed for elapsed, _ in listed]
+
+    print(f"{args.runs} runs, {listed[0][1]} tools")
+    print(f"{'measurement':<14}{'median (ms)':>14}{'min (ms)':>12}{'max (ms)':>12}")
+    for name, samples in (("import", imports), ("tools/list", first_list)):
+        print(f"{name:<14}{statistics.median(samples) * 1000:>14.1f}{min(samples) * 1000:>12.1f}{max(samples) * 1000:>12.1f}")
+
+    if args.importtime:
+        print("\nslowest imports (cumulative ms)")
+        for cumulative, module in slowest_imports():
+            print(f"{cumulative / 1000:>10.1f}  {module}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class TokenManager:
+    """Expiry-aware OAuth2 access token cache.
+
+    - Tracks `expires_in` from the token response and refreshes in a
+      background timer `refresh_margin` seconds before the token expires
+      (at most half the token's lifetime before, and never sooner than
+      `min_refresh_delay` after the last fetch).
+    - Single-flight: concurrent callers share one in-flight token fetch.
+    - `refresh_if_current()` lets callers that got a 401 trigger exactly one
+      refresh, even when many requests fail with the same stale token.
+
+    Args:
+        fetch: Callable returning the token response dict
+            (`access_token`, optional `expires_in` in seconds)
+        refresh_margin: Seconds before expiry to refresh in the background
+        min_refresh_delay: Minimum seconds between background refreshes, so
+            very short-lived tokens cannot make the timer refetch in a loop
+        expiry_skew: Seconds before expiry after which the token is no longer
+            handed out and callers refresh inline
+        background: Schedule proactive background refreshes (default: True)
+        clock: Monotonic time source (injectable for tests)
+    """
+
+    DEFAULT_EXPIRES_IN = 1799  # DigiKey client_credentials tokens last ~30 minutes
+
+    def __init__(
+        self,
+        fetch: Callable[[], dict],
+        refresh_margin: float = 300.0,
+        min_refresh_delay: float = 1.0,
+        expiry_skew: float = 30.0,
+        background: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._fetch = fetch
+        self._refresh_margin = refresh_margin
+        self._min_refresh_delay = min_refresh_delay
+        self._expiry_skew = expiry_skew
+        self._background = background
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._token: str | None = None
+        self._expires_at = 0.0
+        self._timer: threading.Timer | None = None
+        self.refresh_count = 0
+
+    @property
+    def token(self) -> str | None:
+        """The currently cached token (may be expired), without fetching."""
+        return self._token
+
+    def _is_fresh(self) -> bool:
+        return self._token is not None and self._clock() < self._expires_at - self._expiry_skew
+
+    def get_token(self) -> str:
+        """Return a valid access token, fetching one if needed."""
+        if self._is_fresh():
+            return self._token
+        with self._lock:
+            # Another caller may have refreshed while we waited for the lock
+            if not self._is_fresh():
+                self._refresh_locked()
+            return self._token
+
+    def refresh_if_current(self, stale_token: str | None) -> str:
+        """Refresh after a 401, unless another caller already replaced `stale_token`."""
+        with self._lock:
+            if self._token is None or self._token == stale_token:
+                self._refresh_locked()
+            return self._token
+
+    async def aget_token(self) -> str:
+        """Async get_token(). A fetch runs in a worker thread so it never blocks the event loop."""
+        if self._is_fresh():
+            return self._token
+        return await asyncio.to_thread(self.get_token)
+
+    async def arefresh_if_current(self, stale_token: str | None) -> str:
+        """Async refresh_if_current()."""
+        return await asyncio.to_thread(self.refresh_if_current, stale_token)
+
+    def close(self) -> None:
+        """Cancel any scheduled background refresh."""
+        with self._lock:
+            self._cancel_timer()
+
+    def _refresh_locked(self) -> None:
+        info = self._fetch()
+        expires_in = float(info.get("expires_in") or self.DEFAULT_EXPIRES_IN)
+        self._token = info["access_token"]
+        self._expires_at = self._clock() + expires_in
+        self.refresh_count += 1
+        logger.info("Access token refreshed (expires in %.0fs)", expires_in)
+        margin = min(self._refresh_margin, expires_in / 2)
+        self._schedule(max(expires_in - margin, self._min_refresh_delay))
+
+    def _schedule(self, delay: float) -> None:
+        self._cancel_timer()
+        if not self._background:
+            return
+        self._timer = threading.Timer(delay, self._background_refresh)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _background_refresh(self) -> None:
+        try:
+            with self._lock:
+                self._refresh_locked()
+        except Exception as e:
+            # Keep serving the current token; callers refresh inline once it expires
+            logger.error("Background token refresh failed: %s", e)
+            with self._lock:
+                remaining = self._expires_at - self._clock() - self._expiry_skew
+                if remaining > 0:
+                    self._schedule(min(30.0, remaining))
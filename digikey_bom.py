@@ -0,0 +1,215 @@
+import csv
+import os
+import re
+from typing import Iterable, Iterator
+
+# BOM files (KiCad, Altium and generic CSV/TSV exports) read straight from
+# disk, so a 2,000-line BOM reaches the cart, MyList and pricing tools
+# without passing through the model as JSON.
+#
+# Rows are parsed by a generator (one row in memory at a time); duplicate
+# part numbers are merged as they stream by, so memory grows with the number
+# of distinct parts, not with the file.
+
+# BOM field -> accepted column headers, compared after normalization (lower
+# case, letters and digits only). Earlier aliases win when several match.
+_COMMON = {
+    "digikey_part_number": ["digikey", "digikeypn", "digikeypartnumber", "digikeyproductnumber", "digikeypart", "dkpn"],
+    "manufacturer_part_number": ["mpn", "manufacturerpartnumber", "mfrpn", "mfrpartnumber", "mfgpn", "manufacturerpn", "partnumber"],
+    "manufacturer": ["manufacturer", "mfr", "mfg", "manufacturername"],
+    "quantity": ["quantity", "qty", "count"],
+    "reference": ["reference", "references", "refs", "designator", "designators", "refdes"],
+    "customer_ref": ["customerref", "customerreference", "cref"],
+    "dnp": ["dnp", "donotpopulate", "donotplace", "exclude"],
+}
+FORMATS = {
+    "generic": _COMMON,
+    # kicad-cli / Eeschema BOM export; part numbers come from user fields
+    "kicad": {
+        **_COMMON,
+        "digikey_part_number": ["digikey", "digikeypn", "digikeypartnumber", "digikeypart", "dkpn", "digikeyproductnumber"],
+        "manufacturer_part_number": ["mpn", "manufacturerpartnumber", "mfrpn", "mfgpn", "partnumber"],
+        "quantity": ["qty", "quantity", "quantityperpcb"],
+        "reference": ["refs", "reference", "references"],
+    },
+    # Altium BOM report; supplier columns are numbered per supplier slot
+    "altium": {
+        **_COMMON,
+        "digikey_part_number": ["digikeypartnumber", "supplierpartnumber1", "digikey"],
+        "manufacturer_part_number": ["manufacturerpartnumber1", "manufacturerpartnumber", "mpn"],
+        "manufacturer": ["manufacturer1", "manufacturer"],
+        "reference": ["designator", "designators"],
+    },
+}
+
+_HEADER_SCAN_ROWS = 20  # exports may start with title / date lines before the header
+_FALSE = {"", "0", "no", "n", "false"}
+
+
+def _normalize(header: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", header.lower())
+
+
+def bom_path(path: str, base_dir: str | None = None) -> str:
+    """Resolve `path` (relative paths against base_dir); with base_dir, refuse files outside it."""
+    if not base_dir:
+        return os.path.abspath(os.path.expanduser(path))
+    base = os.path.realpath(base_dir)
+    resolved = os.path.realpath(os.path.join(base, os.path.expanduser(path)))
+    if os.path.commonpath([base, resolved]) != base:
+        raise ValueError(f"BOM file must be inside {base_dir}")
+    return resolved
+
+
+def map_columns(header: list[str], format: str = "auto", columns: dict[str, str] | None = None) -> dict[str, int]:
+    """BOM field -> column index for a header row.
+
+    Args:
+        header: Header row
+        format: kicad, altium, generic, or auto (all aliases)
+        columns: Explicit field -> header name overrides, e.g. {"quantity": "Qty per board"}
+    """
+    if format not in FORMATS and format != "auto":
+        raise ValueError(f"format must be one of {sorted(FORMATS) + ['auto']}")
+    positions = {}
+    for i, name in enumerate(header):
+        positions.setdefault(_normalize(name), i)
+    aliases = FORMATS.get(format, _COMMON)
+    mapping = {}
+    for field, names in aliases.items():
+        found = next((positions[n] for n in names if n in positions), None)
+        if found is not None:
+            mapping[field] = found
+    for field, name in (columns or {}).items():
+        if field not in _COMMON:
+            raise ValueError(f"Unknown BOM field {field!r}; use one of {sorted(_COMMON)}")
+        if _normalize(name) not in positions:
+            raise ValueError(f"Column {name!r} not found in BOM header {header}")
+        mapping[field] = positions[_normalize(name)]
+    return mapping
+
+
+def _has_part_column(mapping: dict[str, int]) -> bool:
+    return "digikey_part_number" in mapping or "manufacturer_part_number" in mapping
+
+
+def _expand_references(value: str) -> list[str]:
+    """"R1, R2 R5-R7" -> ["R1", "R2", "R5", "R6", "R7"]."""
+    refs = []
+    for token in re.split(r"[\s,;]+", value.strip()):
+        span = re.fullmatch(r"([A-Za-z_]+)(\d+)-\1?(\d+)", token)
+        if span and int(span[3]) >= int(span[2]) and int(span[3]) - int(span[2]) < 10_000:
+            refs += [f"{span[1]}{n}" for n in range(int(span[2]), int(span[3]) + 1)]
+        elif token:
+            refs.append(token)
+    return refs
+
+
+def _try_map(row: list[str], format: str, columns: dict[str, str] | None) -> dict[str, int] | None:
+    """map_columns for header candidates: a row lacking an explicitly named column is not the header."""
+    try:
+        return map_columns(row, format, columns)
+    except ValueError:
+        return None
+
+
+def read_rows(path: str, format: str = "auto", columns: dict[str, str] | None = None, stats: dict | None = None) -> Iterator[dict]:
+    """Yield BOM rows of a CSV/TSV file as {"part_number", "quantity", ...}, one at a time.
+
+    The delimiter is detected from the start of the file. The part number is
+    the DigiKey part number when the BOM has one, else the manufacturer part
+    number. Without a quantity column, the quantity is the number of
+    reference designators. DNP rows are skipped.
+
+    Args:
+        path: BOM file
+        format: kicad, altium, generic, or auto
+        columns: Explicit field -> header name overrides (see map_columns)
+        stats: Filled with the column mapping, rows read and skipped rows
+    """
+    if format not in FORMATS and format != "auto":
+        raise ValueError(f"format must be one of {sorted(FORMATS) + ['auto']}")
+    stats = stats if stats is not None else {}
+    stats.update(rows=0, skipped=0, skipped_rows=[])
+    with open(path, newline="", encoding="utf-8-sig", errors="replace") as f:
+        sample = f.read(64 * 1024)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t|")
+        except csv.Error:
+            dialect = csv.excel
+        reader = csv.reader(f, dialect)
+
+        mapping = None
+        for row in reader:
+            if reader.line_num > _HEADER_SCAN_ROWS:
+                break
+            candidate = _try_map(row, format, columns)
+            if candidate and _has_part_column(candidate) and ("quantity" in candidate or "reference" in candidate):
+                mapping = candidate
+                break
+        if mapping is None:
+            raise ValueError(
+                f"No header with a part number and a quantity or reference column in the first {_HEADER_SCAN_ROWS} rows of {path}"
+            )
+        stats["columns"] = {field: row[i] for field, i in mapping.items()}
+
+        def cell(row: list[str], field: str) -> str:
+            i = mapping.get(field)
+            return row[i].strip() if i is not None and i < len(row) else ""
+
+        for row in reader:
+            if not any(v.strip() for v in row):
+                continue
+            stats["rows"] += 1
+            if cell(row, "dnp").lower() not in _FALSE:
+                continue
+            part_number = cell(row, "digikey_part_number") or cell(row, "manufacturer_part_number")
+            refs = _expand_references(cell(row, "reference"))
+            quantity = cell(row, "quantity")
+            try:
+                quantity = int(float(quantity)) if quantity else len(refs)
+            except ValueError:
+                quantity = 0
+            if not part_number or quantity <= 0:
+                stats["skipped"] += 1
+                if len(stats["skipped_rows"]) < 20:
+                    stats["skipped_rows"].append(reader.line_num)
+                continue
+            line = {"part_number": part_number, "quantity": quantity}
+            for field in ("manufacturer_part_number", "manufacturer", "customer_ref"):
+                if cell(row, field):
+                    line[field] = cell(row, field)
+            if refs:
+                line["references"] = refs
+            yield line
+
+
+def merge_lines(rows: Iterable[dict], boards: int = 1) -> list[dict]:
+    """Merge rows with the same part number (case-insensitive), summing quantities.
+
+    Lines keep the order of first appearance; quantities are multiplied by
+    `boards`. References are joined into one "reference" string (as used by
+    MyList entries).
+    """
+    merged: dict[str, dict] = {}
+    for row in rows:
+        key = row["part_number"].upper()
+        line = merged.get(key)
+        if line is None:
+            line = merged[key] = {k: v for k, v in row.items() if k != "references"}
+            line["quantity"] = 0
+            line["_refs"] = []
+        line["quantity"] += row["quantity"]
+        line["_refs"] += row.get("references", [])
+        for field in ("manufacturer_part_number", "manufacturer", "customer_ref"):
+            if field in row and field not in line:
+                line[field] = row[field]
+    lines = []
+    for line in merged.values():
+        line["quantity"] *= boards
+        refs = line.pop("_refs")
+        if refs:
+            line["reference"] = ",".join(refs)
+        lines.append(line)
+    return lines
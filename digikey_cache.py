@@ -0,0 +1,256 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+# Per-endpoint TTLs in seconds, first match wins. Catalog data (manufacturers,
+# categories, media) barely changes; pricing and stock go stale quickly.
+# Endpoints without a rule (e.g. order status) are never cached.
+ENDPOINT_TTLS = [
+    (re.compile(r"/products/v4/search/manufacturers$"), 24 * 3600),
+    (re.compile(r"/products/v4/search/categories(/\d+)?$"), 24 * 3600),
+    (re.compile(r"/products/v4/search/[^/]+/media$"), 24 * 3600),
+    (re.compile(r"/products/v4/search/[^/]+/substitutions$"), 3600),
+    (re.compile(r"/products/v4/search/[^/]+/productdetails$"), 300),
+    (re.compile(r"/products/v4/search/keyword$"), 300),
+    (re.compile(r"/products/v4/search/[^/]+/pricing$"), 60),
+    (re.compile(r"/products/v4/search/[^/]+/digireelpricing$"), 60),
+]
+
+# Endpoints also persisted to the optional on-disk cache (shared across server
+# processes and restarts): large, slow-changing responses worth keeping warm.
+PERSISTENT_ENDPOINTS = [
+    re.compile(r"/products/v4/search/manufacturers$"),
+    re.compile(r"/products/v4/search/categories(/\d+)?$"),
+    re.compile(r"/products/v4/search/[^/]+/productdetails$"),
+]
+
+# Request headers that change the response and therefore belong in the key
+KEY_HEADERS = (
+    "X-DIGIKEY-Locale-Site",
+    "X-DIGIKEY-Locale-Language",
+    "X-DIGIKEY-Locale-Currency",
+    "X-DIGIKEY-Customer-Id",
+    "X-DIGIKEY-Account-Id",
+)
+
+
+def ttl_for(url: str) -> float | None:
+    """TTL for a DigiKey API URL, or None if the endpoint is not cacheable."""
+    path = urlsplit(url).path
+    for pattern, ttl in ENDPOINT_TTLS:
+        if pattern.search(path):
+            return ttl
+    return None
+
+
+def is_persistent(url: str) -> bool:
+    """True if responses for this URL belong in the on-disk cache."""
+    path = urlsplit(url).path
+    return any(pattern.search(path) for pattern in PERSISTENT_ENDPOINTS)
+
+
+def cache_key(method: str, url: str, headers: dict, data: dict | None = None) -> str:
+    """Cache key from endpoint, normalized query/body and locale/customer headers."""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query)))
+    body = json.dumps(data, sort_keys=True, separators=(",", ":")) if data else ""
+    scope = "|".join(str(headers.get(h, "")) for h in KEY_HEADERS)
+    return f"{method.upper()} {parts.netloc}{parts.path}?{query}|{body}|{scope}"
+
+
+class TTLCache:
+    """Size-bounded in-memory LRU cache with per-entry TTLs.
+
+    Args:
+        maxsize: Maximum number of entries before the least recently used is evicted
+        clock: Monotonic time source (injectable for tests)
+    """
+
+    def __init__(self, maxsize: int = 1024, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self._clock = clock
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Any | None:
+        """Return the cached value, or None if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (self._clock() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class SQLiteCache:
+    """On-disk TTL cache in a SQLite file, safe to share between processes.
+
+    Uses WAL journaling so readers in other processes are not blocked by a
+    writer, and a busy timeout so concurrent writers wait instead of failing.
+    Expired entries are compacted periodically; when the stored payload
+    exceeds `max_bytes`, the least recently used entries are evicted.
+
+    Args:
+        path: Database file path (created if missing)
+        max_bytes: Cap on total stored payload size
+        compact_every: Run compaction after this many writes
+        clock: Wall-clock time source; must agree across processes
+    """
+
+    _TOUCH_INTERVAL = 60.0  # seconds between access-time updates for one entry
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 256 * 1024 * 1024,
+        compact_every: int = 200,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._compact_every = compact_every
+        self._clock = clock
+        self._writes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._conn = sqlite3.connect(path, timeout=30.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+            " expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+        self.compact()
+
+    def lookup(self, key: str) -> tuple[Any, float] | None:
+        """Return (value, seconds until expiry), or None if missing or expired."""
+        now = self._clock()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at, accessed_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                self.misses += 1
+                return None
+            if now - row[2] > self._TOUCH_INTERVAL:
+                self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0]), row[1] - now
+
+    def get(self, key: str) -> Any | None:
+        found = self.lookup(key)
+        return found[0] if found else None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        payload = json.dumps(value, separators=(",", ":"))
+        now = self._clock()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), now + ttl, now),
+            )
+            self._writes += 1
+            due = self._writes % self._compact_every == 0
+        if due:
+            self.compact()
+
+    def compact(self) -> None:
+        """Drop expired entries, enforce the size cap and return free pages to the OS."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM entries WHERE expires_at <= ?", (self._clock(),))
+                total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+                if total > self.max_bytes:
+                    # Evict least recently used down to 90% of the cap
+                    excess = total - int(self.max_bytes * 0.9)
+                    rows = self._conn.execute(
+                        "SELECT key, size FROM entries ORDER BY accessed_at"
+                    ).fetchall()
+                    victims = []
+                    for key, size in rows:
+                        if excess <= 0:
+                            break
+                        victims.append((key,))
+                        excess -= size
+                    self._conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+                    self.evictions += len(victims)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("PRAGMA incremental_vacuum")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            size, nbytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "size": size,
+            "bytes": nbytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
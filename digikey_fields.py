@@ -0,0 +1,83 @@
+from typing import Any
+
+# Field projection for DigiKey responses. Fields are dotted paths
+# ("Product.Manufacturer.Name"); lists are traversed implicitly, so
+# "Products.QuantityAvailable" selects that field from every product.
+#
+# Projection walks only the selected paths and references the selected values
+# in place, so its cost depends on the number of fields asked for, not on the
+# size of the document (which may be shared with the response cache).
+
+# Per-product summary used by compact mode
+PRODUCT_SUMMARY = (
+    "ManufacturerProductNumber",
+    "Manufacturer.Name",
+    "Description.ProductDescription",
+    "QuantityAvailable",
+    "UnitPrice",
+    "ProductStatus.Status",
+    "ProductUrl",
+    "DatasheetUrl",
+    "ProductVariations.DigiKeyProductNumber",
+    "ProductVariations.PackageType.Name",
+)
+
+
+def parse_fields(fields: str | list[str] | tuple[str, ...]) -> dict:
+    """Build a path tree from comma-separated (or listed) dotted field paths."""
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    tree: dict = {}
+    for path in fields:
+        path = path.strip()
+        if not path:
+            continue
+        node = tree
+        for part in path.split("."):
+            node = node.setdefault(part, {})
+    return tree
+
+
+def project(doc: Any, tree: dict) -> Any:
+    """Return only the parts of `doc` selected by `tree` (see parse_fields)."""
+    if not tree:
+        return doc
+    if isinstance(doc, list):
+        return [project(item, tree) for item in doc]
+    if isinstance(doc, dict):
+        return {key: project(doc[key], sub) for key, sub in tree.items() if key in doc}
+    return doc
+
+
+KEYWORD_SEARCH_SUMMARY = parse_fields(
+    ["ProductsCount"]
+    + [f"Products.{f}" for f in PRODUCT_SUMMARY]
+    + [f"ExactMatches.{f}" for f in PRODUCT_SUMMARY]
+)
+
+PRODUCT_DETAILS_SUMMARY = parse_fields(
+    [f"Product.{f}" for f in PRODUCT_SUMMARY]
+    + [
+        "Product.ProductVariations.StandardPricing",
+        "Product.ProductVariations.MinimumOrderQuantity",
+        "Product.ProductVariations.QuantityAvailableforPackageType",
+        "Product.Parameters.ParameterText",
+        "Product.Parameters.ValueText",
+    ]
+)
+
+
+def select(doc: Any, fields: str | None, compact: bool, summary: dict | None = None) -> Any:
+    """Apply a tool's `fields` / `compact` arguments to a response.
+
+    Args:
+        doc: Full response document
+        fields: Comma-separated dotted paths; takes precedence over compact
+        compact: Return the tool's summary projection when no fields are given
+        summary: Path tree for compact mode (None: compact has no effect)
+    """
+    if fields:
+        return project(doc, parse_fields(fields))
+    if compact and summary is not None:
+        return project(doc, summary)
+    return doc
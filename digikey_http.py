@@ -0,0 +1,182 @@
+import asyncio
+import importlib.util
+import logging
+import os
+import threading
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Shared, connection-pooled HTTP clients used by every DigiKey call. Reusing
+# one client keeps TCP/TLS connections alive between tool calls instead of
+# handshaking on every request.
+#
+# - Async client: all MCP tools, so concurrent tool calls overlap on the
+#   server's event loop instead of blocking it.
+# - Sync client: OAuth token requests (run off-loop by TokenManager).
+#
+# Settings are read from the environment when the client is first built (not at
+# import time), so values loaded later by load_dotenv() still take effect.
+
+_lock = threading.Lock()
+_client: httpx.Client | None = None
+_async_client: httpx.AsyncClient | None = None
+_async_loop: asyncio.AbstractEventLoop | None = None
+_overrides: dict = {}
+
+
+def http2_available() -> bool:
+    """True if the optional `h2` package is installed (httpx[http2])."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def _settings() -> dict:
+    settings = {
+        "pool_size": int(os.getenv("DIGIKEY_HTTP_POOL_SIZE", "20")),
+        "timeout": float(os.getenv("DIGIKEY_HTTP_TIMEOUT", "30")),
+        "keepalive_expiry": float(os.getenv("DIGIKEY_HTTP_KEEPALIVE", "60")),
+        "http2": os.getenv("DIGIKEY_HTTP2", "true").lower() == "true",
+        "transport": None,
+        "async_transport": None,
+    }
+    settings.update(_overrides)
+    return settings
+
+
+def _client_kwargs(s: dict, kind: str) -> dict:
+    http2 = s["http2"] and http2_available()
+    limits = httpx.Limits(
+        max_connections=s["pool_size"],
+        max_keepalive_connections=s["pool_size"],
+        keepalive_expiry=s["keepalive_expiry"],
+    )
+    logger.info(
+        "Creating %s HTTP client (pool_size=%s, timeout=%ss, http2=%s)", kind, s["pool_size"], s["timeout"], http2
+    )
+    return {"limits": limits, "timeout": httpx.Timeout(s["timeout"]), "http2": http2}
+
+
+def _build_client() -> httpx.Client:
+    s = _settings()
+    kwargs = _client_kwargs(s, "sync")
+    if s["transport"] is not None:
+        kwargs["transport"] = s["transport"]
+    return httpx.Client(**kwargs)
+
+
+def _build_async_client() -> httpx.AsyncClient:
+    s = _settings()
+    kwargs = _client_kwargs(s, "async")
+    if s["async_transport"] is not None:
+        kwargs["transport"] = s["async_transport"]
+    return httpx.AsyncClient(**kwargs)
+
+
+def configure(
+    pool_size: int | None = None,
+    timeout: float | None = None,
+    keepalive_expiry: float | None = None,
+    http2: bool | None = None,
+    transport: httpx.BaseTransport | None = None,
+    async_transport: httpx.AsyncBaseTransport | None = None,
+) -> None:
+    """Override transport settings. The pool is rebuilt on the next request.
+
+    Args:
+        pool_size: Maximum number of pooled (keep-alive) connections
+        timeout: Default per-request timeout in seconds
+        keepalive_expiry: Seconds an idle connection is kept open
+        http2: Negotiate HTTP/2 when `h2` is installed
+        transport: Custom httpx transport for the sync client (tests, mocking)
+        async_transport: Custom httpx transport for the async client
+    """
+    global _overrides
+    new = {
+        "pool_size": pool_size,
+        "timeout": timeout,
+        "keepalive_expiry": keepalive_expiry,
+        "http2": http2,
+        "transport": transport,
+        "async_transport": async_transport,
+    }
+    with _lock:
+        _overrides = {**_overrides, **{k: v for k, v in new.items() if v is not None}}
+    close()
+
+
+def reset() -> None:
+    """Drop all overrides and close the shared clients."""
+    global _overrides
+    with _lock:
+        _overrides = {}
+    close()
+
+
+def get_client() -> httpx.Client:
+    """Return the shared client, creating it on first use."""
+    global _client
+    client = _client
+    if client is None:
+        with _lock:
+            if _client is None:
+                _client = _build_client()
+            client = _client
+    return client
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Return the shared async client for the running event loop.
+
+    An async connection pool is bound to the loop it was created on, so a new
+    client is built if the loop changed (e.g. successive asyncio.run calls).
+    """
+    global _async_client, _async_loop
+    loop = asyncio.get_running_loop()
+    with _lock:
+        if _async_client is None or _async_loop is not loop:
+            _async_client = _build_async_client()
+            _async_loop = loop
+        return _async_client
+
+
+def close() -> None:
+    """Close the shared clients and release their pooled connections."""
+    global _client, _async_client, _async_loop
+    with _lock:
+        client, _client = _client, None
+        # The async client can only be closed on its own loop; dropping the
+        # reference lets it be garbage collected (see aclose()).
+        _async_client, _async_loop = None, None
+    if client is not None:
+        client.close()
+
+
+async def aclose() -> None:
+    """Close the shared async client from its event loop."""
+    global _async_client, _async_loop
+    with _lock:
+        client, _async_client, _async_loop = _async_client, None, None
+    if client is not None:
+        await client.aclose()
+
+
+def request(method: str, url: str, timeout: float | None = None, **kwargs) -> httpx.Response:
+    """Send a request over the shared pool.
+
+    Args:
+        method: HTTP method
+        url: Absolute URL
+        timeout: Per-request timeout in seconds (default: client timeout)
+        **kwargs: Passed through to httpx (headers, json, data, ...)
+    """
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+    return get_client().request(method, url, **kwargs)
+
+
+async def arequest(method: str, url: str, timeout: float | None = None, **kwargs) -> httpx.Response:
+    """Async variant of request() over the shared async pool."""
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+    return await get_async_client().request(method, url, **kwargs)
@@ -0,0 +1,234 @@
+import bisect
+import difflib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# In-memory index over DigiKey's category tree and manufacturer list, built
+# from the search_categories / search_manufacturers responses. Serves ID
+# lookups and name -> ID resolution locally, and can be saved to / loaded from
+# a JSON snapshot so a restarted server is ready without any API calls.
+
+SNAPSHOT_VERSION = 1
+
+# Corporate suffixes ignored when matching manufacturer names
+_SUFFIXES = {
+    "inc", "incorporated", "corp", "corporation", "co", "company", "ltd", "limited",
+    "llc", "gmbh", "ag", "sa", "plc", "bv", "nv", "kk", "oy", "ab",
+}
+
+# Common short names that don't follow from the official manufacturer name
+MANUFACTURER_ALIASES = {
+    "ti": "texas instruments",
+    "st": "stmicroelectronics",
+    "stm": "stmicroelectronics",
+    "adi": "analog devices",
+    "nxp": "nxp usa",
+    "onsemi": "onsemi",
+    "on semi": "onsemi",
+    "on semiconductor": "onsemi",
+    "microchip": "microchip technology",
+    "infineon": "infineon technologies",
+    "renesas": "renesas electronics america",
+    "te": "te connectivity",
+    "murata": "murata electronics",
+    "vishay": "vishay dale",
+    "yageo": "yageo",
+    "samsung": "samsung electro mechanics",
+    "maxim": "analog devices maxim integrated",
+}
+
+
+def normalize(name: str, strip_suffixes: bool = False) -> str:
+    """Lowercase, drop punctuation and (optionally) corporate suffixes."""
+    words = re.sub(r"[^a-z0-9]+", " ", name.lower()).split()
+    if strip_suffixes:
+        while len(words) > 1 and words[-1] in _SUFFIXES:
+            words.pop()
+    return " ".join(words)
+
+
+class _NameIndex:
+    """Exact / prefix / substring / fuzzy lookup over normalized names."""
+
+    def __init__(self, strip_suffixes: bool = False):
+        self._strip = strip_suffixes
+        self._ids: dict[str, list] = {}
+        self._sorted: list[str] = []
+
+    def build(self, names: dict[Any, str], aliases: dict[str, str] | None = None) -> None:
+        ids: dict[str, list] = {}
+        for item_id, name in names.items():
+            ids.setdefault(normalize(name, self._strip), []).append(item_id)
+        for alias, target in (aliases or {}).items():
+            target_ids = ids.get(normalize(target, self._strip))
+            if target_ids:
+                ids.setdefault(normalize(alias, self._strip), []).extend(target_ids)
+        self._ids = ids
+        self._sorted = sorted(ids)
+
+    def search(self, query: str, limit: int = 5) -> list[tuple[Any, float]]:
+        """Return up to `limit` (id, score) pairs, best first."""
+        q = normalize(query, self._strip)
+        if not q:
+            return []
+        scores: dict[Any, float] = {}
+
+        def add(key: str, score: float):
+            for item_id in self._ids.get(key, ()):
+                if score > scores.get(item_id, 0.0):
+                    scores[item_id] = score
+
+        add(q, 1.0)
+        # Prefix matches: contiguous range in the sorted key list
+        i = bisect.bisect_left(self._sorted, q)
+        while i < len(self._sorted) and self._sorted[i].startswith(q):
+            add(self._sorted[i], 0.9)
+            i += 1
+        if len(scores) < limit:
+            for key in self._sorted:
+                if f" {q}" in f" {key}":  # word-boundary substring
+                    add(key, 0.8)
+        if len(scores) < limit:
+            for key in difflib.get_close_matches(q, self._sorted, n=limit, cutoff=0.6):
+                add(key, round(0.7 * difflib.SequenceMatcher(None, q, key).ratio(), 3))
+
+        ranked = sorted(scores.items(), key=lambda kv: -kv[1])
+        return ranked[:limit]
+
+
+class CatalogIndex:
+    """Local index of DigiKey categories and manufacturers."""
+
+    def __init__(self):
+        self.categories_raw: dict | None = None
+        self.manufacturers_raw: dict | None = None
+        self.categories_built_at = 0.0
+        self.manufacturers_built_at = 0.0
+        self._categories: dict[int, dict] = {}
+        self._parents: dict[int, int | None] = {}
+        self._manufacturers: dict[int, str] = {}
+        self._category_names = _NameIndex()
+        self._manufacturer_names = _NameIndex(strip_suffixes=True)
+        # Snapshot loads run in worker threads, fresh builds on the event loop
+        self._lock = threading.RLock()
+
+    # -- building -----------------------------------------------------------
+
+    def load_categories(self, response: dict, built_at: float | None = None) -> None:
+        """Index a search_categories response (nested Categories/ChildCategories)."""
+        with self._lock:
+            categories: dict[int, dict] = {}
+            parents: dict[int, int | None] = {}
+            stack = [(c, None) for c in response.get("Categories") or []]
+            while stack:
+                node, parent = stack.pop()
+                cid = node["CategoryId"]
+                categories[cid] = node
+                parents[cid] = parent
+                stack.extend((child, cid) for child in node.get("ChildCategories") or [])
+            self._categories, self._parents = categories, parents
+            self._category_names.build({cid: c.get("Name", "") for cid, c in categories.items()})
+            self.categories_raw = response
+            self.categories_built_at = built_at or time.time()
+
+    def load_manufacturers(self, response: dict, built_at: float | None = None) -> None:
+        """Index a search_manufacturers response."""
+        with self._lock:
+            self._manufacturers = {m["Id"]: m["Name"] for m in response.get("Manufacturers") or []}
+            self._manufacturer_names.build(self._manufacturers, MANUFACTURER_ALIASES)
+            self.manufacturers_raw = response
+            self.manufacturers_built_at = built_at or time.time()
+
+    def has(self, kind: str) -> bool:
+        return bool(self._categories if kind == "categories" else self._manufacturers)
+
+    def age(self, kind: str) -> float:
+        built = self.categories_built_at if kind == "categories" else self.manufacturers_built_at
+        return time.time() - built
+
+    # -- queries ------------------------------------------------------------
+
+    def get_category(self, category_id: int) -> dict | None:
+        """Category in the same shape as the get_category_by_id API response."""
+        node = self._categories.get(category_id)
+        return {"Category": node} if node is not None else None
+
+    def category_path(self, category_id: int) -> list[str]:
+        path = []
+        cid = category_id
+        while cid is not None and cid in self._categories:
+            path.append(self._categories[cid].get("Name", ""))
+            cid = self._parents.get(cid)
+        return path[::-1]
+
+    def search_categories(self, query: str, limit: int = 5) -> list[dict]:
+        return [
+            {
+                "CategoryId": cid,
+                "Name": self._categories[cid].get("Name"),
+                "Path": " > ".join(self.category_path(cid)),
+                "ParentId": self._parents.get(cid),
+                "ProductCount": self._categories[cid].get("ProductCount"),
+                "score": score,
+            }
+            for cid, score in self._category_names.search(query, limit)
+        ]
+
+    def search_manufacturers(self, query: str, limit: int = 5) -> list[dict]:
+        return [
+            {"Id": mid, "Name": self._manufacturers[mid], "score": score}
+            for mid, score in self._manufacturer_names.search(query, limit)
+        ]
+
+    def stats(self) -> dict:
+        return {
+            "categories": len(self._categories),
+            "manufacturers": len(self._manufacturers),
+            "categories_age_s": round(self.age("categories")) if self._categories else None,
+            "manufacturers_age_s": round(self.age("manufacturers")) if self._manufacturers else None,
+        }
+
+    # -- snapshots ----------------------------------------------------------
+
+    def save(self, path: str) -> None:
+        """Write the raw responses to a JSON snapshot (atomically)."""
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            "categories": self.categories_raw,
+            "categories_built_at": self.categories_built_at,
+            "manufacturers": self.manufacturers_raw,
+            "manufacturers_built_at": self.manufacturers_built_at,
+        }
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(snapshot, f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    def load(self, path: str) -> bool:
+        """Load a snapshot written by save(). Returns False if missing or unusable.
+
+        Kinds already indexed are kept: an index built while the snapshot
+        was being read is newer than the snapshot.
+        """
+        try:
+            with open(path) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Could not load catalog index snapshot %s: %s", path, e)
+            return False
+        if snapshot.get("version") != SNAPSHOT_VERSION:
+            return False
+        with self._lock:
+            if snapshot.get("categories") and not self.has("categories"):
+                self.load_categories(snapshot["categories"], snapshot.get("categories_built_at"))
+            if snapshot.get("manufacturers") and not self.has("manufacturers"):
+                self.load_manufacturers(snapshot["manufacturers"], snapshot.get("manufacturers_built_at"))
+        logger.info("Loaded catalog index snapshot: %s", self.stats())
+        return True
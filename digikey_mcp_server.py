@@ -1,22 +1,34 @@
 import os
 import json
+import asyncio
 import logging
+import math
+import threading
+import time
+from datetime import date, timedelta
 from urllib.parse import urlencode, quote
-from dotenv import load_dotenv
-import requests
+import httpx
+from fastmcp import Context
 
-from mcp_app import mcp  # shared FastMCP instance (avoids __main__ double-import)
+import digikey_http
+from digikey_auth import TokenManager
+from digikey_ratelimit import RateLimiter
+from digikey_fields import KEYWORD_SEARCH_SUMMARY, PRODUCT_DETAILS_SUMMARY, PRODUCT_SUMMARY, parse_fields, project, select
+from digikey_cache import SQLiteCache, TTLCache, cache_key, is_persistent, ttl_for
+from digikey_index import CatalogIndex
+from digikey_orders import OrderStore
+from digikey_watchlist import Watchlist, snapshot
+from digikey_partmemo import PartMemo
+from digikey_bom import bom_path, merge_lines, read_rows
+from digikey_profiles import DEFAULT_PROFILE, Profile, profile_store_path, profiles_from_env
+from digikey_pricing import optimize, packaging_options
+from digikey_metrics import Metrics, ToolMetricsMiddleware
+from mcp_app import mcp, on_startup  # shared FastMCP instance (avoids __main__ double-import)
 import digikey_noauth_tools  # noqa: E402, F401 — registers no-auth tools on mcp
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
-# Load environment variables
-load_dotenv()
+# Environment (.env is loaded by mcp_app)
 CLIENT_ID = os.getenv("CLIENT_ID")
 CLIENT_SECRET = os.getenv("CLIENT_SECRET")
 ACCOUNT_ID = os.getenv("DIGIKEY_ACCOUNT_ID")
@@ -30,80 +42,319 @@ else:
     TOKEN_URL = "https://api.digikey.com/v1/oauth2/token"
     API_BASE = "https://api.digikey.com"
 
-def get_access_token():
-    """Get OAuth2 access token from DigiKey."""
+# Response cache for product/catalog endpoints (per-endpoint TTLs, LRU eviction)
+CACHE_ENABLED = os.getenv("DIGIKEY_CACHE_ENABLED", "true").lower() == "true"
+_response_cache = TTLCache(maxsize=int(os.getenv("DIGIKEY_CACHE_SIZE", "1024")))
+
+# Optional on-disk cache for catalog and product details, shared by all server
+# processes on the host (e.g. replicas mounting the same volume)
+DISK_CACHE_PATH = os.getenv("DIGIKEY_DISK_CACHE_PATH")
+_disk_cache = (
+    SQLiteCache(DISK_CACHE_PATH, max_bytes=int(float(os.getenv("DIGIKEY_DISK_CACHE_MAX_MB", "256")) * 1024 * 1024))
+    if CACHE_ENABLED and DISK_CACHE_PATH else None
+)
+
+# Client-side rate limiting: separate budgets for product search and order status
+# (each credential profile gets its own limiter with these settings)
+_RATE_LIMIT_SETTINGS = {
+    "products_per_minute": float(os.getenv("DIGIKEY_RATE_LIMIT_PRODUCTS", "120")),
+    "orders_per_minute": float(os.getenv("DIGIKEY_RATE_LIMIT_ORDERS", "120")),
+    "max_retries": int(os.getenv("DIGIKEY_MAX_RETRIES", "3")),
+}
+_rate_limiter = RateLimiter(**_RATE_LIMIT_SETTINGS)
+
+# Local index of the category tree and manufacturer list, for ID lookups and
+# name -> ID resolution without calling the full-list endpoints each time.
+# The snapshot is read on first use (or by the startup pre-warm), not at import.
+INDEX_SNAPSHOT_PATH = os.getenv("DIGIKEY_INDEX_SNAPSHOT")
+INDEX_MAX_AGE = float(os.getenv("DIGIKEY_INDEX_MAX_AGE", str(24 * 3600)))
+_catalog_index = CatalogIndex()
+_index_snapshot_checked = False
+_index_snapshot_lock = threading.Lock()  # prewarm thread vs. first tool call
+
+# Local order history: closed orders are kept permanently, open orders are
+# re-fetched once their details are older than ORDER_POLL_INTERVAL
+ORDER_STORE_PATH = os.getenv("DIGIKEY_ORDER_STORE_PATH", ":memory:")
+ORDER_POLL_INTERVAL = float(os.getenv("DIGIKEY_ORDER_POLL_INTERVAL", "900"))
+ORDER_SYNC_DAYS = int(os.getenv("DIGIKEY_ORDER_SYNC_DAYS", "365"))
+_order_store = OrderStore(ORDER_STORE_PATH)
+
+# Watchlist: watched parts are polled in the background, WATCH_BATCH at a time,
+# with batches spread so each part is polled about once per WATCH_INTERVAL;
+# agents read the resulting change feed instead of re-fetching product details
+WATCHLIST_PATH = os.getenv("DIGIKEY_WATCHLIST_PATH", ":memory:")
+WATCH_INTERVAL = float(os.getenv("DIGIKEY_WATCH_INTERVAL", "900"))
+WATCH_BATCH = int(os.getenv("DIGIKEY_WATCH_BATCH", "10"))
+WATCH_STOCK_CHANGE = float(os.getenv("DIGIKEY_WATCH_STOCK_CHANGE", "0.5"))
+_watchlist = Watchlist(WATCHLIST_PATH)
+
+# MPN -> DigiKey part number memo, learned from every product record fetched
+# upstream; resolve_part_numbers and Digi-Reel pricing consult it before
+# searching. Entries expire after PART_MEMO_MAX_AGE seconds.
+PART_MEMO_PATH = os.getenv("DIGIKEY_PART_MEMO_PATH", ":memory:")
+PART_MEMO_SIZE = int(os.getenv("DIGIKEY_PART_MEMO_SIZE", "50000"))
+PART_MEMO_MAX_AGE = float(os.getenv("DIGIKEY_PART_MEMO_MAX_AGE", str(30 * 86400)))
+_part_memo = PartMemo(PART_MEMO_PATH, PART_MEMO_SIZE, PART_MEMO_MAX_AGE)
+
+# BOM files for process_bom_file are read only from this directory; the tool
+# is disabled when unset, so clients cannot open arbitrary server files
+BOM_DIR = os.getenv("DIGIKEY_BOM_DIR")
+
+# Fetch the token and load the index snapshot in the background at startup
+PREWARM = os.getenv("DIGIKEY_PREWARM", "true").lower() == "true"
+
+# Metrics (Prometheus text at metrics://prometheus and /metrics over HTTP)
+# and optional OpenTelemetry spans
+_metrics = Metrics(
+    enabled=os.getenv("DIGIKEY_METRICS_ENABLED", "true").lower() == "true",
+    tracing=os.getenv("DIGIKEY_OTEL_ENABLED", "false").lower() == "true",
+)
+if _metrics.enabled:
+    mcp.add_middleware(ToolMetricsMiddleware(_metrics))
+
+def get_access_token(client_id: str | None = None, client_secret: str | None = None) -> dict:
+    """Get OAuth2 access token from DigiKey.
+
+    Args:
+        client_id: Credentials of a non-default profile (default: CLIENT_ID)
+        client_secret: Secret of that profile (default: CLIENT_SECRET)
+
+    Returns:
+        Token response dict with 'access_token' and 'expires_in' (seconds).
+    """
+    client_id = client_id or CLIENT_ID
+    client_secret = client_secret or CLIENT_SECRET
     # Check if credentials are loaded
-    if not CLIENT_ID or not CLIENT_SECRET:
+    if not client_id or not client_secret:
         raise ValueError("CLIENT_ID and CLIENT_SECRET must be set in .env file")
     
     data = {
         "grant_type": "client_credentials",
-        "client_id": CLIENT_ID,
-        "client_secret": CLIENT_SECRET,
+        "client_id": client_id,
+        "client_secret": client_secret,
     }
     headers = {"Content-Type": "application/x-www-form-urlencoded"}
     
     endpoint = "SANDBOX" if USE_SANDBOX else "PRODUCTION"
-    logger.info(f"Requesting token from {endpoint} with CLIENT_ID: {CLIENT_ID[:10]}...")
-    resp = requests.post(TOKEN_URL, data=data, headers=headers)
+    logger.info("Requesting token from %s with CLIENT_ID: %s...", endpoint, client_id[:10])
+    resp = digikey_http.request("POST", TOKEN_URL, data=data, headers=headers)
     
     if resp.status_code != 200:
-        logger.error(f"OAuth error: {resp.status_code} - {resp.text}")
+        logger.error("OAuth error: %s - %s", resp.status_code, resp.text)
         resp.raise_for_status()
     
     logger.info("Successfully obtained access token")
-    return resp.json()["access_token"]
+    return resp.json()
 
 # Lazy token initialization — deferred to first tool call so FastMCP can
 # register tools with the gateway even if OAuth credentials are missing.
+# The manager then refreshes the token in the background before it expires.
 logger.info("=== STARTING DIGIKEY MCP SERVER ===")
-access_token = None
+_token_manager = TokenManager(lambda: get_access_token())
+
+async def _ensure_token():
+    return await _token_manager.aget_token()
+
+# Credential profiles (DIGIKEY_PROFILES, see digikey_profiles): one process
+# serving several accounts, each with its own token, rate-limit budget, order
+# store and cache namespace. Tools without `profile` use DIGIKEY_DEFAULT_PROFILE.
+DEFAULT_PROFILE_NAME = os.getenv("DIGIKEY_DEFAULT_PROFILE", DEFAULT_PROFILE)
 
-def _ensure_token():
-    global access_token
-    if access_token is None:
-        access_token = get_access_token()
-    return access_token
+def _new_profile(name: str, settings: dict) -> Profile:
+    client_id, client_secret = settings["client_id"], settings["client_secret"]
+    return Profile(
+        name, client_id, client_secret, settings.get("account_id"),
+        TokenManager(lambda: get_access_token(client_id, client_secret)),
+        RateLimiter(**_RATE_LIMIT_SETTINGS),
+        OrderStore(profile_store_path(ORDER_STORE_PATH, name)),
+    )
+
+_profiles: dict[str, Profile] = {name: _new_profile(name, s) for name, s in profiles_from_env().items()}
+
+def _profile(name: str | None = None) -> Profile:
+    """The named profile, or the default one. Raises ValueError for unknown names."""
+    name = name or DEFAULT_PROFILE_NAME
+    if name == DEFAULT_PROFILE:
+        # Built from the module globals on each call so it always reflects them
+        return Profile(DEFAULT_PROFILE, CLIENT_ID, CLIENT_SECRET, ACCOUNT_ID, _token_manager, _rate_limiter, _order_store)
+    try:
+        return _profiles[name]
+    except KeyError:
+        raise ValueError(f"Unknown profile {name!r}; configured: {', '.join([DEFAULT_PROFILE, *_profiles])}") from None
 
 logger.info("=== SERVER READY ===")
 
-def _get_headers(customer_id: str = "0"):
-    """Get standard headers for DigiKey API requests."""
-    token = _ensure_token()
+def _locale_headers(site: str | None = None, language: str | None = None, currency: str | None = None) -> dict:
+    """Locale headers for one call.
+
+    Without a per-call site, unset values come from DIGIKEY_LOCALE_*. With a
+    per-call site, unset language/currency are omitted so DigiKey applies
+    that site's defaults (e.g. EUR for DE) instead of the server's.
+    """
+    if site is None:
+        site = os.getenv("DIGIKEY_LOCALE_SITE", "US")
+        language = language or os.getenv("DIGIKEY_LOCALE_LANGUAGE", "en")
+        currency = currency or os.getenv("DIGIKEY_LOCALE_CURRENCY", "USD")
+    headers = {"X-DIGIKEY-Locale-Site": site.upper()}
+    if language:
+        headers["X-DIGIKEY-Locale-Language"] = language.lower()
+    if currency:
+        headers["X-DIGIKEY-Locale-Currency"] = currency.upper()
+    return headers
+
+async def _get_headers(customer_id: str = "0", site: str | None = None, language: str | None = None, currency: str | None = None, profile: str | None = None):
+    """Get standard headers for DigiKey API requests.
+
+    The OAuth token is not locale-bound; locale only changes the headers
+    (which are part of the cache and coalescing keys). The token, client ID
+    and account ID come from the credential profile.
+    """
+    p = _profile(profile)
+    token = await (_ensure_token() if p.is_default else p.token_manager.aget_token())
     headers = {
         "Authorization": f"Bearer {token}",
-        "X-DIGIKEY-Client-Id": CLIENT_ID,
+        "X-DIGIKEY-Client-Id": p.client_id,
         "Content-Type": "application/json",
-        "X-DIGIKEY-Locale-Site": os.getenv("DIGIKEY_LOCALE_SITE", "US"),
-        "X-DIGIKEY-Locale-Language": os.getenv("DIGIKEY_LOCALE_LANGUAGE", "en"),
-        "X-DIGIKEY-Locale-Currency": os.getenv("DIGIKEY_LOCALE_CURRENCY", "USD"),
+        **_locale_headers(site, language, currency),
         "X-DIGIKEY-Customer-Id": customer_id,
     }
-    if ACCOUNT_ID:
-        headers["X-DIGIKEY-Account-Id"] = ACCOUNT_ID
+    if p.account_id:
+        headers["X-DIGIKEY-Account-Id"] = p.account_id
     return headers
 
-def _make_request(method: str, url: str, headers: dict, data: dict | None = None) -> dict:
-    """Make an API request with error handling and logging."""
-    logger.info(f"Making {method} request to {url}")
-    logger.debug(f"Headers: {json.dumps({k: v for k, v in headers.items() if 'Authorization' not in k}, indent=2)}")
-    if data:
-        logger.debug(f"Request body: {json.dumps(data, indent=2)}")
-    
-    if method.upper() == "GET":
-        resp = requests.get(url, headers=headers)
+async def _send(method: str, url: str, headers: dict, data: dict | None, timeout: float | None, rate_limiter: RateLimiter | None = None):
+    """Send through the rate limiter, which retries 429/5xx with backoff."""
+    async def send():
+        start = time.perf_counter()
+        try:
+            if method.upper() == "GET":
+                resp = await digikey_http.arequest("GET", url, headers=headers, timeout=timeout)
+            else:
+                resp = await digikey_http.arequest("POST", url, headers=headers, json=data, timeout=timeout)
+        except Exception as e:
+            _metrics.observe_error(url, e, time.perf_counter() - start)
+            raise
+        _metrics.observe_response(url, resp, time.perf_counter() - start)
+        return resp
+
+    return await (rate_limiter or _rate_limiter).send(url, send)
+
+# In-flight upstream calls by request key, shared by identical concurrent requests
+_inflight: dict[str, asyncio.Future] = {}
+_coalesced = 0
+
+def _forget_inflight(key: str, task: asyncio.Future) -> None:
+    if _inflight.get(key) is task:
+        del _inflight[key]
+    if not task.cancelled():
+        task.exception()  # mark retrieved; callers that are still waiting get it too
+
+async def _cache_lookup(key: str, url: str):
+    """Memory cache first, then the shared disk cache (refilling memory on a hit).
+
+    The disk lookup runs in a worker thread: it may wait for another
+    process's write lock, which must not block the event loop.
+    """
+    cached = _response_cache.get(key)
+    if cached is None and _disk_cache is not None and is_persistent(url):
+        found = await asyncio.to_thread(_disk_cache.lookup, key)
+        if found is not None:
+            cached, remaining = found
+            _response_cache.set(key, cached, remaining)
+    return cached
+
+async def _make_request(method: str, url: str, headers: dict, data: dict | None = None, timeout: float | None = None, bypass_cache: bool = False, profile: str | None = None) -> dict:
+    """Make an API request over the shared connection pool with error handling and logging.
+
+    Responses from cacheable endpoints (see digikey_cache.ENDPOINT_TTLS) are
+    served from the response cache. bypass_cache skips the lookup but still
+    stores the fresh response.
+
+    Identical concurrent requests (same method, URL, body and locale/customer
+    headers) are coalesced: they share one upstream call and its result.
+    Cache and coalescing keys are scoped to the credential profile, which
+    also supplies the rate limiter and the token refreshed on a 401.
+    """
+    global _coalesced
+    p = _profile(profile)
+    key = p.cache_namespace() + cache_key(method, url, headers, data)
+    ttl = ttl_for(url) if CACHE_ENABLED else None
+    if ttl and not bypass_cache:
+        cached = await _cache_lookup(key, url)
+        _metrics.cache_lookup(url, cached is not None)
+        if cached is not None:
+            logger.debug("Cache hit for %s %s", method, url, extra={"method": method, "url": url})
+            return cached
+
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_fetch(method, url, headers, data, timeout, key, ttl, p))
+        _inflight[key] = task
+        task.add_done_callback(lambda t: _forget_inflight(key, t))
     else:
-        resp = requests.post(url, headers=headers, json=data)
-    
-    logger.info(f"Response status: {resp.status_code}")
+        _coalesced += 1
+        _metrics.inc("digikey_coalesced_requests_total")
+        logger.debug("Joining in-flight %s request to %s", method, url, extra={"method": method, "url": url})
+    # shield: a cancelled caller must not cancel the call other callers share
+    return await asyncio.shield(task)
+
+async def _fetch(method: str, url: str, headers: dict, data: dict | None, timeout: float | None, key: str, ttl: float | None, profile: Profile) -> dict:
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Making %s request to %s", method, url, extra={"method": method, "url": url})
+        logger.debug("Headers: %s", json.dumps({k: v for k, v in headers.items() if "Authorization" not in k}))
+        if data:
+            logger.debug("Request body: %s", json.dumps(data))
+
+    with _metrics.span("digikey.request", **{"http.method": method, "http.url": url}):
+        resp = await _send(method, url, headers, data, timeout, profile.rate_limiter)
+
+    # Expired or revoked token: refresh once (shared with concurrent callers) and retry
+    if resp.status_code == 401 and "Authorization" in headers:
+        logger.warning("Got 401, refreshing access token and retrying")
+        stale = headers["Authorization"].removeprefix("Bearer ")
+        headers = {**headers, "Authorization": f"Bearer {await profile.token_manager.arefresh_if_current(stale)}"}
+        resp = await _send(method, url, headers, data, timeout, profile.rate_limiter)
+
+    logger.debug("Response status: %s", resp.status_code, extra={"method": method, "url": url, "status": resp.status_code})
     if resp.status_code != 200:
-        logger.error(f"API error: {resp.status_code} - {resp.text}")
+        logger.error("API error: %s - %s", resp.status_code, resp.text, extra={"method": method, "url": url, "status": resp.status_code})
         resp.raise_for_status()
-    
-    return resp.json()
+
+    result = resp.json()
+    await _learn_parts(url, result)
+    if ttl:
+        _response_cache.set(key, result, ttl)
+        if _disk_cache is not None and is_persistent(url):
+            await asyncio.to_thread(_disk_cache.set, key, result, ttl)
+    return result
+
+async def _learn_parts(url: str, result: dict) -> None:
+    """Feed the product records of a fresh keyword search or product details response to the part memo.
+
+    The SQLite write runs in a worker thread, and a memo failure (e.g. a
+    locked database file) is only logged: it must not fail the lookup.
+    """
+    if "/products/v4/search/" not in url or not isinstance(result, dict):
+        return
+    products = [*(result.get("Products") or []), *(result.get("ExactMatches") or [])]
+    if isinstance(result.get("Product"), dict):
+        products.append(result["Product"])
+    if products:
+        try:
+            await asyncio.to_thread(_part_memo.learn, products)
+        except Exception as e:
+            logger.warning("Could not update the part memo from %s: %s", url, e)
+
+async def _from_part_memo(read, *args):
+    """Run a part memo read in a worker thread; a memo failure is logged and answers None (a miss)."""
+    try:
+        return await asyncio.to_thread(read, *args)
+    except Exception as e:
+        logger.warning("Part memo unavailable, treating it as a miss: %s", e)
+        return None
 
 @mcp.tool()
-def keyword_search(keywords: str, limit: int = 5, manufacturer_id: str | None = None, category_id: str | None = None, search_options: str | None = None, sort_field: str | None = None, sort_order: str = "Ascending"):
+async def keyword_search(keywords: str, limit: int = 5, manufacturer_id: str | None = None, category_id: str | None = None, search_options: str | None = None, sort_field: str | None = None, sort_order: str = "Ascending", bypass_cache: bool = False, offset: int = 0, compact: bool = True, fields: str | None = None, site: str | None = None, language: str | None = None, currency: str | None = None, profile: str | None = None):
     """Search DigiKey products by keyword.
     
     Args:
@@ -114,15 +365,25 @@ def keyword_search(keywords: str, limit: int = 5, manufacturer_id: str | None =
         search_options: Comma-delimited filters like LeadFree,RoHSCompliant,InStock
         sort_field: Field to sort by. Options: None, Packaging, ProductStatus, DigiKeyProductNumber, ManufacturerProductNumber, Manufacturer, MinimumQuantity, QuantityAvailable, Price, Supplier, PriceManufacturerStandardPackage
         sort_order: Sort direction - Ascending or Descending (default: Ascending)
+        bypass_cache: Skip the response cache and fetch fresh data (default: False)
+        offset: Number of results to skip, for paging (default: 0)
+        compact: Return a summary of each product instead of the full record (default: True)
+        fields: Comma-separated dotted paths to return, e.g. "Product.QuantityAvailable,Product.Manufacturer.Name" (lists are traversed implicitly)
+        site: DigiKey locale site for this call, e.g. "DE", "UK" (default: DIGIKEY_LOCALE_SITE)
+        language: Response language for this call, e.g. "de" (default: the site's, or DIGIKEY_LOCALE_LANGUAGE)
+        currency: Pricing currency for this call, e.g. "EUR" (default: the site's, or DIGIKEY_LOCALE_CURRENCY)
+        profile: Credential profile to use (default: DIGIKEY_DEFAULT_PROFILE, see list_profiles)
     """
     url = f"{API_BASE}/products/v4/search/keyword"
-    headers = _get_headers()
+    headers = await _get_headers(site=site, language=language, currency=currency, profile=profile)
     
     body = {
         "Keywords": keywords,
         "Limit": limit
     }
     
+    if offset:
+        body["Offset"] = offset
     if manufacturer_id:
         body["ManufacturerId"] = manufacturer_id
     if category_id:
@@ -137,19 +398,27 @@ def keyword_search(keywords: str, limit: int = 5, manufacturer_id: str | None =
             "SortOrder": sort_order
         }
     
-    return _make_request("POST", url, headers, body)
+    result = await _make_request("POST", url, headers, body, bypass_cache=bypass_cache, profile=profile)
+    return select(result, fields, compact, KEYWORD_SEARCH_SUMMARY)
 
 @mcp.tool()
-def product_details(product_number: str, manufacturer_id: str | None = None, customer_id: str = "0"):
+async def product_details(product_number: str, manufacturer_id: str | None = None, customer_id: str = "0", bypass_cache: bool = False, compact: bool = True, fields: str | None = None, site: str | None = None, language: str | None = None, currency: str | None = None, profile: str | None = None):
     """Get detailed information for a specific product.
     
     Args:
         product_number: DigiKey or manufacturer part number
         manufacturer_id: Optional manufacturer ID for disambiguation
         customer_id: Customer ID for pricing (default: "0")
+        bypass_cache: Skip the response cache and fetch fresh data (default: False)
+        compact: Return a summary (identity, stock, packaging, price breaks, parameters) instead of the full record (default: True)
+        fields: Comma-separated dotted paths to return, e.g. "Product.QuantityAvailable,Product.ProductVariations.StandardPricing" (lists are traversed implicitly)
+        site: DigiKey locale site for this call, e.g. "DE", "UK" (default: DIGIKEY_LOCALE_SITE)
+        language: Response language for this call, e.g. "de" (default: the site's, or DIGIKEY_LOCALE_LANGUAGE)
+        currency: Pricing currency for this call, e.g. "EUR" (default: the site's, or DIGIKEY_LOCALE_CURRENCY)
+        profile: Credential profile to use (default: DIGIKEY_DEFAULT_PROFILE, see list_profiles)
     """
     url = f"{API_BASE}/products/v4/search/{quote(product_number, safe='')}/productdetails"
-    headers = _get_headers(customer_id)
+    headers = await _get_headers(customer_id, site, language, currency, profile=profile)
 
     params = {}
     if manufacturer_id:
@@ -158,35 +427,192 @@ def product_details(product_number: str, manufacturer_id: str | None = None, cus
     if params:
         url += "?" + urlencode(params)
 
-    return _make_request("GET", url, headers)
+    result = await _make_request("GET", url, headers, bypass_cache=bypass_cache, profile=profile)
+    return select(result, fields, compact, PRODUCT_DETAILS_SUMMARY)
 
 @mcp.tool()
-def search_manufacturers():
-    """Search and retrieve all product manufacturers."""
+async def search_manufacturers(bypass_cache: bool = False):
+    """Search and retrieve all product manufacturers.
+
+    To map a manufacturer name to its ID, use resolve_manufacturer instead.
+
+    Args:
+        bypass_cache: Skip the response cache and fetch fresh data (default: False)
+    """
     url = f"{API_BASE}/products/v4/search/manufacturers"
-    headers = _get_headers()
-    return _make_request("GET", url, headers)
+    headers = await _get_headers()
+    result = await _make_request("GET", url, headers, bypass_cache=bypass_cache)
+    await _update_index("manufacturers", result)
+    return result
 
 @mcp.tool()
-def search_categories():
-    """Search and retrieve all product categories."""
+async def search_categories(bypass_cache: bool = False):
+    """Search and retrieve all product categories.
+
+    To map a category name to its ID, use resolve_category instead.
+
+    Args:
+        bypass_cache: Skip the response cache and fetch fresh data (default: False)
+    """
     url = f"{API_BASE}/products/v4/search/categories"
-    headers = _get_headers()
-    return _make_request("GET", url, headers)
+    headers = await _get_headers()
+    result = await _make_request("GET", url, headers, bypass_cache=bypass_cache)
+    await _update_index("categories", result)
+    return result
 
 @mcp.tool()
-def get_category_by_id(category_id: int):
+async def get_category_by_id(category_id: int, bypass_cache: bool = False):
     """Get specific category details by ID.
-    
+
+    Served from the local category index when possible.
+
     Args:
         category_id: The category ID to retrieve
+        bypass_cache: Skip the response cache and index and fetch fresh data (default: False)
     """
+    if not bypass_cache:
+        try:
+            await _ensure_index("categories")
+        except Exception as e:
+            logger.warning("Category index unavailable, asking DigiKey directly: %s", e)
+        found = _catalog_index.get_category(category_id)
+        if found is not None:
+            return found
     url = f"{API_BASE}/products/v4/search/categories/{category_id}"
-    headers = _get_headers()
-    return _make_request("GET", url, headers)
+    headers = await _get_headers()
+    return await _make_request("GET", url, headers, bypass_cache=bypass_cache)
+
+# Index refreshes in flight, by kind ("categories" / "manufacturers")
+_index_refreshes: dict[str, asyncio.Future] = {}
+
+async def _update_index(kind: str, result: dict) -> None:
+    """Re-index a full-list response unless it is the one already indexed."""
+    raw = _catalog_index.categories_raw if kind == "categories" else _catalog_index.manufacturers_raw
+    if result is raw:
+        return
+    if kind == "categories":
+        _catalog_index.load_categories(result)
+    else:
+        _catalog_index.load_manufacturers(result)
+    if INDEX_SNAPSHOT_PATH:
+        await asyncio.to_thread(_catalog_index.save, INDEX_SNAPSHOT_PATH)
+
+def _index_refreshed(kind: str, task: asyncio.Future) -> None:
+    if _index_refreshes.get(kind) is task:
+        del _index_refreshes[kind]
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Refreshing %s index failed: %s", kind, task.exception())
+
+def _load_index_snapshot() -> None:
+    """Load the index snapshot, once per process (blocking file read)."""
+    global _index_snapshot_checked
+    with _index_snapshot_lock:
+        if _index_snapshot_checked:
+            return
+        if INDEX_SNAPSHOT_PATH and os.path.exists(INDEX_SNAPSHOT_PATH):
+            _catalog_index.load(INDEX_SNAPSHOT_PATH)
+        _index_snapshot_checked = True
+
+async def _ensure_index(kind: str) -> None:
+    """Make sure the index holds `kind`.
+
+    An empty index is built before returning; a stale one keeps serving while
+    it is refreshed in the background.
+    """
+    if not _index_snapshot_checked:
+        await asyncio.to_thread(_load_index_snapshot)
+    if _catalog_index.has(kind) and _catalog_index.age(kind) < INDEX_MAX_AGE:
+        return
+    task = _index_refreshes.get(kind)
+    if task is None or task.get_loop() is not asyncio.get_running_loop():
+        tool = search_categories if kind == "categories" else search_manufacturers
+        # A stale index means the cached list is stale too
+        task = asyncio.ensure_future(tool.fn(bypass_cache=_catalog_index.has(kind)))
+        _index_refreshes[kind] = task
+        task.add_done_callback(lambda t: _index_refreshed(kind, t))
+    if not _catalog_index.has(kind):
+        await asyncio.shield(task)
+
+@mcp.tool()
+async def resolve_manufacturer(name: str, limit: int = 5) -> dict:
+    """Resolve a manufacturer name to DigiKey manufacturer IDs (for keyword_search's manufacturer_id).
+
+    Matches exact names, common short names (e.g. "TI", "ST", "ADI"), prefixes
+    and near misses, ignoring case, punctuation and suffixes like "Inc.".
+    Answered from a local index, refreshed daily.
+
+    Args:
+        name: Manufacturer name or abbreviation
+        limit: Maximum number of matches (default: 5)
+    """
+    await _ensure_index("manufacturers")
+    return {"query": name, "matches": _catalog_index.search_manufacturers(name, limit)}
 
 @mcp.tool()
-def search_product_substitutions(product_number: str, limit: int = 10, search_options: str | None = None, exclude_marketplace: bool = False):
+async def resolve_category(name: str, limit: int = 5) -> dict:
+    """Resolve a category name to DigiKey category IDs (for keyword_search's category_id).
+
+    Matches exact names, prefixes, words and near misses anywhere in the
+    category tree; each match includes its full path. Answered from a local
+    index, refreshed daily.
+
+    Args:
+        name: Category name, e.g. "ceramic capacitors"
+        limit: Maximum number of matches (default: 5)
+    """
+    await _ensure_index("categories")
+    return {"query": name, "matches": _catalog_index.search_categories(name, limit)}
+
+@mcp.tool()
+async def resolve_part_numbers(part_numbers: list[str], manufacturer: str | None = None, max_concurrency: int = 8, bypass_cache: bool = False, profile: str | None = None) -> dict:
+    """Map manufacturer part numbers to DigiKey part numbers and packaging variants.
+
+    Answered from the part memo, which learns every product seen in
+    keyword_search and product_details responses; only part numbers it does
+    not know cost a keyword search (at most max_concurrency at a time). Use
+    the result instead of searching before product_details, Digi-Reel pricing
+    or cart URLs.
+
+    Args:
+        part_numbers: Manufacturer (or DigiKey) part numbers
+        manufacturer: Manufacturer name, to choose between manufacturers using the same part number
+        max_concurrency: Maximum concurrent keyword searches (default: 8)
+        bypass_cache: Search again even for known part numbers, refreshing the memo (default: False)
+        profile: Credential profile for searches (default: DIGIKEY_DEFAULT_PROFILE, see list_profiles)
+
+    Returns:
+        Dict with 'resolved' (part number -> manufacturer, status and 'variants'
+        with digikey_part_number, package_type and minimum_quantity), 'ambiguous'
+        (part number -> candidate matches from several manufacturers),
+        'unresolved' (no exact match), and the number of 'searches' made.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    searches = 0
+    resolved, ambiguous, unresolved = {}, {}, []
+
+    async def resolve(part_number: str):
+        nonlocal searches
+        matches = [] if bypass_cache else await _from_part_memo(_part_memo.lookup, part_number, manufacturer) or []
+        if not matches:
+            try:
+                async with semaphore:
+                    searches += 1
+                    await keyword_search.fn(part_number, limit=10, bypass_cache=bypass_cache, compact=False, profile=profile)
+            except Exception as e:
+                logger.warning("Part number search failed for %s: %s", part_number, e)
+            matches = await _from_part_memo(_part_memo.lookup, part_number, manufacturer) or []
+        if len(matches) == 1:
+            resolved[part_number] = matches[0]
+        elif matches:
+            ambiguous[part_number] = matches
+        else:
+            unresolved.append(part_number)
+
+    await asyncio.gather(*(resolve(pn) for pn in dict.fromkeys(part_numbers)))
+    return {"resolved": resolved, "ambiguous": ambiguous, "unresolved": unresolved, "searches": searches}
+
+@mcp.tool()
+async def search_product_substitutions(product_number: str, limit: int = 10, search_options: str | None = None, exclude_marketplace: bool = False, bypass_cache: bool = False, fields: str | None = None, site: str | None = None, language: str | None = None, currency: str | None = None, profile: str | None = None):
     """Search for product substitutions for a given product.
     
     Args:
@@ -194,98 +620,1107 @@ def search_product_substitutions(product_number: str, limit: int = 10, search_op
         limit: Number of substitutions (default: 10)
         search_options: Filters like LeadFree,RoHSCompliant,InStock
         exclude_marketplace: Exclude marketplace products (default: False)
+        bypass_cache: Skip the response cache and fetch fresh data (default: False)
+        fields: Comma-separated dotted paths to return, e.g. "ProductSubstitutes.DigiKeyProductNumber,ProductSubstitutes.QuantityAvailable"
+        site: DigiKey locale site for this call, e.g. "DE", "UK" (default: DIGIKEY_LOCALE_SITE)
+        language: Response language for this call, e.g. "de" (default: the site's, or DIGIKEY_LOCALE_LANGUAGE)
+        currency: Pricing currency for this call, e.g. "EUR" (default: the site's, or DIGIKEY_LOCALE_CURRENCY)
+        profile: Credential profile to use (default: DIGIKEY_DEFAULT_PROFILE, see list_profiles)
     """
     url = f"{API_BASE}/products/v4/search/{quote(product_number, safe='')}/substitutions"
-    headers = _get_headers()
+    headers = await _get_headers(site=site, language=language, currency=currency, profile=profile)
 
     params = {"limit": limit, "excludeMarketPlaceProducts": str(exclude_marketplace).lower()}
     if search_options:
         params["searchOptionList"] = search_options
 
     url += "?" + urlencode(params)
-    return _make_request("GET", url, headers)
+    result = await _make_request("GET", url, headers, bypass_cache=bypass_cache, profile=profile)
+    return select(result, fields, compact=False)
 
 @mcp.tool()
-def get_product_media(product_number: str):
+async def get_product_media(product_number: str, bypass_cache: bool = False, fields: str | None = None, profile: str | None = None):
     """Get media (images, documents, videos) for a product.
     
     Args:
         product_number: The product to get media for
+        bypass_cache: Skip the response cache and fetch fresh data (default: False)
+        fields: Comma-separated dotted paths to return, e.g. "MediaLinks.Url"
+        profile: Credential profile to use (default: DIGIKEY_DEFAULT_PROFILE, see list_profiles)
     """
     url = f"{API_BASE}/products/v4/search/{quote(product_number, safe='')}/media"
-    headers = _get_headers()
-    return _make_request("GET", url, headers)
+    headers = await _get_headers(profile=profile)
+    result = await _make_request("GET", url, headers, bypass_cache=bypass_cache, profile=profile)
+    return select(result, fields, compact=False)
 
 @mcp.tool()
-def get_product_pricing(product_number: str, customer_id: str = "0", requested_quantity: int = 1):
+async def get_product_pricing(product_number: str, customer_id: str = "0", requested_quantity: int = 1, bypass_cache: bool = False, fields: str | None = None, site: str | None = None, language: str | None = None, currency: str | None = None, profile: str | None = None):
     """Get detailed pricing information for a product.
     
     Args:
         product_number: The product to get pricing for
         customer_id: Customer ID for pricing (default: "0")
         requested_quantity: Quantity for pricing calculation (default: 1)
+        bypass_cache: Skip the response cache and fetch fresh data (default: False)
+        fields: Comma-separated dotted paths to return, e.g. "ProductPricings.ProductVariations.StandardPricing"
+        site: DigiKey locale site for this call, e.g. "DE", "UK" (default: DIGIKEY_LOCALE_SITE)
+        language: Response language for this call, e.g. "de" (default: the site's, or DIGIKEY_LOCALE_LANGUAGE)
+        currency: Pricing currency for this call, e.g. "EUR" (default: the site's, or DIGIKEY_LOCALE_CURRENCY)
+        profile: Credential profile to use (default: DIGIKEY_DEFAULT_PROFILE, see list_profiles)
     """
     url = f"{API_BASE}/products/v4/search/{quote(product_number, safe='')}/pricing"
-    headers = _get_headers(customer_id)
+    headers = await _get_headers(customer_id, site, language, currency, profile=profile)
 
     params = {"requestedQuantity": requested_quantity}
     url += "?" + urlencode(params)
 
-    return _make_request("GET", url, headers)
+    result = await _make_request("GET", url, headers, bypass_cache=bypass_cache, profile=profile)
+    return select(result, fields, compact=False)
 
 @mcp.tool()
-def get_digi_reel_pricing(product_number: str, requested_quantity: int, customer_id: str = "0"):
+async def get_digi_reel_pricing(product_number: str, requested_quantity: int, customer_id: str = "0", bypass_cache: bool = False, fields: str | None = None, site: str | None = None, language: str | None = None, currency: str | None = None, profile: str | None = None):
     """Get DigiReel pricing for a product.
+
+    A manufacturer part number (or another packaging's DigiKey part number)
+    already seen in a search or product details response is mapped to its
+    Digi-Reel DigiKey part number without an extra lookup.
     
     Args:
-        product_number: DigiKey product number (must be DigiReel compatible)
+        product_number: DigiKey product number (must be DigiReel compatible), or a known manufacturer part number
         requested_quantity: Quantity for DigiReel pricing
         customer_id: Customer ID for pricing (default: "0")
+        bypass_cache: Skip the response cache and fetch fresh data (default: False)
+        fields: Comma-separated dotted paths to return, e.g. "ReelingFee,UnitPrice"
+        site: DigiKey locale site for this call, e.g. "DE", "UK" (default: DIGIKEY_LOCALE_SITE)
+        language: Response language for this call, e.g. "de" (default: the site's, or DIGIKEY_LOCALE_LANGUAGE)
+        currency: Pricing currency for this call, e.g. "EUR" (default: the site's, or DIGIKEY_LOCALE_CURRENCY)
+        profile: Credential profile to use (default: DIGIKEY_DEFAULT_PROFILE, see list_profiles)
     """
-    url = f"{API_BASE}/products/v4/search/{quote(product_number, safe='')}/digireelpricing"
-    headers = _get_headers(customer_id)
-
+    headers = await _get_headers(customer_id, site, language, currency, profile=profile)
     params = {"requestedQuantity": requested_quantity}
-    url += "?" + urlencode(params)
 
-    return _make_request("GET", url, headers)
+    async def fetch(part_number: str) -> dict:
+        url = f"{API_BASE}/products/v4/search/{quote(part_number, safe='')}/digireelpricing?" + urlencode(params)
+        return await _make_request("GET", url, headers, bypass_cache=bypass_cache, profile=profile)
+
+    digi_reel = await _from_part_memo(_part_memo.digikey_part_number, product_number, None, True)
+    if digi_reel is None or digi_reel == product_number:
+        result = await fetch(product_number)
+    else:
+        try:
+            result = await fetch(digi_reel)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 404:
+                raise
+            # Packaging withdrawn since it was learned: forget it and ask with the original number
+            logger.info("Memoized Digi-Reel part %s for %s not found, dropping it", digi_reel, product_number)
+            await _from_part_memo(_part_memo.invalidate, product_number)
+            result = await fetch(product_number)
+    return select(result, fields, compact=False)
 
 
 @mcp.tool()
-def list_orders(start_date: str | None = None, end_date: str | None = None, page_size: int = 10) -> dict:
+async def list_orders(start_date: str | None = None, end_date: str | None = None, page_size: int = 10, page_number: int = 1, profile: str | None = None) -> dict:
     """List DigiKey orders within a date range.
 
     Args:
         start_date: Range start in YYYY-MM-DD format (default: 30 days ago)
         end_date: Range end in YYYY-MM-DD format (default: today)
         page_size: Results per page, max 25 (default: 10)
+        page_number: Page to return, starting at 1 (default: 1)
+        profile: Credential profile to use (default: DIGIKEY_DEFAULT_PROFILE, see list_profiles)
     """
     url = f"{API_BASE}/orderstatus/v4/orders"
-    headers = _get_headers()
+    headers = await _get_headers(profile=profile)
 
     params = {"PageSize": page_size}
+    if page_number > 1:
+        params["PageNumber"] = page_number
     if start_date:
         params["StartDate"] = start_date
     if end_date:
         params["EndDate"] = end_date
 
     url += "?" + urlencode(params)
-    return _make_request("GET", url, headers)
+    result = await _make_request("GET", url, headers, profile=profile)
+    try:
+        await asyncio.to_thread(_profile(profile).order_store.upsert_headers, result.get("Orders") or [])
+    except Exception as e:
+        logger.warning("Could not store the listed orders: %s", e)
+    return result
 
 
 @mcp.tool()
-def get_order_status(sales_order_id: int) -> dict:
+async def get_order_status(sales_order_id: int, bypass_cache: bool = False, profile: str | None = None) -> dict:
     """Get status and details of a specific DigiKey sales order.
 
+    Closed orders (shipped, delivered, canceled) no longer change and are
+    answered from the local order store once fetched.
+
     Args:
         sales_order_id: The sales order ID to retrieve
+        bypass_cache: Fetch from DigiKey even if the order is stored as closed (default: False)
+        profile: Credential profile to use (default: DIGIKEY_DEFAULT_PROFILE, see list_profiles)
     """
+    store = _profile(profile).order_store
+    if not bypass_cache:
+        try:
+            stored = await asyncio.to_thread(store.closed_detail, sales_order_id)
+        except Exception as e:
+            logger.warning("Order store unavailable, fetching order %s: %s", sales_order_id, e)
+            stored = None
+        if stored is not None:
+            return stored
     url = f"{API_BASE}/orderstatus/v4/salesorder/{sales_order_id}"
-    headers = _get_headers()
-    return _make_request("GET", url, headers)
+    headers = await _get_headers(profile=profile)
+    result = await _make_request("GET", url, headers, profile=profile)
+    try:
+        await asyncio.to_thread(store.upsert_detail, result)
+    except Exception as e:
+        logger.warning("Could not store order %s: %s", sales_order_id, e)
+    return result
+
+
+KEYWORD_PAGE_SIZE = 50  # DigiKey maximum Limit per keyword search
+ORDERS_PAGE_SIZE = 25  # DigiKey maximum PageSize for order lists
+
+
+async def _paginate(fetch_page, page_size: int, max_items: int, ctx: Context | None = None):
+    """Yield pages of items from fetch_page(index) -> (items, total).
+
+    The next page is requested before the current one is handed to the
+    caller, so upstream latency overlaps with processing. Stops at
+    `max_items`, the reported total, or a short page.
+    """
+    fetched = 0
+    index = 0
+    next_page = asyncio.ensure_future(fetch_page(index))
+    try:
+        while next_page is not None:
+            items, total = await next_page
+            items = items[:max_items - fetched]
+            fetched += len(items)
+            limit = max_items if total is None else min(max_items, total)
+
+            next_page = None
+            if len(items) == page_size and fetched < limit:
+                index += 1
+                next_page = asyncio.ensure_future(fetch_page(index))
+
+            if ctx is not None:
+                await ctx.report_progress(fetched, limit, f"Fetched {fetched} of {limit}")
+            yield items, total
+    finally:
+        if next_page is not None:
+            next_page.cancel()
+
+
+def _compact_order(order: dict) -> dict:
+    """Order header without addresses and line items."""
+    compact = {k: v for k, v in order.items() if not isinstance(v, (dict, list))}
+    status = order.get("Status")
+    if isinstance(status, dict):
+        compact["Status"] = status.get("ShortDescription") or status.get("SalesOrderStatus")
+    compact["LineItemCount"] = len(order.get("LineItems") or [])
+    return compact
+
+
+@mcp.tool()
+async def keyword_search_all(keywords: str, max_results: int = 500, manufacturer_id: str | None = None, category_id: str | None = None, search_options: str | None = None, sort_field: str | None = None, sort_order: str = "Ascending", compact: bool = True, fields: str | None = None, site: str | None = None, language: str | None = None, currency: str | None = None, profile: str | None = None, ctx: Context | None = None) -> dict:
+    """Search DigiKey products by keyword and collect all result pages in one call.
+
+    Walks result offsets server-side (50 per page), prefetching the next page
+    while the current one is processed, and stops at max_results. Each page
+    is also streamed as a progress notification.
+
+    Args:
+        keywords: Search terms or part numbers
+        max_results: Stop after this many products (default: 500)
+        manufacturer_id: Filter by specific manufacturer ID
+        category_id: Filter by specific category ID
+        search_options: Comma-delimited filters like LeadFree,RoHSCompliant,InStock
+        sort_field: Field to sort by (see keyword_search)
+        sort_order: Sort direction - Ascending or Descending (default: Ascending)
+        compact: Return a summary of each product instead of the full record (default: True)
+        fields: Comma-separated dotted paths to return per product, e.g. "ManufacturerProductNumber,QuantityAvailable"
+        site: DigiKey locale site for this call (see keyword_search)
+        language: Response language for this call (see keyword_search)
+        currency: Pricing currency for this call (see keyword_search)
+        profile: Credential profile to use (default: DIGIKEY_DEFAULT_PROFILE, see list_profiles)
+
+    Returns:
+        Dict with 'Products', 'ProductsCount' (total matches upstream) and 'Returned'.
+    """
+    async def fetch_page(index: int):
+        page = await keyword_search.fn(
+            keywords, limit=KEYWORD_PAGE_SIZE, offset=index * KEYWORD_PAGE_SIZE,
+            manufacturer_id=manufacturer_id, category_id=category_id,
+            search_options=search_options, sort_field=sort_field, sort_order=sort_order,
+            compact=False, site=site, language=language, currency=currency, profile=profile,
+        )
+        return page.get("Products") or [], page.get("ProductsCount")
+
+    tree = parse_fields(fields) if fields else parse_fields(PRODUCT_SUMMARY) if compact else None
+    products = []
+    total = None
+    async for items, total in _paginate(fetch_page, KEYWORD_PAGE_SIZE, max_results, ctx):
+        chunk = [project(p, tree) for p in items] if tree else items
+        products.extend(chunk)
+        if ctx is not None:
+            await ctx.info(f"{len(chunk)} products", extra={"products": chunk})
+
+    return {"Products": products, "ProductsCount": total, "Returned": len(products)}
+
+
+@mcp.tool()
+async def list_orders_all(start_date: str | None = None, end_date: str | None = None, max_orders: int = 1000, compact: bool = True, profile: str | None = None, ctx: Context | None = None) -> dict:
+    """List all DigiKey orders in a date range, walking every page in one call.
+
+    Fetches 25 orders per page, prefetching the next page while the current
+    one is processed, and stops at max_orders. Each page is also streamed as
+    a progress notification.
+
+    Args:
+        start_date: Range start in YYYY-MM-DD format (default: 30 days ago)
+        end_date: Range end in YYYY-MM-DD format (default: today)
+        max_orders: Stop after this many orders (default: 1000)
+        compact: Drop addresses and line items, keeping order headers (default: True)
+        profile: Credential profile to use (default: DIGIKEY_DEFAULT_PROFILE, see list_profiles)
+
+    Returns:
+        Dict with 'Orders', 'TotalOrders' (as reported upstream) and 'Returned'.
+    """
+    async def fetch_page(index: int):
+        page = await list_orders.fn(start_date, end_date, page_size=ORDERS_PAGE_SIZE, page_number=index + 1, profile=profile)
+        return page.get("Orders") or [], page.get("TotalOrders", page.get("TotalCount"))
+
+    orders = []
+    total = None
+    async for items, total in _paginate(fetch_page, ORDERS_PAGE_SIZE, max_orders, ctx):
+        chunk = [_compact_order(o) for o in items] if compact else items
+        orders.extend(chunk)
+        if ctx is not None:
+            await ctx.info(f"{len(chunk)} orders", extra={"orders": chunk})
+
+    return {"Orders": orders, "TotalOrders": total, "Returned": len(orders)}
+
+
+# Order syncs in flight, by profile (one at a time per profile)
+_order_syncs: dict[str, asyncio.Future] = {}
+
+async def _sync_orders(start_date: str | None, end_date: str | None, max_concurrency: int, ctx: Context | None = None, profile: str | None = None) -> dict:
+    """List orders into the profile's store, then fetch details of new and due open orders."""
+    store = _profile(profile).order_store
+    if start_date is None:
+        last = store.get_state("last_sync")
+        # Re-list from the day before the last sync so late-posted orders aren't missed
+        since = date.fromisoformat(last["date"]) - timedelta(days=1) if last else date.today() - timedelta(days=ORDER_SYNC_DAYS)
+        start_date = since.isoformat()
+    end = end_date or date.today().isoformat()
+
+    listed = await list_orders_all.fn(start_date, end, max_orders=100_000, compact=False, profile=profile)
+    due = store.due_for_detail(ORDER_POLL_INTERVAL)
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    errors = []
+    done = 0
+
+    async def fetch(sales_order_id: int):
+        nonlocal done
+        async with semaphore:
+            try:
+                await get_order_status.fn(sales_order_id, bypass_cache=True, profile=profile)
+            except Exception as e:
+                logger.warning("Order sync failed for %s: %s", sales_order_id, e)
+                errors.append({"sales_order_id": sales_order_id, "error": str(e)})
+        done += 1
+        if ctx is not None:
+            await ctx.report_progress(done, len(due), f"Synced order {sales_order_id}")
+
+    await asyncio.gather(*(fetch(oid) for oid in due))
+    if end_date is None:
+        store.set_state("last_sync", {"date": end, "at": time.time()})
+    return {"listed": listed["Returned"], "fetched": len(due) - len(errors), "errors": errors, "store": store.stats()}
+
+def _order_sync_done(name: str, task: asyncio.Future) -> None:
+    if _order_syncs.get(name) is task:
+        del _order_syncs[name]
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Order sync for profile %s failed: %s", name, task.exception())
+
+async def _ensure_orders_synced(profile: str | None = None) -> None:
+    """Sync before the first query; afterwards refresh in the background once the last sync is older than ORDER_POLL_INTERVAL."""
+    p = _profile(profile)
+    last = p.order_store.get_state("last_sync")
+    if last and time.time() - last["at"] < ORDER_POLL_INTERVAL:
+        return
+    task = _order_syncs.get(p.name)
+    if task is None or task.get_loop() is not asyncio.get_running_loop():
+        task = _order_syncs[p.name] = asyncio.ensure_future(_sync_orders(None, None, max_concurrency=8, profile=p.name))
+        task.add_done_callback(lambda t: _order_sync_done(p.name, t))
+    if not last:
+        await asyncio.shield(task)
+
+
+@mcp.tool()
+async def sync_orders(start_date: str | None = None, end_date: str | None = None, max_concurrency: int = 8, profile: str | None = None, ctx: Context | None = None) -> dict:
+    """Sync order history into the local order store used by query_orders.
+
+    Lists orders since the last sync (or the last DIGIKEY_ORDER_SYNC_DAYS days
+    on first sync), then fetches details for new orders and for open orders
+    not polled within DIGIKEY_ORDER_POLL_INTERVAL. Closed orders are never
+    fetched again.
+
+    Args:
+        start_date: Range start in YYYY-MM-DD format (default: incremental since the last sync)
+        end_date: Range end in YYYY-MM-DD format (default: today)
+        max_concurrency: Maximum order detail requests in flight (default: 8)
+        profile: Credential profile to use (default: DIGIKEY_DEFAULT_PROFILE, see list_profiles)
+
+    Returns:
+        Dict with 'listed', 'fetched', per-order 'errors' and store 'store' stats.
+    """
+    return await _sync_orders(start_date, end_date, max_concurrency, ctx, profile)
+
+
+@mcp.tool()
+async def query_orders(status: str | None = None, open_only: bool = False, start_date: str | None = None, end_date: str | None = None, part_number: str | None = None, group_by: str | None = None, limit: int = 100, profile: str | None = None) -> dict:
+    """Query the local order history, e.g. open orders or spend per quarter, without per-order API calls.
+
+    The store is synced on first use and refreshed in the background
+    afterwards (see sync_orders).
+
+    Args:
+        status: Only orders with this status, e.g. "Shipped", "Processing"
+        open_only: Only orders that are not yet shipped/delivered/canceled (default: False)
+        start_date: Orders entered on or after this date (YYYY-MM-DD)
+        end_date: Orders entered on or before this date (YYYY-MM-DD)
+        part_number: Only orders containing this DigiKey or manufacturer part number
+        group_by: Aggregate order count, spend and quantity by status, month, quarter, year, part_number or manufacturer_part_number
+        limit: Maximum orders to list (default: 100)
+        profile: Credential profile to use (default: DIGIKEY_DEFAULT_PROFILE, see list_profiles)
+
+    Returns:
+        Dict with 'orders' (newest first), 'matched', 'total_spend' and,
+        with group_by, 'groups'.
+    """
+    await _ensure_orders_synced(profile)
+    store = _profile(profile).order_store
+    result = store.query(status, open_only, start_date, end_date, part_number, limit)
+    if group_by:
+        result["groups"] = store.aggregate(group_by, status, open_only, start_date, end_date, part_number)
+    return result
+
+
+# Background watchlist poller (one per event loop)
+_watch_poller: asyncio.Future | None = None
+
+async def _poll_watched(entries: list[dict], max_concurrency: int = 8, ctx: Context | None = None) -> tuple[list[dict], list[dict]]:
+    """Poll watched parts and record their snapshots. Returns (changes, errors)."""
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    changes, errors = [], []
+    done = 0
+
+    async def poll(entry: dict):
+        nonlocal done
+        async with semaphore:
+            try:
+                details = await product_details.fn(
+                    entry["part_number"], customer_id=entry["customer_id"], bypass_cache=True,
+                    compact=False, profile=entry["profile"],
+                )
+            except Exception as e:
+                logger.warning("Watchlist poll failed for %s: %s", entry["part_number"], e)
+                errors.append({"part_number": entry["part_number"], "error": str(e)})
+                details = None
+            try:
+                if details is None:
+                    await asyncio.to_thread(_watchlist.touch, entry["profile"], entry["part_number"])
+                else:
+                    changes.extend(await asyncio.to_thread(
+                        _watchlist.record, entry["profile"], entry["part_number"], snapshot(details), WATCH_STOCK_CHANGE
+                    ))
+            except Exception as e:
+                logger.warning("Could not update the watchlist for %s: %s", entry["part_number"], e)
+        done += 1
+        if ctx is not None:
+            await ctx.report_progress(done, len(entries), f"Polled {entry['part_number']}")
+
+    await asyncio.gather(*(poll(e) for e in entries))
+    changes.sort(key=lambda c: c["id"])
+    return changes, errors
+
+async def _watch_loop() -> None:
+    while True:
+        watched = _watchlist.count()
+        if not watched:
+            return
+        due = _watchlist.due(WATCH_INTERVAL, WATCH_BATCH)
+        if due:
+            changes, _ = await _poll_watched(due)
+            if changes:
+                logger.info("Watchlist: %d changes", len(changes))
+        # Batches per interval -> pause between batches
+        await asyncio.sleep(WATCH_INTERVAL / math.ceil(watched / WATCH_BATCH))
+
+def _watch_poller_done(task: asyncio.Future) -> None:
+    global _watch_poller
+    if _watch_poller is task:
+        _watch_poller = None
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Watchlist poller stopped: %s", task.exception())
+
+def _ensure_watch_poller() -> None:
+    """Start the background poller on this event loop if parts are watched and it isn't running."""
+    global _watch_poller
+    task = _watch_poller
+    if (task is None or task.get_loop() is not asyncio.get_running_loop()) and _watchlist.count():
+        task = _watch_poller = asyncio.ensure_future(_watch_loop())
+        task.add_done_callback(_watch_poller_done)
+
+@on_startup
+def _resume_watch_poller() -> None:
+    """Keep polling parts a file-backed watchlist stored before a restart, without waiting for a watch tool call."""
+    _ensure_watch_poller()
+
+
+@mcp.tool()
+async def watch_parts(parts: list[dict], profile: str | None = None, ctx: Context | None = None) -> dict:
+    """Add parts to the stock/price watchlist; changes are then reported by watch_changes.
+
+    Watched parts are polled in the background (about once per
+    DIGIKEY_WATCH_INTERVAL, in batches that respect the rate limit). New parts
+    are polled right away to take the baseline snapshot; watching a part again
+    updates its settings and keeps its snapshot.
+
+    Args:
+        parts: List of dicts with keys:
+            - part_number (str, required): DigiKey or manufacturer part number
+            - stock_threshold (int, optional): Report when stock falls below (or recovers to) this level
+            - customer_id (str, optional): Customer ID for pricing (default: "0")
+        profile: Credential profile to use (default: DIGIKEY_DEFAULT_PROFILE, see list_profiles)
+
+    Returns:
+        Dict with 'added', baseline 'snapshots' (stock and status per new part), 'errors' and 'watching'.
+    """
+    name = _profile(profile).name
+    added = [
+        p["part_number"] for p in parts
+        if _watchlist.add(name, p["part_number"], str(p.get("customer_id", "0")), p.get("stock_threshold"))
+    ]
+    entries = _watchlist.entries(name, added)
+    _, errors = await _poll_watched(entries, ctx=ctx)
+    snapshots = {
+        e["part_number"]: {"stock": e["snapshot"]["stock"], "status": e["snapshot"]["status"]}
+        for e in _watchlist.entries(name, added) if e["snapshot"]
+    }
+    _ensure_watch_poller()
+    return {"added": added, "snapshots": snapshots, "errors": errors, "watching": _watchlist.count()}
+
+
+@mcp.tool()
+def unwatch_parts(part_numbers: list[str], profile: str | None = None) -> dict:
+    """Remove parts from the watchlist.
+
+    Args:
+        part_numbers: Part numbers as passed to watch_parts
+        profile: Credential profile they were watched under (default: DIGIKEY_DEFAULT_PROFILE)
+    """
+    removed = _watchlist.remove(_profile(profile).name, part_numbers)
+    return {"removed": removed, "watching": _watchlist.count()}
+
+
+@mcp.tool()
+async def watch_changes(since: int = 0, part_number: str | None = None, limit: int = 100, profile: str | None = None) -> dict:
+    """Read the watchlist change feed: stock threshold crossings, large stock moves, status and price-break changes.
+
+    Pass the returned 'cursor' as `since` next time to get only newer changes.
+
+    Args:
+        since: Return changes after this cursor (default: 0, all retained changes)
+        part_number: Only changes of this watched part
+        limit: Maximum changes to return, oldest first (default: 100)
+        profile: Only changes of parts watched under this profile (default: all)
+
+    Returns:
+        Dict with 'changes', 'cursor' and 'watching'.
+    """
+    _ensure_watch_poller()
+    name = _profile(profile).name if profile else None
+    return {**_watchlist.changes(since, limit, name, part_number), "watching": _watchlist.count()}
+
+
+@mcp.tool()
+async def poll_watchlist(part_numbers: list[str] | None = None, profile: str | None = None, ctx: Context | None = None) -> dict:
+    """Poll watched parts now instead of waiting for the background schedule.
+
+    Args:
+        part_numbers: Only these watched parts (default: all)
+        profile: Only parts watched under this profile (default: all)
+
+    Returns:
+        Dict with the resulting 'changes', 'polled' and 'errors'.
+    """
+    entries = _watchlist.entries(_profile(profile).name if profile else None, part_numbers)
+    changes, errors = await _poll_watched(entries, ctx=ctx)
+    _ensure_watch_poller()
+    return {"changes": changes, "polled": len(entries), "errors": errors}
+
+
+@mcp.resource("watchlist://changes", mime_type="application/json")
+def watchlist_changes() -> str:
+    """The 100 most recent watchlist changes (see watch_changes)."""
+    return json.dumps(_watchlist.changes(max(0, _watchlist.latest_id() - 100), 100))
+
+
+@mcp.tool()
+def cache_stats() -> dict:
+    """Get response cache statistics (size, hits, misses, evictions, hit rate, coalesced requests)."""
+    stats = {"enabled": CACHE_ENABLED, **_response_cache.stats(), "coalesced_requests": _coalesced}
+    if _disk_cache is not None:
+        stats["disk"] = _disk_cache.stats()
+    stats["index"] = _catalog_index.stats()
+    stats["orders"] = _order_store.stats()
+    stats["watchlist"] = _watchlist.stats()
+    stats["part_memo"] = _part_memo.stats()
+    return stats
+
+
+@mcp.tool()
+def rate_limit_stats(profile: str | None = None) -> dict:
+    """Get client-side rate limiter statistics: time spent queued per budget, 429s, retries.
+
+    Args:
+        profile: Credential profile whose budget to report (default: DIGIKEY_DEFAULT_PROFILE)
+    """
+    return _profile(profile).rate_limiter.stats()
+
+
+@mcp.tool()
+def list_profiles() -> dict:
+    """List the configured credential profiles (usable as `profile` in the API tools) and which one is the default."""
+    profiles = [_profile(DEFAULT_PROFILE), *_profiles.values()]
+    return {"default": DEFAULT_PROFILE_NAME, "profiles": [p.describe() for p in profiles]}
+
+
+def _collect_metrics(m: Metrics) -> None:
+    """Mirror totals kept by the cache, token manager and rate limiter into the metrics."""
+    cache = _response_cache.stats()
+    m.set("digikey_cache_entries", cache["size"], cache="memory")
+    m.set("digikey_cache_evictions_total", cache["evictions"], cache="memory")
+    if _disk_cache is not None:
+        disk = _disk_cache.stats()
+        m.set("digikey_cache_entries", disk["size"], cache="disk")
+        m.set("digikey_cache_evictions_total", disk["evictions"], cache="disk")
+    for p in (_profile(DEFAULT_PROFILE), *_profiles.values()):
+        m.set("digikey_token_refreshes_total", p.token_manager.refresh_count, profile=p.name)
+        limiter = p.rate_limiter.stats()
+        for budget, bucket in limiter["budgets"].items():
+            m.set("digikey_rate_limit_wait_seconds_total", bucket["total_wait_s"], budget=budget, profile=p.name)
+        m.set("digikey_rate_limit_throttled_total", limiter["throttled"], profile=p.name)
+        m.set("digikey_rate_limit_retries_total", limiter["retries"], profile=p.name)
+
+_metrics.add_collector(_collect_metrics)
+
+
+@mcp.resource("metrics://prometheus", mime_type="text/plain")
+def prometheus_metrics() -> str:
+    """Server metrics in the Prometheus text exposition format."""
+    return _metrics.render()
+
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics_endpoint(request):
+    """Prometheus scrape endpoint (HTTP transports only)."""
+    from starlette.responses import PlainTextResponse
+
+    return PlainTextResponse(_metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@mcp.tool()
+def metrics_snapshot() -> dict:
+    """Get server metrics: per-tool and per-endpoint latency (count, avg, p50, p99), upstream status counts, cache lookups, bytes in/out, token refreshes."""
+    return _metrics.snapshot()
+
+
+def _unit_price_at(price_breaks: list[dict], quantity: int) -> float | None:
+    """Unit price at `quantity` from a StandardPricing break table.
+
+    Uses the largest break not above `quantity`; below the first break the
+    first break's price applies (DigiKey rounds up to the minimum).
+    """
+    price = None
+    for pb in sorted(price_breaks, key=lambda b: b["BreakQuantity"]):
+        if price is None or pb["BreakQuantity"] <= quantity:
+            price = pb["UnitPrice"]
+        else:
+            break
+    return price
+
+
+def _bom_line_result(line: dict, details: dict) -> dict:
+    """Merge a BOM line with its product details: availability, price breaks, extended cost."""
+    product = details.get("Product", details)
+    quantity = line["quantity"]
+    variations = product.get("ProductVariations") or []
+
+    # Prefer the exact DigiKey part number; otherwise the cheapest packaging at this quantity
+    variation = next(
+        (v for v in variations if v.get("DigiKeyProductNumber") == line["part_number"]), None
+    )
+    if variation is None:
+        priced = [v for v in variations if v.get("StandardPricing")]
+        variation = min(
+            priced, key=lambda v: _unit_price_at(v["StandardPricing"], quantity), default=None
+        )
+
+    breaks = (variation or {}).get("StandardPricing") or []
+    unit_price = _unit_price_at(breaks, quantity) if breaks else None
+    available = product.get("QuantityAvailable", 0)
+    result = {
+        **line,
+        "digikey_part_number": (variation or {}).get("DigiKeyProductNumber"),
+        "manufacturer_part_number": product.get("ManufacturerProductNumber"),
+        "manufacturer": (product.get("Manufacturer") or {}).get("Name"),
+        "description": (product.get("Description") or {}).get("ProductDescription"),
+        "package_type": ((variation or {}).get("PackageType") or {}).get("Name"),
+        "quantity_available": available,
+        "in_stock": available >= quantity,
+        "price_breaks": [
+            {"quantity": b["BreakQuantity"], "unit_price": b["UnitPrice"]} for b in breaks
+        ],
+        "unit_price": unit_price,
+        "extended_cost": round(unit_price * quantity, 4) if unit_price is not None else None,
+    }
+    return result
+
+
+@mcp.tool()
+async def resolve_bom(lines: list[dict], customer_id: str = "0", max_concurrency: int = 8, bypass_cache: bool = False, profile: str | None = None, ctx: Context | None = None) -> dict:
+    """Resolve a whole BOM in one call: availability, price breaks and extended cost per line.
+
+    Repeated part numbers are looked up once. Lookups run concurrently
+    (bounded by max_concurrency) and each resolved line is streamed back as a
+    progress notification. A failed lookup only marks its own lines with an
+    'error' key.
+
+    Args:
+        lines: List of dicts with keys:
+            - part_number (str, required): DigiKey or manufacturer part number
+            - quantity (int, required): Quantity needed
+            - customer_ref (str, optional): Reference designator or note
+        customer_id: Customer ID for pricing (default: "0")
+        max_concurrency: Maximum concurrent DigiKey lookups (default: 8)
+        bypass_cache: Skip the response cache and fetch fresh data (default: False)
+        profile: Credential profile to use (default: DIGIKEY_DEFAULT_PROFILE, see list_profiles)
+
+    Returns:
+        Dict with 'lines' (in input order) and a 'summary' with counts and total cost.
+    """
+    by_part: dict[str, list[int]] = {}
+    for i, line in enumerate(lines):
+        by_part.setdefault(line["part_number"], []).append(i)
+
+    results: list[dict | None] = [None] * len(lines)
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    done = 0
+
+    async def resolve(part_number: str):
+        nonlocal done
+        try:
+            async with semaphore:
+                details = await product_details.fn(part_number, customer_id=customer_id, bypass_cache=bypass_cache, compact=False, profile=profile)
+            resolved = [_bom_line_result(lines[i], details) for i in by_part[part_number]]
+        except Exception as e:
+            logger.warning("BOM lookup failed for %s: %s", part_number, e)
+            resolved = [{**lines[i], "error": str(e)} for i in by_part[part_number]]
+
+        for i, result in zip(by_part[part_number], resolved):
+            results[i] = result
+        done += len(resolved)
+        if ctx is not None:
+            for result in resolved:
+                await ctx.info(f"Resolved {part_number}", extra=result)
+            await ctx.report_progress(done, len(lines), f"Resolved {part_number}")
+
+    await asyncio.gather(*(resolve(pn) for pn in by_part))
+
+    costs = [r["extended_cost"] for r in results if r.get("extended_cost") is not None]
+    errors = sum(1 for r in results if "error" in r)
+    return {
+        "lines": results,
+        "summary": {
+            "lines": len(lines),
+            "unique_parts": len(by_part),
+            "resolved": len(lines) - errors,
+            "errors": errors,
+            "out_of_stock": sum(1 for r in results if r.get("in_stock") is False),
+            "total_cost": round(sum(costs), 2),
+        },
+    }
+
+
+def _parse_locale(locale: str) -> dict:
+    """"SITE[:CURRENCY[:LANGUAGE]]" -> {"site", "currency", "language"}."""
+    site, currency, language = (locale.split(":") + [None, None])[:3]
+    if not site:
+        raise ValueError(f"Locale {locale!r} has no site; use e.g. \"DE\" or \"DE:EUR\"")
+    return {"site": site.upper(), "currency": currency.upper() if currency else None, "language": language or None}
+
+
+@mcp.tool()
+async def compare_locales(product_number: str, locales: list[str], quantity: int = 1, customer_id: str = "0", exchange_rates: dict[str, float] | None = None, bypass_cache: bool = False, profile: str | None = None) -> dict:
+    """Compare stock and price of one part across DigiKey locales/currencies in one call.
+
+    All locales are queried concurrently over the shared connection pool;
+    responses are cached per locale.
+
+    Args:
+        product_number: DigiKey or manufacturer part number
+        locales: Locales as "SITE[:CURRENCY[:LANGUAGE]]", e.g. ["US", "DE:EUR", "UK:GBP"]
+        quantity: Quantity to price at (default: 1)
+        customer_id: Customer ID for pricing (default: "0")
+        exchange_rates: Optional value of one unit of each currency in a common currency,
+            e.g. {"USD": 1.0, "EUR": 1.08, "GBP": 1.27}, to rank locales with different currencies
+        bypass_cache: Skip the response cache and fetch fresh data (default: False)
+        profile: Credential profile to use (default: DIGIKEY_DEFAULT_PROFILE, see list_profiles)
+
+    Returns:
+        Dict with one normalized entry per locale (part, packaging, stock, unit price and
+        extended cost at quantity, price breaks, currency) and 'cheapest' when prices are comparable.
+    """
+    parsed = [_parse_locale(loc) for loc in locales]
+
+    async def lookup(locale: str, loc: dict) -> dict:
+        try:
+            details = await product_details.fn(product_number, customer_id=customer_id, bypass_cache=bypass_cache, compact=False, profile=profile, **loc)
+        except Exception as e:
+            logger.warning("Locale %s lookup failed for %s: %s", locale, product_number, e)
+            return {"locale": locale, "site": loc["site"], "error": str(e)}
+        used = details.get("SearchLocaleUsed") or {}
+        result = _bom_line_result({"part_number": product_number, "quantity": quantity}, details)
+        result = {
+            "locale": locale,
+            "site": used.get("Site") or loc["site"],
+            "currency": used.get("Currency") or loc["currency"],
+            **{k: v for k, v in result.items() if k not in ("part_number", "quantity")},
+        }
+        rate = (exchange_rates or {}).get(result["currency"] or "")
+        if rate is not None and result["unit_price"] is not None:
+            result["unit_price_converted"] = round(result["unit_price"] * rate, 6)
+            result["extended_cost_converted"] = round(result["extended_cost"] * rate, 4)
+        return result
+
+    results = await asyncio.gather(*(lookup(locale, loc) for locale, loc in zip(locales, parsed)))
+
+    priced = [r for r in results if r.get("unit_price") is not None]
+    cheapest = None
+    if exchange_rates:
+        converted = [r for r in priced if "unit_price_converted" in r]
+        if converted:
+            cheapest = min(converted, key=lambda r: r["unit_price_converted"])["locale"]
+    elif priced and len({r["currency"] for r in priced}) == 1:
+        cheapest = min(priced, key=lambda r: r["unit_price"])["locale"]
+    return {"product_number": product_number, "quantity": quantity, "locales": results, "cheapest": cheapest}
+
+
+def _rank_key(candidate: dict):
+    """Sort key for alternates: in stock first, then cheapest at the quantity, then most stock."""
+    price = candidate.get("unit_price")
+    return (
+        not candidate.get("in_stock"),
+        price is None,
+        price if price is not None else 0.0,
+        -(candidate.get("quantity_available") or 0),
+    )
+
+
+@mcp.tool()
+async def find_substitutes_bulk(lines: list[dict], customer_id: str = "0", limit: int = 10, search_options: str | None = None, exclude_marketplace: bool = False, max_concurrency: int = 8, bypass_cache: bool = False, profile: str | None = None, ctx: Context | None = None) -> dict:
+    """Find and rank alternates for many parts in one call (e.g. obsolete or out-of-stock BOM lines).
+
+    Substitution lookups run concurrently, then stock and price breaks are
+    fetched for every candidate, also concurrently (bounded by
+    max_concurrency). A candidate suggested for several lines is looked up
+    once. Alternates are ranked in stock first, then by unit price at the
+    line's quantity. Each finished line is streamed back as a progress
+    notification; a failed lookup only marks its own line with an 'error' key.
+
+    Args:
+        lines: List of dicts with keys:
+            - part_number (str, required): DigiKey or manufacturer part number to replace
+            - quantity (int, required): Quantity needed
+            - customer_ref (str, optional): Reference designator or note
+        customer_id: Customer ID for pricing (default: "0")
+        limit: Substitutes to consider per part (default: 10)
+        search_options: Substitution filters like LeadFree,RoHSCompliant,InStock
+        exclude_marketplace: Exclude marketplace products (default: False)
+        max_concurrency: Maximum concurrent DigiKey lookups (default: 8)
+        bypass_cache: Skip the response cache and fetch fresh data (default: False)
+        profile: Credential profile to use (default: DIGIKEY_DEFAULT_PROFILE, see list_profiles)
+
+    Returns:
+        Dict with 'lines' (in input order, each with ranked 'alternates') and a 'summary'.
+    """
+    by_part: dict[str, list[int]] = {}
+    for i, line in enumerate(lines):
+        by_part.setdefault(line["part_number"], []).append(i)
+
+    results: list[dict | None] = [None] * len(lines)
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    candidates: dict[str, asyncio.Future] = {}  # candidate part number -> details lookup
+    done = 0
+
+    async def details_for(part_number: str) -> dict:
+        async with semaphore:
+            return await product_details.fn(part_number, customer_id=customer_id, bypass_cache=bypass_cache, compact=False, profile=profile)
+
+    def candidate_lookup(part_number: str) -> asyncio.Future:
+        if part_number not in candidates:
+            candidates[part_number] = asyncio.ensure_future(details_for(part_number))
+        return candidates[part_number]
+
+    async def alternate(substitute: dict, quantity: int) -> dict:
+        part_number = substitute.get("DigiKeyProductNumber") or substitute.get("ManufacturerProductNumber")
+        base = {"substitute_type": substitute.get("SubstituteType"), "digikey_part_number": part_number}
+        try:
+            details = await asyncio.shield(candidate_lookup(part_number))
+        except Exception as e:
+            return {**base, "error": str(e)}
+        result = _bom_line_result({"part_number": part_number, "quantity": quantity}, details)
+        for key in ("part_number", "quantity", "price_breaks"):
+            del result[key]
+        return {**base, **result}
+
+    async def find(part_number: str):
+        nonlocal done
+        try:
+            async with semaphore:
+                found = await search_product_substitutions.fn(
+                    part_number, limit=limit, search_options=search_options,
+                    exclude_marketplace=exclude_marketplace, bypass_cache=bypass_cache, profile=profile,
+                )
+            substitutes = found.get("ProductSubstitutes") or []
+            resolved = []
+            for i in by_part[part_number]:
+                alternates = await asyncio.gather(*(alternate(s, lines[i]["quantity"]) for s in substitutes))
+                resolved.append({**lines[i], "alternates": sorted(alternates, key=_rank_key)})
+        except Exception as e:
+            logger.warning("Substitution lookup failed for %s: %s", part_number, e)
+            resolved = [{**lines[i], "error": str(e)} for i in by_part[part_number]]
+
+        for i, result in zip(by_part[part_number], resolved):
+            results[i] = result
+        done += len(resolved)
+        if ctx is not None:
+            for result in resolved:
+                await ctx.info(f"Alternates for {part_number}", extra=result)
+            await ctx.report_progress(done, len(lines), f"Alternates for {part_number}")
+
+    await asyncio.gather(*(find(pn) for pn in by_part))
+
+    errors = sum(1 for r in results if "error" in r)
+    return {
+        "lines": results,
+        "summary": {
+            "lines": len(lines),
+            "unique_parts": len(by_part),
+            "candidates_looked_up": len(candidates),
+            "errors": errors,
+            "with_in_stock_alternate": sum(
+                1 for r in results if any(a.get("in_stock") for a in r.get("alternates", ()))
+            ),
+        },
+    }
+
+
+async def _packaging_options(part_number: str, quantity: int, customer_id: str, bypass_cache: bool, profile: str | None = None) -> list[dict]:
+    """Fetch a part's price-break tables (and Digi-Reel fee if needed) once and normalize them."""
+    # requested_quantity does not change the break tables; a fixed value
+    # lets every quantity for this part share one cached response
+    pricing = await get_product_pricing.fn(part_number, customer_id=customer_id, requested_quantity=1, bypass_cache=bypass_cache, profile=profile)
+    options = packaging_options(pricing)
+    reels = [
+        v for p in pricing.get("ProductPricings") or [] for v in p.get("ProductVariations") or []
+        if "digi-reel" in ((v.get("PackageType") or {}).get("Name") or "").lower() and v.get("DigiReelFee") is None
+    ]
+    if reels:
+        try:
+            digi_reel = await get_digi_reel_pricing.fn(reels[0]["DigiKeyProductNumber"], requested_quantity=quantity, customer_id=customer_id, bypass_cache=bypass_cache, profile=profile)
+            options = packaging_options(pricing, digi_reel_fee=digi_reel.get("ReelingFee"))
+        except Exception as e:
+            logger.warning("DigiReel pricing failed for %s, skipping Digi-Reel: %s", part_number, e)
+    return options
+
+
+@mcp.tool()
+async def optimize_bom_pricing(lines: list[dict], customer_id: str = "0", max_concurrency: int = 8, bypass_cache: bool = False, profile: str | None = None, ctx: Context | None = None) -> dict:
+    """Cheapest way to buy each BOM line across price breaks and packaging (Cut Tape, Tape & Reel, Digi-Reel).
+
+    Each part's price-break tables are fetched once (plus DigiReel pricing
+    when the reeling fee is not in the pricing response); all quantities are
+    then evaluated locally. For every line the plan considers rounding up to a
+    cheaper break, full reels (whole reels only) topped up with cut tape, and
+    Digi-Reel including its reeling fee, and reports how many more to buy to
+    reach the next break. Lookups run concurrently (bounded by
+    max_concurrency); a failed lookup only marks its own lines with an 'error'
+    key.
+
+    Args:
+        lines: List of dicts with keys:
+            - part_number (str, required): DigiKey or manufacturer part number
+            - quantity (int, required): Quantity needed
+            - customer_ref (str, optional): Reference designator or note
+        customer_id: Customer ID for pricing (default: "0")
+        max_concurrency: Maximum concurrent DigiKey lookups (default: 8)
+        bypass_cache: Skip the response cache and fetch fresh data (default: False)
+        profile: Credential profile to use (default: DIGIKEY_DEFAULT_PROFILE, see list_profiles)
+
+    Returns:
+        Dict with 'lines' (in input order, each with a purchase 'plan') and a 'summary' with totals and savings.
+    """
+    by_part: dict[str, list[int]] = {}
+    for i, line in enumerate(lines):
+        by_part.setdefault(line["part_number"], []).append(i)
+
+    results: list[dict | None] = [None] * len(lines)
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    done = 0
+
+    async def plan(part_number: str):
+        nonlocal done
+        indexes = by_part[part_number]
+        try:
+            async with semaphore:
+                options = await _packaging_options(part_number, lines[indexes[0]]["quantity"], customer_id, bypass_cache, profile)
+            resolved = []
+            for i in indexes:
+                best = optimize(options, lines[i]["quantity"])
+                resolved.append({**lines[i], **best} if best else {**lines[i], "error": "No pricing available"})
+        except Exception as e:
+            logger.warning("Pricing lookup failed for %s: %s", part_number, e)
+            resolved = [{**lines[i], "error": str(e)} for i in indexes]
+
+        for i, result in zip(indexes, resolved):
+            results[i] = result
+        done += len(resolved)
+        if ctx is not None:
+            for result in resolved:
+                await ctx.info(f"Priced {part_number}", extra=result)
+            await ctx.report_progress(done, len(lines), f"Priced {part_number}")
+
+    await asyncio.gather(*(plan(pn) for pn in by_part))
+
+    priced = [r for r in results if "error" not in r]
+    return {
+        "lines": results,
+        "summary": {
+            "lines": len(lines),
+            "unique_parts": len(by_part),
+            "errors": len(lines) - len(priced),
+            "total_cost": round(sum(r["total_cost"] for r in priced), 2),
+            "cost_without_optimization": round(sum(r["cost_without_optimization"] for r in priced), 2),
+            "savings": round(sum(r["savings"] for r in priced), 2),
+        },
+    }
+
+
+BOM_TARGETS = ("summary", "cart", "mylist", "resolve", "optimize")
+
+def _load_bom(path: str, format: str, columns: dict[str, str] | None, boards: int) -> tuple[list[dict], dict]:
+    """Stream a BOM file into merged lines (blocking file read)."""
+    stats: dict = {}
+    lines = merge_lines(read_rows(bom_path(path, BOM_DIR), format, columns, stats), boards)
+    stats["lines"] = len(lines)
+    stats["total_quantity"] = sum(line["quantity"] for line in lines)
+    return lines, stats
+
+
+@mcp.tool()
+async def process_bom_file(path: str, target: str = "summary", format: str = "auto", columns: dict[str, str] | None = None, boards: int = 1, list_name: str | None = None, new_cart: bool = True, customer_id: str = "0", max_concurrency: int = 8, include_lines: bool = False, site: str | None = None, profile: str | None = None, ctx: Context | None = None) -> dict:
+    """Read a BOM file from disk and send it to the cart, MyList or pricing tools without passing it through the conversation.
+
+    Parses KiCad, Altium and generic CSV/TSV exports row by row (delimiter
+    and header row are detected), merges duplicate part numbers, then hands
+    the lines to the chosen target. Uses the DigiKey part number column when
+    present, otherwise the manufacturer part number; cart URLs use the
+    DigiKey part number instead for MPNs the part memo knows (see
+    resolve_part_numbers).
+
+    Args:
+        path: BOM file path, relative to DIGIKEY_BOM_DIR (required; files outside it are refused)
+        target: "summary" (parse only), "cart" (generate_cart_urls), "mylist" (create_mylist_links),
+            "resolve" (resolve_bom) or "optimize" (optimize_bom_pricing) (default: summary)
+        format: Column naming: kicad, altium, generic or auto (default: auto)
+        columns: Header overrides per field, e.g. {"manufacturer_part_number": "Mfr. #", "quantity": "Qty/board"};
+            fields: digikey_part_number, manufacturer_part_number, manufacturer, quantity, reference, customer_ref, dnp
+        boards: Multiply every quantity by this many boards, at least 1 (default: 1)
+        list_name: MyList name for target "mylist" (default: the file name)
+        new_cart: For target "cart", clear the cart with the first URL (default: True)
+        customer_id: Customer ID for pricing targets (default: "0")
+        max_concurrency: Maximum lookups in flight for pricing targets (default: 8)
+        include_lines: Return every line for "resolve"/"optimize"; otherwise only failed and out-of-stock lines (default: False)
+        site: DigiKey site for cart/MyList URLs (see generate_cart_urls)
+        profile: Credential profile for pricing targets (default: DIGIKEY_DEFAULT_PROFILE, see list_profiles)
+
+    Returns:
+        Dict with 'bom' (columns used, rows read, skipped rows, merged lines, total quantity)
+        and the target's 'result' (for "summary", a 'preview' of the first lines).
+    """
+    if not BOM_DIR:
+        raise ValueError("process_bom_file is disabled: set DIGIKEY_BOM_DIR to the directory BOM files are read from")
+    if target not in BOM_TARGETS:
+        raise ValueError(f"target must be one of {', '.join(BOM_TARGETS)}")
+    if boards < 1:
+        raise ValueError("boards must be at least 1")
+    lines, stats = await asyncio.to_thread(_load_bom, path, format, columns, boards)
+    if not lines:
+        raise ValueError(f"No BOM lines found in {path}")
+
+    if target == "summary":
+        return {"bom": stats, "preview": lines[:10]}
+    if target == "cart":
+        # Cart URLs need DigiKey part numbers: map MPN-only lines the part memo knows
+        mpn_lines = [line for line in lines if line["part_number"] == line.get("manufacturer_part_number")]
+        known = await _from_part_memo(lambda: [
+            _part_memo.digikey_part_number(line["part_number"], line.get("manufacturer")) for line in mpn_lines
+        ]) or []
+        for line, part_number in zip(mpn_lines, known):
+            if part_number:
+                line["part_number"] = part_number
+        result = digikey_noauth_tools.generate_cart_urls(lines, new_cart=new_cart, site=site)
+    elif target == "mylist":
+        name = list_name or os.path.splitext(os.path.basename(path))[0]
+        result = await digikey_noauth_tools.create_mylist_links(name, lines, site=site, ctx=ctx)
+    else:
+        tool = resolve_bom if target == "resolve" else optimize_bom_pricing
+        result = await tool.fn(lines, customer_id=customer_id, max_concurrency=max_concurrency, profile=profile, ctx=ctx)
+        if not include_lines:
+            issues = [r for r in result.pop("lines") if "error" in r or r.get("in_stock") is False]
+            result["issues"] = issues
+    return {"bom": stats, "result": result}
+
+
+def _prewarm() -> None:
+    """Load the index snapshot and fetch the first token so the first tool call doesn't wait for them.
+
+    The async connection pool is bound to the server's event loop and is
+    opened by the first tool call.
+    """
+    try:
+        _load_index_snapshot()
+        if CLIENT_ID and CLIENT_SECRET:
+            _token_manager.get_token()
+    except Exception as e:
+        logger.warning("Startup pre-warm failed, continuing lazily: %s", e)
 
 
 def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    if PREWARM:
+        threading.Thread(target=_prewarm, name="digikey-prewarm", daemon=True).start()
     mcp.run()
 
 if __name__ == "__main__":
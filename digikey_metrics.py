@@ -0,0 +1,258 @@
+import bisect
+import importlib.util
+import re
+import threading
+import time
+from contextlib import nullcontext
+from typing import Callable
+from urllib.parse import urlsplit
+
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+
+# In-process metrics for the server: tool and upstream latency histograms,
+# upstream status counts, cache lookups, bytes in/out. Rendered in the
+# Prometheus text exposition format or as a JSON snapshot. Optional
+# OpenTelemetry spans when the opentelemetry package is installed.
+#
+# Recording is a dict update under a lock; a disabled registry returns before
+# doing any work (including URL -> endpoint labelling).
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# name -> (type, help). Rendered in this order.
+METRICS = {
+    "digikey_tool_calls_total": ("counter", "MCP tool calls by tool and outcome"),
+    "digikey_tool_duration_seconds": ("histogram", "MCP tool call latency"),
+    "digikey_upstream_requests_total": ("counter", "DigiKey API responses by endpoint and HTTP status (each retry counts)"),
+    "digikey_upstream_duration_seconds": ("histogram", "DigiKey API request latency by endpoint"),
+    "digikey_upstream_errors_total": ("counter", "DigiKey API requests that failed without a response"),
+    "digikey_upstream_bytes_sent_total": ("counter", "Request body bytes sent to the DigiKey API"),
+    "digikey_upstream_bytes_received_total": ("counter", "Response body bytes received from the DigiKey API"),
+    "digikey_cache_lookups_total": ("counter", "Response cache lookups by endpoint and result"),
+    "digikey_coalesced_requests_total": ("counter", "Requests that joined an identical in-flight request"),
+    "digikey_cache_entries": ("gauge", "Entries in the response cache"),
+    "digikey_cache_evictions_total": ("counter", "Response cache LRU evictions"),
+    "digikey_token_refreshes_total": ("counter", "OAuth access token fetches"),
+    "digikey_rate_limit_wait_seconds_total": ("counter", "Time spent queued by the client-side rate limiter"),
+    "digikey_rate_limit_throttled_total": ("counter", "429 responses from DigiKey"),
+    "digikey_rate_limit_retries_total": ("counter", "Retried 429/5xx responses"),
+}
+
+# URL path -> endpoint label, so part numbers and IDs don't explode cardinality
+_ENDPOINTS = [
+    (re.compile(r"^/products/v4/search/(keyword|manufacturers|categories)$"), r"/products/v4/search/\1"),
+    (re.compile(r"^/products/v4/search/categories/[^/]+$"), "/products/v4/search/categories/{id}"),
+    (re.compile(r"^/products/v4/search/[^/]+/([^/]+)$"), r"/products/v4/search/{product}/\1"),
+    (re.compile(r"^/orderstatus/v4/salesorder/[^/]+$"), "/orderstatus/v4/salesorder/{id}"),
+]
+
+
+def endpoint_label(url: str) -> str:
+    path = urlsplit(url).path
+    for pattern, label in _ENDPOINTS:
+        if pattern.match(path):
+            return pattern.sub(label, path)
+    return path
+
+
+def tracing_available() -> bool:
+    """True if the optional `opentelemetry-api` package is installed."""
+    return importlib.util.find_spec("opentelemetry") is not None
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def _format(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metrics:
+    """Thread-safe counters, gauges and histograms with optional tracing.
+
+    Args:
+        enabled: Record anything at all
+        tracing: Emit OpenTelemetry spans (needs opentelemetry-api)
+        buckets: Histogram bucket upper bounds in seconds
+    """
+
+    _NO_SPAN = nullcontext()
+
+    def __init__(self, enabled: bool = True, tracing: bool = False, buckets: tuple = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._counters: dict[tuple, float] = {}
+        self._gauges: dict[tuple, float] = {}
+        self._histograms: dict[tuple, list] = {}  # key -> [bucket counts, sum, count]
+        self._collectors: list[Callable[["Metrics"], None]] = []
+        self._tracer = None
+        if enabled and tracing and tracing_available():
+            from opentelemetry import trace
+
+            self._tracer = trace.get_tracer("digikey-mcp")
+
+    # -- recording ----------------------------------------------------------
+
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels) -> None:
+        """Set a gauge (or a counter mirrored from another component's total)."""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        i = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            hist[0][i] += 1
+            hist[1] += seconds
+            hist[2] += 1
+
+    def observe_response(self, url: str, response, seconds: float) -> None:
+        """Record one upstream HTTP exchange: latency, status and body sizes."""
+        if not self.enabled:
+            return
+        endpoint = endpoint_label(url)
+        self.observe("digikey_upstream_duration_seconds", seconds, endpoint=endpoint)
+        self.inc("digikey_upstream_requests_total", endpoint=endpoint, status=str(response.status_code))
+        try:
+            sent = len(response.request.content)
+        except (AttributeError, RuntimeError):  # responses built without a request
+            sent = 0
+        self.inc("digikey_upstream_bytes_sent_total", sent, endpoint=endpoint)
+        self.inc("digikey_upstream_bytes_received_total", len(response.content), endpoint=endpoint)
+
+    def observe_error(self, url: str, error: Exception, seconds: float) -> None:
+        if not self.enabled:
+            return
+        endpoint = endpoint_label(url)
+        self.observe("digikey_upstream_duration_seconds", seconds, endpoint=endpoint)
+        self.inc("digikey_upstream_errors_total", endpoint=endpoint, error=type(error).__name__)
+
+    def cache_lookup(self, url: str, hit: bool) -> None:
+        if not self.enabled:
+            return
+        self.inc("digikey_cache_lookups_total", endpoint=endpoint_label(url), result="hit" if hit else "miss")
+
+    def span(self, name: str, **attributes):
+        """Context manager for an OpenTelemetry span (no-op without tracing)."""
+        if self._tracer is None:
+            return self._NO_SPAN
+        return self._tracer.start_as_current_span(name, attributes=attributes)
+
+    def add_collector(self, collect: Callable[["Metrics"], None]) -> None:
+        """Register a callback that sets gauges from other components before export."""
+        self._collectors.append(collect)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+    # -- export -------------------------------------------------------------
+
+    def _collect(self) -> None:
+        for collect in self._collectors:
+            collect(self)
+
+    def render(self) -> str:
+        """Prometheus text exposition format."""
+        self._collect()
+        with self._lock:
+            samples: dict[str, list[str]] = {}
+            for (name, labels), value in [*self._counters.items(), *self._gauges.items()]:
+                samples.setdefault(name, []).append(f"{name}{_labels(labels)} {_format(value)}")
+            for (name, labels), (counts, total, count) in self._histograms.items():
+                lines = samples.setdefault(name, [])
+                cumulative = 0
+                for bound, n in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += n
+                    le = "+Inf" if bound == float("inf") else _format(bound)
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {_format(total)}")
+                lines.append(f"{name}_count{_labels(labels)} {count}")
+
+        out = []
+        for name in [*METRICS, *sorted(set(samples) - set(METRICS))]:
+            if name not in samples:
+                continue
+            kind, help_text = METRICS.get(name, ("untyped", ""))
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+            out.extend(samples[name])
+        return "\n".join(out) + "\n"
+
+    def quantile(self, name: str, q: float, **labels) -> float | None:
+        """Estimate a quantile from histogram buckets (upper bound of the bucket)."""
+        with self._lock:
+            hist = self._histograms.get((name, tuple(sorted(labels.items()))))
+            if hist is None or not hist[2]:
+                return None
+            rank = q * hist[2]
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), hist[0]):
+                cumulative += n
+                if cumulative >= rank:
+                    return bound
+        return None
+
+    def snapshot(self) -> dict:
+        """JSON-friendly view: counters/gauges by label set, histogram count/sum/avg/p50/p99."""
+        self._collect()
+        out: dict[str, dict] = {}
+        with self._lock:
+            values = [*self._counters.items(), *self._gauges.items()]
+            histograms = list(self._histograms.items())
+        for (name, labels), value in values:
+            out.setdefault(name, {})[",".join(f"{k}={v}" for k, v in labels)] = value
+        for (name, labels), (_, total, count) in histograms:
+            out.setdefault(name, {})[",".join(f"{k}={v}" for k, v in labels)] = {
+                "count": count,
+                "sum_s": round(total, 6),
+                "avg_s": round(total / count, 6) if count else None,
+                "p50_s": self.quantile(name, 0.5, **dict(labels)),
+                "p99_s": self.quantile(name, 0.99, **dict(labels)),
+            }
+        return out
+
+
+class ToolMetricsMiddleware(Middleware):
+    """FastMCP middleware timing every tool call (and tracing it when enabled)."""
+
+    def __init__(self, metrics: Metrics):
+        self.metrics = metrics
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        tool = context.message.name
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            with self.metrics.span(f"tool {tool}", **{"mcp.tool.name": tool}):
+                result = await call_next(context)
+            outcome = "ok"
+            return result
+        finally:
+            self.metrics.observe("digikey_tool_duration_seconds", time.perf_counter() - start, tool=tool)
+            self.metrics.inc("digikey_tool_calls_total", tool=tool, outcome=outcome)
@@ -1,13 +1,17 @@
+import asyncio
+import json
 import logging
 import os
-from urllib.parse import urlencode
+import random
+from urllib.parse import quote_plus, urlencode
 
-import requests
-from dotenv import load_dotenv
+import httpx
+from fastmcp import Context
 
+import digikey_http
+from digikey_ratelimit import RETRY_STATUSES, parse_retry_after
 from mcp_app import mcp
 
-load_dotenv()
 logger = logging.getLogger(__name__)
 
 # Derive DigiKey website domain from DIGIKEY_LOCALE_SITE.
@@ -33,10 +37,31 @@ def _derive_domain(site_code: str) -> str:
 DIGIKEY_DOMAIN = _derive_domain(os.getenv("DIGIKEY_LOCALE_SITE", "US"))
 
 FASTADD_BASE = f"https://{DIGIKEY_DOMAIN}/classic/ordering/fastadd.aspx"
+MAX_CART_URL_LENGTH = 1700  # longer GET URLs risk truncation by browsers and proxies
 MYLIST_THIRDPARTY_URL = f"https://{DIGIKEY_DOMAIN}/mylists/api/thirdparty"
 
 
-def generate_cart_url(parts: list[dict], new_cart: bool = True) -> dict:
+def _fastadd_base(site: str | None) -> str:
+    """FastAdd URL for a per-call site, or the configured one."""
+    return f"https://{_derive_domain(site)}/classic/ordering/fastadd.aspx" if site else FASTADD_BASE
+
+
+def _mylist_api(site: str | None) -> str:
+    """MyList third-party API URL for a per-call site, or the configured one."""
+    return f"https://{_derive_domain(site)}/mylists/api/thirdparty" if site else MYLIST_THIRDPARTY_URL
+
+_MYLIST_HEADERS = {
+    "Content-Type": "application/json",
+    "User-Agent": "digikey-mcp/0.2.0",
+}
+
+# create_mylist_links: per-chunk timeout and retry backoff (seconds)
+MYLIST_CHUNK_TIMEOUT = 30.0
+MYLIST_BACKOFF_BASE = 0.5
+MYLIST_BACKOFF_CAP = 10.0
+
+
+def generate_cart_url(parts: list[dict], new_cart: bool = True, site: str | None = None) -> dict:
     """Generate a DigiKey FastAdd URL to populate a shopping cart.
 
     The returned URL, when opened in a browser, adds all parts to the
@@ -48,6 +73,7 @@ def generate_cart_url(parts: list[dict], new_cart: bool = True) -> dict:
             - quantity (int, required): Quantity to add
             - customer_ref (str, optional): Reference designator or note
         new_cart: If True, clears existing cart first (default: True)
+        site: DigiKey site for this URL, e.g. "DE" (default: DIGIKEY_LOCALE_SITE)
 
     Returns:
         Dict with 'url' key. Adds 'warning' key if URL exceeds safe GET length.
@@ -62,13 +88,13 @@ def generate_cart_url(parts: list[dict], new_cart: bool = True) -> dict:
     if new_cart:
         params["newcart"] = "true"
 
-    url = f"{FASTADD_BASE}?{urlencode(params)}"
+    url = f"{_fastadd_base(site)}?{urlencode(params)}"
 
     result = {"url": url}
-    if len(url) > 1700:
+    if len(url) > MAX_CART_URL_LENGTH:
         result["warning"] = (
             f"URL is {len(url)} chars — browser may truncate. "
-            "Consider splitting into smaller batches."
+            "Use generate_cart_urls to split it into batches."
         )
     return result
 
@@ -77,7 +103,76 @@ def generate_cart_url(parts: list[dict], new_cart: bool = True) -> dict:
 mcp.tool()(generate_cart_url)
 
 
-def create_mylist_link(list_name: str, parts: list[dict], tags: str | None = None) -> dict:
+def _pack_cart_parts(parts: list[dict], max_length: int, new_cart: bool, base_url: str = FASTADD_BASE) -> list[list[int]]:
+    """Split part indexes into consecutive batches whose FastAdd URLs fit max_length.
+
+    Each part's query fragment length is computed once from its encoded
+    values; only the digits of its position in the batch vary, so packing is
+    linear in the number of parts.
+    """
+    base = len(base_url) + 1  # "?"
+    newcart = len("&newcart=true")
+    batches: list[list[int]] = []
+    batch: list[int] = []
+    length = base
+
+    for index, part in enumerate(parts):
+        encoded = len(quote_plus(str(part["part_number"]))) + len(quote_plus(str(part["quantity"])))
+        cref = part.get("customer_ref")
+        fixed = len("&part=&qty=") + encoded
+        refs = 2
+        if cref:
+            fixed += len("&cref=") + len(quote_plus(str(cref)))
+            refs = 3
+
+        position = len(batch) + 1
+        fragment = fixed + refs * len(str(position)) - (0 if batch else 1)  # first param has no "&"
+        extra = newcart if new_cart and not batches else 0
+        if batch and length + fragment + extra > max_length:
+            batches.append(batch)
+            batch, length = [], base
+            fragment = fixed + refs - 1  # position 1, no "&"
+        batch.append(index)
+        length += fragment
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def generate_cart_urls(parts: list[dict], new_cart: bool = True, max_url_length: int = MAX_CART_URL_LENGTH, site: str | None = None) -> dict:
+    """Generate as few DigiKey FastAdd URLs as needed to add a large parts list to the cart.
+
+    Parts keep their order and customer references and are packed into
+    consecutive batches whose URLs stay within max_url_length. Open the URLs
+    in order: only the first one clears the cart when new_cart is set.
+
+    Args:
+        parts: Parts as for generate_cart_url
+        new_cart: If True, the first URL clears the existing cart (default: True)
+        max_url_length: Maximum characters per URL (default: 1700)
+        site: DigiKey site for the URLs, e.g. "DE" (default: DIGIKEY_LOCALE_SITE)
+
+    Returns:
+        Dict with 'urls' and 'batches' (url, parts count and first/last line
+        number per URL). Adds 'warning' if a single part exceeds the limit.
+    """
+    result = {"urls": [], "batches": []}
+    oversize = []
+    for n, indexes in enumerate(_pack_cart_parts(parts, max_url_length, new_cart, _fastadd_base(site))):
+        url = generate_cart_url([parts[i] for i in indexes], new_cart=new_cart and n == 0, site=site)["url"]
+        if len(url) > max_url_length:
+            oversize.append(indexes[0] + 1)
+        result["urls"].append(url)
+        result["batches"].append({"url": url, "parts": len(indexes), "first_line": indexes[0] + 1, "last_line": indexes[-1] + 1})
+    if oversize:
+        result["warning"] = f"Lines {oversize} alone exceed {max_url_length} chars; their URLs may be truncated."
+    return result
+
+
+mcp.tool()(generate_cart_urls)
+
+
+async def create_mylist_link(list_name: str, parts: list[dict], tags: str | None = None, site: str | None = None) -> dict:
     """Create a DigiKey MyList import link via the third-party API.
 
     Returns a single-use URL. When the user opens it, the parts are
@@ -92,6 +187,7 @@ def create_mylist_link(list_name: str, parts: list[dict], tags: str | None = Non
             - notes (str, optional): Additional notes
             - manufacturer (str, optional): Manufacturer name
         tags: Optional comma-separated tags (e.g., "KiCad,ProjectX")
+        site: DigiKey site whose MyLists to import into, e.g. "DE" (default: DIGIKEY_LOCALE_SITE)
 
     Returns:
         Dict with 'url' key containing the single-use import URL,
@@ -101,33 +197,60 @@ def create_mylist_link(list_name: str, parts: list[dict], tags: str | None = Non
     if tags:
         params["tags"] = tags
 
-    url = f"{MYLIST_THIRDPARTY_URL}?{urlencode(params)}"
-
-    payload = []
-    for part in parts:
-        payload.append({
-            "requestedPartNumber": part["part_number"],
-            "manufacturerName": part.get("manufacturer", ""),
-            "referenceDesignator": part.get("reference", ""),
-            "customerReference": part.get("customer_ref", ""),
-            "notes": part.get("notes", ""),
-            "quantities": [{"quantity": part["quantity"]}],
-        })
-
-    headers = {
-        "Content-Type": "application/json",
-        "User-Agent": "digikey-mcp/0.2.0",
-    }
+    url = f"{_mylist_api(site)}?{urlencode(params)}"
+
+    payload = [_mylist_entry(part) for part in parts]
 
-    logger.info(f"Creating MyList link: {list_name} with {len(parts)} parts")
-    resp = requests.post(url, json=payload, headers=headers)
+    logger.info("Creating MyList link: %s with %s parts", list_name, len(parts))
+    resp = await digikey_http.arequest("POST", url, json=payload, headers=_MYLIST_HEADERS)
 
     if resp.status_code != 200:
-        logger.error(f"MyList API error: {resp.status_code} - {resp.text}")
-        if "text/html" in resp.headers.get("Content-Type", ""):
+        logger.error("MyList API error: %s - %s", resp.status_code, resp.text)
+        if _is_blocked(resp):
             return {"error": "Request blocked (likely Cloudflare WAF). Try again later."}
         resp.raise_for_status()
 
+    return _mylist_url(resp)
+
+
+mcp.tool()(create_mylist_link)
+
+
+def _mylist_entry(part: dict) -> dict:
+    return {
+        "requestedPartNumber": part["part_number"],
+        "manufacturerName": part.get("manufacturer", ""),
+        "referenceDesignator": part.get("reference", ""),
+        "customerReference": part.get("customer_ref", ""),
+        "notes": part.get("notes", ""),
+        "quantities": [{"quantity": part["quantity"]}],
+    }
+
+
+def _mylist_body(parts: list[dict]) -> bytes:
+    """JSON array of MyList entries as one bytes body.
+
+    Entries are serialized one at a time, so no list of payload dicts is
+    built, but the fragments and the joined body are held in memory: the
+    body is sent with a Content-Length (the endpoint sits behind a WAF) and
+    reused unchanged for every retry of the chunk.
+    """
+    def fragments():
+        yield b"["
+        for i, part in enumerate(parts):
+            if i:
+                yield b","
+            yield json.dumps(_mylist_entry(part), separators=(",", ":")).encode()
+        yield b"]"
+
+    return b"".join(fragments())
+
+
+def _is_blocked(resp) -> bool:
+    return "text/html" in resp.headers.get("Content-Type", "")
+
+
+def _mylist_url(resp) -> dict:
     result = resp.json()
     # API returns a plain JSON string (the URL), not an object
     if isinstance(result, str):
@@ -135,4 +258,81 @@ def create_mylist_link(list_name: str, parts: list[dict], tags: str | None = Non
     return {"url": result.get("singleUseUrl", str(result))}
 
 
-mcp.tool()(create_mylist_link)
+async def _post_mylist_chunk(list_name: str, parts: list[dict], tags: str | None, max_retries: int, site: str | None = None) -> dict:
+    """POST one chunk, retrying 429/5xx, WAF blocks and transport errors with jittered backoff."""
+    params = {"listName": list_name}
+    if tags:
+        params["tags"] = tags
+    url = f"{_mylist_api(site)}?{urlencode(params)}"
+    body = _mylist_body(parts)
+
+    attempt = 0
+    while True:
+        retry_after = None
+        try:
+            resp = await digikey_http.arequest(
+                "POST", url, content=body, headers=_MYLIST_HEADERS, timeout=MYLIST_CHUNK_TIMEOUT
+            )
+            if resp.status_code == 200:
+                return _mylist_url(resp)
+            if resp.status_code not in RETRY_STATUSES and not _is_blocked(resp):
+                return {"error": f"MyList API error {resp.status_code}: {resp.text[:200]}"}
+            error = "Request blocked (likely Cloudflare WAF)" if _is_blocked(resp) else f"MyList API error {resp.status_code}"
+            retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+        except httpx.TransportError as e:
+            error = f"{type(e).__name__}: {e}"
+
+        if attempt >= max_retries:
+            return {"error": error}
+        delay = max(random.uniform(0, min(MYLIST_BACKOFF_CAP, MYLIST_BACKOFF_BASE * 2 ** attempt)), retry_after or 0.0)
+        attempt += 1
+        logger.warning("MyList chunk %s failed (%s), retry %s/%s in %.2fs", list_name, error, attempt, max_retries, delay)
+        await asyncio.sleep(delay)
+
+
+async def create_mylist_links(list_name: str, parts: list[dict], tags: str | None = None, chunk_size: int = 100, max_concurrency: int = 4, max_retries: int = 3, site: str | None = None, ctx: Context | None = None) -> dict:
+    """Create DigiKey MyList import links for a large parts list, split into chunks.
+
+    Each chunk becomes its own list ("<list_name> (2/5)") and is sent
+    concurrently; failed chunks are retried with backoff without resending
+    the others. Progress is reported per finished chunk.
+
+    Args:
+        list_name: Base name for the new lists
+        parts: Parts as for create_mylist_link
+        tags: Optional comma-separated tags applied to every list
+        chunk_size: Parts per list (default: 100)
+        max_concurrency: Maximum chunk requests in flight (default: 4)
+        max_retries: Retries per chunk for 429/5xx, WAF blocks and network errors (default: 3)
+        site: DigiKey site whose MyLists to import into, e.g. "DE" (default: DIGIKEY_LOCALE_SITE)
+
+    Returns:
+        Dict with 'lists' (one entry per chunk with 'url' or 'error'),
+        'urls' of the successful chunks, and 'failed' chunk count.
+    """
+    chunk_size = max(1, chunk_size)
+    chunks = [parts[i:i + chunk_size] for i in range(0, len(parts), chunk_size)]
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    results: list[dict | None] = [None] * len(chunks)
+    done = 0
+
+    async def send(index: int):
+        nonlocal done
+        name = list_name if len(chunks) == 1 else f"{list_name} ({index + 1}/{len(chunks)})"
+        async with semaphore:
+            result = await _post_mylist_chunk(name, chunks[index], tags, max_retries, site)
+        results[index] = {"chunk": index + 1, "list_name": name, "parts": len(chunks[index]), **result}
+        done += 1
+        if ctx is not None:
+            await ctx.report_progress(done, len(chunks), f"Created {name}" if "url" in result else f"Failed {name}")
+
+    logger.info("Creating %s MyList links for %s parts", len(chunks), len(parts))
+    await asyncio.gather(*(send(i) for i in range(len(chunks))))
+    return {
+        "lists": results,
+        "urls": [r["url"] for r in results if "url" in r],
+        "failed": sum(1 for r in results if "error" in r),
+    }
+
+
+mcp.tool()(create_mylist_links)
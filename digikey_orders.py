@@ -0,0 +1,277 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Callable
+
+# Local copy of the account's order history, synced from list_orders and
+# get_order_status, so dashboards and agents can filter and aggregate orders
+# ("still open", "spend this quarter") with one local query instead of listing
+# orders and fetching each one again.
+#
+# Closed orders never change upstream: once their details are stored they are
+# served from here permanently. Open orders are re-fetched when their stored
+# details are older than the poll interval.
+
+# Status values (lower case) after which an order no longer changes. Shipped
+# orders are still in transit (and turn into Delivered), so they stay open.
+CLOSED_STATUSES = {"delivered", "closed", "canceled", "cancelled"}
+
+# group_by value -> SQL expression over the orders table (o) and line items (li)
+_GROUPS = {
+    "status": "o.status",
+    "month": "substr(o.date_entered, 1, 7)",
+    "quarter": "substr(o.date_entered, 1, 4) || '-Q' || ((CAST(substr(o.date_entered, 6, 2) AS INTEGER) + 2) / 3)",
+    "year": "substr(o.date_entered, 1, 4)",
+    "part_number": "li.digikey_part_number",
+    "manufacturer_part_number": "li.manufacturer_part_number",
+}
+
+
+def order_id(order: dict) -> int | None:
+    """Sales order ID of an order header or detail response."""
+    value = order.get("SalesOrderId") or order.get("OrderNumber")
+    return int(value) if value is not None else None
+
+
+def order_status(order: dict) -> str | None:
+    status = order.get("Status")
+    if isinstance(status, dict):
+        return status.get("SalesOrderStatus") or status.get("ShortDescription") or status.get("OrderStatus")
+    return status
+
+
+def is_closed(status: str | None) -> bool:
+    return status is not None and status.lower() in CLOSED_STATUSES
+
+
+def _line_total(item: dict) -> float:
+    total = item.get("TotalPrice", item.get("ExtendedPrice"))
+    if total is not None:
+        return float(total)
+    return float(item.get("UnitPrice") or 0) * (item.get("QuantityOrdered") or item.get("Quantity") or 0)
+
+
+class OrderStore:
+    """SQLite store of order headers, details and line items.
+
+    Args:
+        path: Database file path, or ":memory:" for a per-process store
+        clock: Wall-clock time source (injectable for tests)
+    """
+
+    def __init__(self, path: str = ":memory:", clock: Callable[[], float] = time.time):
+        self.path = path
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS orders ("
+            " sales_order_id INTEGER PRIMARY KEY, date_entered TEXT, status TEXT, closed INTEGER NOT NULL,"
+            " currency TEXT, total REAL, line_count INTEGER, header TEXT, detail TEXT,"
+            " listed_at REAL, detail_at REAL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS line_items ("
+            " sales_order_id INTEGER NOT NULL, digikey_part_number TEXT, manufacturer_part_number TEXT,"
+            " quantity_ordered INTEGER, quantity_shipped INTEGER, unit_price REAL, total_price REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS line_items_order ON line_items (sales_order_id)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS orders_date ON orders (date_entered)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT)")
+
+    # -- writes -------------------------------------------------------------
+
+    def upsert_headers(self, orders: list[dict]) -> None:
+        """Store order headers from a list_orders page. Stored details are kept."""
+        now = self._clock()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for order in orders:
+                    oid = order_id(order)
+                    if oid is None:
+                        continue
+                    status = order_status(order)
+                    self._conn.execute(
+                        "INSERT INTO orders (sales_order_id, date_entered, status, closed, currency, header, listed_at)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?)"
+                        " ON CONFLICT (sales_order_id) DO UPDATE SET"
+                        " date_entered = COALESCE(excluded.date_entered, date_entered),"
+                        " status = COALESCE(excluded.status, status),"
+                        " closed = MAX(closed, excluded.closed),"
+                        " currency = COALESCE(excluded.currency, currency),"
+                        " header = excluded.header, listed_at = excluded.listed_at",
+                        (oid, order.get("DateEntered"), status, int(is_closed(status)),
+                         order.get("Currency"), json.dumps(order, separators=(",", ":")), now),
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def upsert_detail(self, detail: dict) -> None:
+        """Store a get_order_status response and replace the order's line items."""
+        oid = order_id(detail)
+        if oid is None:
+            return
+        status = order_status(detail)
+        items = detail.get("LineItems") or []
+        now = self._clock()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "INSERT INTO orders (sales_order_id, date_entered, status, closed, currency, total, line_count, detail, detail_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT (sales_order_id) DO UPDATE SET"
+                    " date_entered = COALESCE(excluded.date_entered, date_entered),"
+                    " status = COALESCE(excluded.status, status), closed = excluded.closed,"
+                    " currency = COALESCE(excluded.currency, currency), total = excluded.total,"
+                    " line_count = excluded.line_count, detail = excluded.detail, detail_at = excluded.detail_at",
+                    (oid, detail.get("DateEntered"), status, int(is_closed(status)), detail.get("Currency"),
+                     round(sum(_line_total(i) for i in items), 4), len(items),
+                     json.dumps(detail, separators=(",", ":")), now),
+                )
+                self._conn.execute("DELETE FROM line_items WHERE sales_order_id = ?", (oid,))
+                self._conn.executemany(
+                    "INSERT INTO line_items VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(oid, i.get("DigiKeyProductNumber"), i.get("ManufacturerProductNumber"),
+                      i.get("QuantityOrdered") or i.get("Quantity"), i.get("QuantityShipped"),
+                      i.get("UnitPrice"), _line_total(i)) for i in items],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def set_state(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO sync_state VALUES (?, ?)", (key, json.dumps(value)))
+
+    def get_state(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def clear(self) -> None:
+        with self._lock:
+            for table in ("orders", "line_items", "sync_state"):
+                self._conn.execute(f"DELETE FROM {table}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # -- reads --------------------------------------------------------------
+
+    def closed_detail(self, sales_order_id: int) -> dict | None:
+        """Stored details of a closed order (which no longer change), else None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT detail FROM orders WHERE sales_order_id = ? AND closed = 1 AND detail IS NOT NULL",
+                (sales_order_id,),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def due_for_detail(self, poll_interval: float) -> list[int]:
+        """Orders whose details were never fetched, or are open and older than poll_interval."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT sales_order_id FROM orders WHERE detail IS NULL OR (closed = 0 AND detail_at < ?)",
+                (self._clock() - poll_interval,),
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def _where(self, status: str | None, open_only: bool, start_date: str | None, end_date: str | None, part_number: str | None) -> tuple[str, list]:
+        clauses, params = [], []
+        if status:
+            clauses.append("lower(o.status) = lower(?)")
+            params.append(status)
+        if open_only:
+            clauses.append("o.closed = 0")
+        if start_date:
+            clauses.append("o.date_entered >= ?")
+            params.append(start_date)
+        if end_date:
+            # Dates may carry a time component; compare against the end of the day
+            clauses.append("substr(o.date_entered, 1, 10) <= ?")
+            params.append(end_date)
+        if part_number:
+            clauses.append(
+                "o.sales_order_id IN (SELECT sales_order_id FROM line_items"
+                " WHERE digikey_part_number = ? OR manufacturer_part_number = ?)"
+            )
+            params += [part_number, part_number]
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(
+        self,
+        status: str | None = None,
+        open_only: bool = False,
+        start_date: str | None = None,
+        end_date: str | None = None,
+        part_number: str | None = None,
+        limit: int = 100,
+    ) -> dict:
+        """Matching orders (newest first, up to limit) and totals over all matches."""
+        where, params = self._where(status, open_only, start_date, end_date, part_number)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT sales_order_id, date_entered, status, closed, currency, total, line_count"
+                f" FROM orders o{where} ORDER BY o.date_entered DESC, o.sales_order_id DESC LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+            count, spend = self._conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(o.total), 0) FROM orders o{where}", params
+            ).fetchone()
+        orders = [
+            {"SalesOrderId": r[0], "DateEntered": r[1], "Status": r[2], "Closed": bool(r[3]),
+             "Currency": r[4], "Total": r[5], "LineItemCount": r[6]}
+            for r in rows
+        ]
+        return {"orders": orders, "matched": count, "total_spend": round(spend, 2)}
+
+    def aggregate(
+        self,
+        group_by: str,
+        status: str | None = None,
+        open_only: bool = False,
+        start_date: str | None = None,
+        end_date: str | None = None,
+        part_number: str | None = None,
+    ) -> list[dict]:
+        """Order count, spend and ordered quantity per group (see _GROUPS)."""
+        if group_by not in _GROUPS:
+            raise ValueError(f"group_by must be one of {sorted(_GROUPS)}")
+        where, params = self._where(status, open_only, start_date, end_date, part_number)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_GROUPS[group_by]} AS grp, COUNT(DISTINCT o.sales_order_id),"
+                " COALESCE(SUM(li.total_price), 0), COALESCE(SUM(li.quantity_ordered), 0)"
+                f" FROM orders o LEFT JOIN line_items li ON li.sales_order_id = o.sales_order_id{where}"
+                " GROUP BY grp ORDER BY grp",
+                params,
+            ).fetchall()
+        return [
+            {group_by: r[0], "orders": r[1], "spend": round(r[2], 2), "quantity": r[3]}
+            for r in rows
+        ]
+
+    def stats(self) -> dict:
+        with self._lock:
+            total, closed, detailed = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(closed), 0), COUNT(detail) FROM orders"
+            ).fetchone()
+        return {
+            "path": self.path,
+            "orders": total,
+            "closed": closed,
+            "open": total - closed,
+            "with_details": detailed,
+            "last_sync": self.get_state("last_sync"),
+        }
@@ -0,0 +1,227 @@
+import sqlite3
+import threading
+import time
+from typing import Callable, Iterable
+
+from digikey_index import MANUFACTURER_ALIASES, normalize
+
+# Memo of manufacturer part number -> DigiKey part numbers, learned from every
+# product record the API returns (keyword_search results, product_details), so
+# an MPN resolved once is never searched for again: resolve_part_numbers
+# answers from here, get_digi_reel_pricing finds the Digi-Reel variant of an
+# MPN, and BOM cart URLs get DigiKey part numbers for MPN-only lines.
+#
+# Entries are keyed by (MPN, manufacturer); an MPN made by several
+# manufacturers is ambiguous until a manufacturer is given. Invalidation:
+# - every fresh response for a product replaces its variants
+# - entries older than max_age are dropped when looked up
+# - callers drop an entry when a DigiKey part number from it returns 404
+# - the least recently used entries beyond max_entries are evicted
+
+
+def _part_key(part_number: str) -> str:
+    return part_number.strip().upper()
+
+
+def is_digi_reel(variant: dict) -> bool:
+    return "digi-reel" in (variant.get("package_type") or "").lower()
+
+
+def preferred_variant(match: dict, digi_reel: bool = False) -> dict | None:
+    """The Digi-Reel variant, or else the variant with the lowest minimum quantity (usually Cut Tape)."""
+    variants = [v for v in match["variants"] if is_digi_reel(v) == digi_reel]
+    return min(variants, key=lambda v: v["minimum_quantity"] or 1, default=None)
+
+
+class PartMemo:
+    """SQLite store of product identities (MPN, manufacturer) and their DigiKey variants.
+
+    Args:
+        path: Database file path, or ":memory:" for a per-process memo
+        max_entries: Products kept (least recently used are evicted)
+        max_age: Seconds after which a learned product must be learned again
+        clock: Wall-clock time source (injectable for tests)
+    """
+
+    def __init__(self, path: str = ":memory:", max_entries: int = 50_000, max_age: float = 30 * 86400, clock: Callable[[], float] = time.time):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._clock = clock
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS products ("
+            " mpn_key TEXT NOT NULL, manufacturer_key TEXT NOT NULL, mpn TEXT NOT NULL, manufacturer TEXT,"
+            " manufacturer_id INTEGER, status TEXT, learned_at REAL NOT NULL, used_at REAL NOT NULL,"
+            " PRIMARY KEY (mpn_key, manufacturer_key))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS variants ("
+            " part_key TEXT PRIMARY KEY, digikey_part_number TEXT NOT NULL, mpn_key TEXT NOT NULL,"
+            " manufacturer_key TEXT NOT NULL, package_type TEXT, minimum_quantity INTEGER)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS variants_product ON variants (mpn_key, manufacturer_key)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS products_used ON products (used_at)")
+
+    # -- writes -------------------------------------------------------------
+
+    def learn(self, products: Iterable[dict]) -> int:
+        """Store the identity and variants of DigiKey product records. Returns the number stored."""
+        now = self._clock()
+        learned = 0
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for product in products:
+                    mpn = product.get("ManufacturerProductNumber")
+                    variants = [
+                        v for v in product.get("ProductVariations") or [] if v.get("DigiKeyProductNumber")
+                    ]
+                    if not mpn or not variants:
+                        continue
+                    manufacturer = product.get("Manufacturer") or {}
+                    key = (_part_key(mpn), normalize(manufacturer.get("Name") or "", strip_suffixes=True))
+                    self._conn.execute(
+                        "INSERT INTO products (mpn_key, manufacturer_key, mpn, manufacturer, manufacturer_id,"
+                        " status, learned_at, used_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+                        " ON CONFLICT (mpn_key, manufacturer_key) DO UPDATE SET"
+                        " mpn = excluded.mpn, manufacturer = excluded.manufacturer,"
+                        " manufacturer_id = excluded.manufacturer_id, status = excluded.status,"
+                        " learned_at = excluded.learned_at",
+                        (*key, mpn, manufacturer.get("Name"), manufacturer.get("Id"),
+                         (product.get("ProductStatus") or {}).get("Status"), now, now),
+                    )
+                    # Packaging options come and go: the latest record replaces them
+                    self._conn.execute("DELETE FROM variants WHERE mpn_key = ? AND manufacturer_key = ?", key)
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO variants (part_key, digikey_part_number, mpn_key, manufacturer_key,"
+                        " package_type, minimum_quantity) VALUES (?, ?, ?, ?, ?, ?)",
+                        [
+                            (_part_key(v["DigiKeyProductNumber"]), v["DigiKeyProductNumber"], *key,
+                             (v.get("PackageType") or {}).get("Name"), v.get("MinimumOrderQuantity"))
+                            for v in variants
+                        ],
+                    )
+                    learned += 1
+                if learned:
+                    self._evict(self._conn.execute(
+                        "SELECT mpn_key, manufacturer_key FROM products ORDER BY used_at DESC LIMIT -1 OFFSET ?",
+                        (self.max_entries,),
+                    ).fetchall())
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return learned
+
+    def _evict(self, keys: list[tuple]) -> None:
+        self._conn.executemany("DELETE FROM products WHERE mpn_key = ? AND manufacturer_key = ?", keys)
+        self._conn.executemany("DELETE FROM variants WHERE mpn_key = ? AND manufacturer_key = ?", keys)
+
+    def invalidate(self, part_number: str, manufacturer: str | None = None) -> int:
+        """Forget the products an MPN or DigiKey part number maps to. Returns the number forgotten."""
+        with self._lock:
+            keys = self._keys(part_number, manufacturer)
+            self._evict(keys)
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            for table in ("products", "variants"):
+                self._conn.execute(f"DELETE FROM {table}")
+            self._hits = self._misses = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # -- reads --------------------------------------------------------------
+
+    def _keys(self, part_number: str, manufacturer: str | None) -> list[tuple]:
+        part_key = _part_key(part_number)
+        rows = self._conn.execute(
+            "SELECT mpn_key, manufacturer_key FROM variants WHERE part_key = ?", (part_key,)
+        ).fetchall()
+        if not rows:
+            rows = self._conn.execute(
+                "SELECT mpn_key, manufacturer_key FROM products WHERE mpn_key = ?", (part_key,)
+            ).fetchall()
+        if manufacturer:
+            wanted = normalize(manufacturer, strip_suffixes=True)
+            wanted = MANUFACTURER_ALIASES.get(wanted, wanted)
+            rows = [r for r in rows if r[1] == wanted or r[1].startswith(wanted + " ")]
+        return rows
+
+    def lookup(self, part_number: str, manufacturer: str | None = None) -> list[dict]:
+        """Products an MPN (or one of their DigiKey part numbers) maps to, with their variants.
+
+        More than one match means the MPN is made by several manufacturers;
+        pass `manufacturer` to choose. Expired entries are dropped.
+
+        Returns:
+            List of {"manufacturer_part_number", "manufacturer", "manufacturer_id",
+            "status", "learned_at", "variants": [{"digikey_part_number",
+            "package_type", "minimum_quantity"}]}
+        """
+        now = self._clock()
+        matches = []
+        with self._lock:
+            keys = self._keys(part_number, manufacturer)
+            expired = []
+            for key in keys:
+                row = self._conn.execute(
+                    "SELECT mpn, manufacturer, manufacturer_id, status, learned_at FROM products"
+                    " WHERE mpn_key = ? AND manufacturer_key = ?", key,
+                ).fetchone()
+                if row is None:
+                    continue
+                if row[4] < now - self.max_age:
+                    expired.append(key)
+                    continue
+                variants = self._conn.execute(
+                    "SELECT digikey_part_number, package_type, minimum_quantity FROM variants"
+                    " WHERE mpn_key = ? AND manufacturer_key = ? ORDER BY minimum_quantity, digikey_part_number", key,
+                ).fetchall()
+                matches.append({
+                    "manufacturer_part_number": row[0], "manufacturer": row[1], "manufacturer_id": row[2],
+                    "status": row[3], "learned_at": row[4],
+                    "variants": [{"digikey_part_number": v[0], "package_type": v[1], "minimum_quantity": v[2]} for v in variants],
+                })
+                self._conn.execute(
+                    "UPDATE products SET used_at = ? WHERE mpn_key = ? AND manufacturer_key = ?", (now, *key)
+                )
+            if expired:
+                self._evict(expired)
+            if matches:
+                self._hits += 1
+            else:
+                self._misses += 1
+        return matches
+
+    def digikey_part_number(self, part_number: str, manufacturer: str | None = None, digi_reel: bool = False) -> str | None:
+        """The DigiKey part number to order an unambiguous MPN by (see preferred_variant), or None."""
+        matches = self.lookup(part_number, manufacturer)
+        if len(matches) != 1:
+            return None
+        for variant in matches[0]["variants"]:
+            if _part_key(variant["digikey_part_number"]) == _part_key(part_number) and is_digi_reel(variant) == digi_reel:
+                return variant["digikey_part_number"]  # already the DigiKey part number wanted
+        variant = preferred_variant(matches[0], digi_reel)
+        return variant["digikey_part_number"] if variant else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            products = self._conn.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+            variants = self._conn.execute("SELECT COUNT(*) FROM variants").fetchone()[0]
+            hits, misses = self._hits, self._misses
+        return {
+            "path": self.path, "products": products, "variants": variants, "max_entries": self.max_entries,
+            "max_age": self.max_age, "hits": hits, "misses": misses,
+        }
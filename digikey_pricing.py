@@ -0,0 +1,151 @@
+import bisect
+import math
+
+# Local purchase-quantity optimization over DigiKey price-break tables.
+#
+# A product's packaging options (Cut Tape, Tape & Reel, Digi-Reel, ...) are
+# normalized once from a pricing response; every cost question after that
+# ("what does N cost", "what is the cheapest way to get N", "how many more to
+# reach the next break") is answered from the break tables without API calls.
+
+
+def _is_digi_reel(package_type: str | None) -> bool:
+    return "digi-reel" in (package_type or "").lower()
+
+
+def _is_full_reel(package_type: str | None) -> bool:
+    return (package_type or "").lower().startswith("tape & reel")
+
+
+def packaging_options(pricing: dict, digi_reel_fee: float | None = None) -> list[dict]:
+    """Normalize the variations of a get_product_pricing response into options.
+
+    Each option has the DigiKey part number, package type, sorted break
+    quantities and unit prices (customer pricing when present), minimum order
+    quantity, order multiple (full reels only come in whole reels), per-order
+    fee (Digi-Reel reeling fee) and stock. Digi-Reel variations without a known
+    fee are skipped.
+    """
+    options = []
+    for product in pricing.get("ProductPricings") or []:
+        for v in product.get("ProductVariations") or []:
+            breaks = v.get("MyPricing") or v.get("StandardPricing") or []
+            if not breaks:
+                continue
+            breaks = sorted(breaks, key=lambda b: b["BreakQuantity"])
+            package_type = (v.get("PackageType") or {}).get("Name")
+            fee = 0.0
+            if _is_digi_reel(package_type):
+                fee = v.get("DigiReelFee") if v.get("DigiReelFee") is not None else digi_reel_fee
+                if fee is None:
+                    continue
+            multiple = (v.get("StandardPackage") or 1) if _is_full_reel(package_type) else 1
+            options.append({
+                "digikey_part_number": v.get("DigiKeyProductNumber"),
+                "package_type": package_type,
+                "break_quantities": [b["BreakQuantity"] for b in breaks],
+                "unit_prices": [b["UnitPrice"] for b in breaks],
+                "minimum_quantity": max(v.get("MinimumOrderQuantity") or 1, breaks[0]["BreakQuantity"]),
+                "multiple": max(1, multiple),
+                "fee": fee,
+                "quantity_available": v.get("QuantityAvailableforPackageType", product.get("QuantityAvailable")),
+            })
+        if options:
+            break  # first matching product only
+    return options
+
+
+def orderable(option: dict, quantity: int) -> int:
+    """Smallest quantity >= `quantity` this option can be ordered in."""
+    quantity = max(quantity, option["minimum_quantity"])
+    return math.ceil(quantity / option["multiple"]) * option["multiple"]
+
+
+def unit_price(option: dict, quantity: int) -> float:
+    """Unit price at `quantity` (largest break not above it)."""
+    i = bisect.bisect_right(option["break_quantities"], quantity) - 1
+    return option["unit_prices"][max(i, 0)]
+
+
+def cost(option: dict, quantity: int) -> float:
+    return quantity * unit_price(option, quantity) + option["fee"]
+
+
+def _line(option: dict, quantity: int) -> dict:
+    return {
+        "digikey_part_number": option["digikey_part_number"],
+        "package_type": option["package_type"],
+        "quantity": quantity,
+        "unit_price": unit_price(option, quantity),
+        "fee": option["fee"],
+        "cost": round(cost(option, quantity), 4),
+        "quantity_available": option["quantity_available"],
+    }
+
+
+def best_single(option: dict, quantity: int) -> tuple[float, int]:
+    """Cheapest (cost, order quantity) for at least `quantity` from one option.
+
+    Candidates are the orderable quantity itself and every break above it:
+    buying up to a break can cost less in total than buying exactly what is
+    needed.
+    """
+    start = orderable(option, quantity)
+    i = bisect.bisect_right(option["break_quantities"], start)
+    candidates = [start] + [orderable(option, b) for b in option["break_quantities"][i:]]
+    return min((cost(option, n), n) for n in candidates)
+
+
+def optimize(options: list[dict], quantity: int) -> dict | None:
+    """Minimum-cost plan for `quantity` across packaging options.
+
+    Considers every option on its own (including rounding up to a cheaper
+    break) and full reels topped up with the cheapest option for the
+    remainder. Returns None if there are no options.
+    """
+    if not options:
+        return None
+    plans = []
+    for option in options:
+        total, n = best_single(option, quantity)
+        plans.append((total, [(option, n)]))
+
+    loose = [o for o in options if o["multiple"] == 1]
+    for reel in options:
+        reels = quantity // reel["multiple"] * reel["multiple"]
+        remainder = quantity - reels
+        if reel["multiple"] == 1 or reels < reel["minimum_quantity"] or not remainder or not loose:
+            continue
+        rest_cost, rest_n, rest_option = min(
+            (best_single(o, remainder) + (o,) for o in loose), key=lambda r: r[:2]
+        )
+        plans.append((cost(reel, reels) + rest_cost, [(reel, reels), (rest_option, rest_n)]))
+
+    total, parts = min(plans, key=lambda p: (p[0], sum(n for _, n in p[1])))
+    ordered = sum(n for _, n in parts)
+    naive = min(cost(o, orderable(o, quantity)) for o in options)
+    return {
+        "plan": [_line(o, n) for o, n in parts],
+        "order_quantity": ordered,
+        "surplus": ordered - quantity,
+        "total_cost": round(total, 4),
+        "effective_unit_price": round(total / quantity, 6) if quantity else None,
+        "cost_without_optimization": round(naive, 4),
+        "savings": round(naive - total, 4),
+        "next_break": next_break(parts[0][0], parts[0][1]),
+    }
+
+
+def next_break(option: dict, quantity: int) -> dict | None:
+    """The next price break above `quantity`: how many more to buy and what it costs."""
+    i = bisect.bisect_right(option["break_quantities"], quantity)
+    if i >= len(option["break_quantities"]):
+        return None
+    target = orderable(option, option["break_quantities"][i])
+    return {
+        "break_quantity": target,
+        "buy_more": target - quantity,
+        "unit_price": unit_price(option, target),
+        "cost": round(cost(option, target), 4),
+        "extra_cost": round(cost(option, target) - cost(option, quantity), 4),
+    }
@@ -0,0 +1,98 @@
+import os
+import re
+from typing import Mapping
+
+from digikey_auth import TokenManager
+from digikey_orders import OrderStore
+from digikey_ratelimit import RateLimiter
+
+# Credential profiles: several DigiKey API credential sets / customer accounts
+# served by one process. Each profile has its own token manager, rate-limit
+# budget and order history, and its responses are cached under its own
+# namespace. Tools pick a profile by name (`profile=`); without one they use
+# the default profile built from CLIENT_ID / CLIENT_SECRET / DIGIKEY_ACCOUNT_ID.
+#
+# Configuration (environment):
+#   DIGIKEY_PROFILES=acme,globex
+#   DIGIKEY_PROFILE_ACME_CLIENT_ID=...       (defaults to CLIENT_ID)
+#   DIGIKEY_PROFILE_ACME_CLIENT_SECRET=...   (defaults to CLIENT_SECRET)
+#   DIGIKEY_PROFILE_ACME_ACCOUNT_ID=...
+
+DEFAULT_PROFILE = "default"
+
+
+def _env_name(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]", "_", name).upper()
+
+
+def profiles_from_env(environ: Mapping[str, str] = os.environ) -> dict[str, dict]:
+    """Profile name -> {"client_id", "client_secret", "account_id"} from DIGIKEY_PROFILES."""
+    profiles = {}
+    for name in (environ.get("DIGIKEY_PROFILES") or "").split(","):
+        name = name.strip()
+        if not name or name == DEFAULT_PROFILE:
+            continue
+        prefix = f"DIGIKEY_PROFILE_{_env_name(name)}_"
+        profiles[name] = {
+            "client_id": environ.get(prefix + "CLIENT_ID") or environ.get("CLIENT_ID"),
+            "client_secret": environ.get(prefix + "CLIENT_SECRET") or environ.get("CLIENT_SECRET"),
+            "account_id": environ.get(prefix + "ACCOUNT_ID"),
+        }
+    return profiles
+
+
+def profile_store_path(path: str, name: str) -> str:
+    """Per-profile order store file next to `path` ("orders.db" -> "orders-acme.db")."""
+    if path == ":memory:" or name == DEFAULT_PROFILE:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}-{_env_name(name).lower()}{ext}"
+
+
+class Profile:
+    """One credential set with its own token, rate-limit budget and order store.
+
+    Args:
+        name: Profile name, used by tools' `profile` argument and as cache namespace
+        client_id: DigiKey API client ID
+        client_secret: DigiKey API client secret
+        account_id: DigiKey customer number (order tools, account pricing)
+        token_manager: Token cache for these credentials
+        rate_limiter: Request budget for this profile
+        order_store: Local order history for this account
+    """
+
+    def __init__(
+        self,
+        name: str,
+        client_id: str | None,
+        client_secret: str | None,
+        account_id: str | None,
+        token_manager: TokenManager,
+        rate_limiter: RateLimiter,
+        order_store: OrderStore,
+    ):
+        self.name = name
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.account_id = account_id
+        self.token_manager = token_manager
+        self.rate_limiter = rate_limiter
+        self.order_store = order_store
+
+    @property
+    def is_default(self) -> bool:
+        return self.name == DEFAULT_PROFILE
+
+    def cache_namespace(self) -> str:
+        """Prefix for cache and coalescing keys ("" for the default profile, keeping its keys unchanged)."""
+        return "" if self.is_default else f"{self.name}|"
+
+    def describe(self) -> dict:
+        return {
+            "name": self.name,
+            "client_id": f"{self.client_id[:6]}..." if self.client_id else None,
+            "account_id": self.account_id,
+            "token_refreshes": self.token_manager.refresh_count,
+            "orders": self.order_store.stats()["orders"],
+        }
@@ -0,0 +1,221 @@
+import asyncio
+import logging
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# DigiKey reports quota state on every response. Burst limits reset within a
+# minute; the daily limit resets at midnight (reset given in seconds).
+QUOTA_HEADERS = (
+    ("X-BurstLimit-Remaining", "X-BurstLimit-Reset"),
+    ("X-RateLimit-Remaining", "X-RateLimit-Reset"),
+)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Async token bucket. Callers wait for a token instead of being rejected.
+
+    Args:
+        rate: Tokens added per second
+        capacity: Maximum burst size
+        clock: Monotonic time source (injectable for tests)
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+        self._paused_until = 0.0
+        self.acquired = 0
+        self.queued = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def pause(self, seconds: float) -> None:
+        """Hold all callers for `seconds` (e.g. upstream says the quota is exhausted)."""
+        self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+    async def acquire(self) -> float:
+        """Wait for a token. Returns the time spent queued in seconds."""
+        start = self._clock()
+        slept = False
+        while True:
+            now = self._clock()
+            self._refill(now)
+            if self._paused_until > now:
+                wait = self._paused_until - now
+            elif self._tokens >= 1:
+                self._tokens -= 1
+                break
+            else:
+                wait = (1 - self._tokens) / self.rate
+            await asyncio.sleep(wait)
+            slept = True
+
+        waited = self._clock() - start if slept else 0.0
+        self.acquired += 1
+        if slept:
+            self.queued += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+        return waited
+
+    def stats(self) -> dict:
+        return {
+            "rate_per_minute": round(self.rate * 60, 2),
+            "capacity": self.capacity,
+            "acquired": self.acquired,
+            "queued": self.queued,
+            "total_wait_s": round(self.total_wait, 3),
+            "max_wait_s": round(self.max_wait, 3),
+            "avg_wait_s": round(self.total_wait / self.acquired, 4) if self.acquired else 0.0,
+        }
+
+
+class RetryBudget:
+    """Caps retries to a fraction of traffic so retries cannot amplify an outage.
+
+    Each request deposits `ratio` tokens (up to `maximum`); each retry
+    withdraws one. Starts with `minimum` tokens so idle servers can still retry.
+    """
+
+    def __init__(self, ratio: float = 0.2, minimum: float = 10.0, maximum: float = 100.0):
+        self.ratio = ratio
+        self.maximum = maximum
+        self.balance = minimum
+
+    def deposit(self) -> None:
+        self.balance = min(self.maximum, self.balance + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self.balance >= 1:
+            self.balance -= 1
+            return True
+        return False
+
+
+class RateLimiter:
+    """Client-side rate limiting with adaptive backoff for DigiKey API calls.
+
+    Requests are assigned to a budget by URL (order status vs. product search,
+    which DigiKey meters separately). 429 and 5xx responses are retried with
+    jittered exponential backoff, honoring Retry-After, as long as the retry
+    budget allows. Quota headers pause the whole budget when exhausted.
+
+    Args:
+        products_per_minute: Budget for the product search API
+        orders_per_minute: Budget for the order status API
+        max_retries: Retries per request for 429/5xx responses
+        backoff_base: First backoff step in seconds
+        backoff_cap: Maximum backoff in seconds
+    """
+
+    def __init__(
+        self,
+        products_per_minute: float = 120,
+        orders_per_minute: float = 120,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 30.0,
+    ):
+        self.buckets = {
+            "products": TokenBucket(products_per_minute / 60, max(1.0, products_per_minute / 6)),
+            "orders": TokenBucket(orders_per_minute / 60, max(1.0, orders_per_minute / 6)),
+        }
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.retry_budget = RetryBudget()
+        self.throttled = 0
+        self.server_errors = 0
+        self.retries = 0
+        self.retries_denied = 0
+
+    def budget_for(self, url: str) -> str:
+        return "orders" if urlsplit(url).path.startswith("/orderstatus") else "products"
+
+    def backoff(self, attempt: int, retry_after: float | None = None) -> float:
+        """Full-jitter exponential backoff, never shorter than Retry-After."""
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+        return max(delay, retry_after or 0.0)
+
+    def observe(self, bucket: TokenBucket, headers: httpx.Headers) -> None:
+        """Pause the bucket if DigiKey reports an exhausted quota."""
+        for remaining_header, reset_header in QUOTA_HEADERS:
+            remaining = headers.get(remaining_header)
+            reset = parse_retry_after(headers.get(reset_header))
+            if remaining is not None and reset and remaining.strip() == "0":
+                logger.warning("%s is 0, pausing requests for %.1fs", remaining_header, reset)
+                bucket.pause(min(reset, self.backoff_cap))
+
+    async def send(self, url: str, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        """Run `send` under the URL's budget, retrying throttled and 5xx responses."""
+        bucket = self.buckets[self.budget_for(url)]
+        self.retry_budget.deposit()
+        attempt = 0
+        while True:
+            await bucket.acquire()
+            resp = await send()
+            self.observe(bucket, resp.headers)
+            if resp.status_code not in RETRY_STATUSES:
+                return resp
+
+            retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+            if resp.status_code == 429:
+                self.throttled += 1
+                if retry_after:
+                    # Everyone sharing this budget would be throttled too
+                    bucket.pause(min(retry_after, self.backoff_cap))
+            else:
+                self.server_errors += 1
+
+            if attempt >= self.max_retries:
+                return resp
+            if not self.retry_budget.withdraw():
+                self.retries_denied += 1
+                logger.warning("Retry budget exhausted, not retrying %s for %s", resp.status_code, url)
+                return resp
+
+            delay = self.backoff(attempt, retry_after)
+            attempt += 1
+            self.retries += 1
+            logger.warning("Got %s, retry %s/%s in %.2fs", resp.status_code, attempt, self.max_retries, delay)
+            await asyncio.sleep(delay)
+
+    def stats(self) -> dict:
+        return {
+            "budgets": {name: bucket.stats() for name, bucket in self.buckets.items()},
+            "throttled": self.throttled,
+            "server_errors": self.server_errors,
+            "retries": self.retries,
+            "retries_denied": self.retries_denied,
+            "retry_budget": round(self.retry_budget.balance, 2),
+        }
@@ -0,0 +1,241 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Callable
+
+# Watchlist of critical parts: each watched part is polled in the background
+# and only its last snapshot (stock, status, price breaks) is kept. Differences
+# between consecutive snapshots are appended to a change feed, so agents read
+# "stock fell below 500" or "the 1000+ break went from 0.021 to 0.024" instead
+# of pulling full product documents again and comparing them themselves.
+#
+# The feed is ordered by a monotonically increasing change ID; readers pass the
+# last ID they saw as a cursor. Only the newest `max_changes` entries are kept.
+
+
+def snapshot(details: dict) -> dict:
+    """Stock, status and price breaks (per DigiKey part number) of a product_details response."""
+    product = details.get("Product", details)
+    return {
+        "stock": product.get("QuantityAvailable") or 0,
+        "status": (product.get("ProductStatus") or {}).get("Status"),
+        "prices": {
+            v["DigiKeyProductNumber"]: {
+                str(b["BreakQuantity"]): b["UnitPrice"] for b in v.get("StandardPricing") or []
+            }
+            for v in product.get("ProductVariations") or []
+            if v.get("DigiKeyProductNumber")
+        },
+    }
+
+
+def diff(old: dict, new: dict, stock_threshold: int | None = None, stock_change: float = 0.5) -> list[dict]:
+    """Changes between two snapshots.
+
+    Args:
+        old: Previous snapshot
+        new: Current snapshot
+        stock_threshold: Report stock crossing this level (in either direction)
+        stock_change: Otherwise report stock changes of at least this fraction,
+            and any change to or from zero
+
+    Returns:
+        List of {"kind", "old", "new", ...}; kind is stock_below_threshold,
+        stock_above_threshold, stock_changed, status_changed or price_changed
+        (with digikey_part_number and break_quantity; old/new None for added
+        or removed breaks).
+    """
+    changes = []
+    before, after = old["stock"], new["stock"]
+    if stock_threshold is not None and (before < stock_threshold) != (after < stock_threshold):
+        kind = "stock_below_threshold" if after < stock_threshold else "stock_above_threshold"
+        changes.append({"kind": kind, "old": before, "new": after, "threshold": stock_threshold})
+    elif before != after and (not before or not after or abs(after - before) >= stock_change * before):
+        changes.append({"kind": "stock_changed", "old": before, "new": after})
+    if old["status"] != new["status"]:
+        changes.append({"kind": "status_changed", "old": old["status"], "new": new["status"]})
+    for part in sorted(old["prices"].keys() | new["prices"].keys()):
+        was, now = old["prices"].get(part, {}), new["prices"].get(part, {})
+        for quantity in sorted(was.keys() | now.keys(), key=int):
+            if was.get(quantity) != now.get(quantity):
+                changes.append({
+                    "kind": "price_changed", "digikey_part_number": part, "break_quantity": int(quantity),
+                    "old": was.get(quantity), "new": now.get(quantity),
+                })
+    return changes
+
+
+class Watchlist:
+    """SQLite store of watched parts, their last snapshots and the change feed.
+
+    Args:
+        path: Database file path, or ":memory:" for a per-process watchlist
+        max_changes: Change feed entries kept (oldest are dropped)
+        clock: Wall-clock time source (injectable for tests)
+    """
+
+    def __init__(self, path: str = ":memory:", max_changes: int = 10_000, clock: Callable[[], float] = time.time):
+        self.path = path
+        self.max_changes = max_changes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS watches ("
+            " profile TEXT NOT NULL, part_number TEXT NOT NULL, customer_id TEXT NOT NULL,"
+            " stock_threshold INTEGER, snapshot TEXT, polled_at REAL, added_at REAL NOT NULL,"
+            " PRIMARY KEY (profile, part_number))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS changes ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, at REAL NOT NULL, profile TEXT NOT NULL,"
+            " part_number TEXT NOT NULL, kind TEXT NOT NULL, detail TEXT NOT NULL)"
+        )
+
+    # -- writes -------------------------------------------------------------
+
+    def add(self, profile: str, part_number: str, customer_id: str = "0", stock_threshold: int | None = None) -> bool:
+        """Watch a part (or update its settings, keeping its snapshot). Returns True if newly added."""
+        with self._lock:
+            existing = self._conn.execute(
+                "SELECT 1 FROM watches WHERE profile = ? AND part_number = ?", (profile, part_number)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT INTO watches (profile, part_number, customer_id, stock_threshold, added_at)"
+                " VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT (profile, part_number) DO UPDATE SET"
+                " customer_id = excluded.customer_id, stock_threshold = excluded.stock_threshold",
+                (profile, part_number, customer_id, stock_threshold, self._clock()),
+            )
+        return existing is None
+
+    def remove(self, profile: str, part_numbers: list[str]) -> int:
+        with self._lock:
+            return self._conn.executemany(
+                "DELETE FROM watches WHERE profile = ? AND part_number = ?", [(profile, p) for p in part_numbers]
+            ).rowcount
+
+    def record(self, profile: str, part_number: str, current: dict, stock_change: float = 0.5) -> list[dict]:
+        """Store a new snapshot and append its differences to the previous one to the feed.
+
+        The first snapshot of a part is its baseline and produces no changes.
+        Returns the appended changes (with their feed IDs).
+        """
+        now = self._clock()
+        appended = []
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT snapshot, stock_threshold FROM watches WHERE profile = ? AND part_number = ?",
+                (profile, part_number),
+            ).fetchone()
+            if row is None:  # unwatched while being polled
+                return []
+            self._conn.execute("BEGIN")
+            try:
+                if row[0] is not None:
+                    for change in diff(json.loads(row[0]), current, row[1], stock_change):
+                        cursor = self._conn.execute(
+                            "INSERT INTO changes (at, profile, part_number, kind, detail) VALUES (?, ?, ?, ?, ?)",
+                            (now, profile, part_number, change["kind"], json.dumps(change)),
+                        )
+                        appended.append({"id": cursor.lastrowid, "at": now, "part_number": part_number, "profile": profile, **change})
+                self._conn.execute(
+                    "UPDATE watches SET snapshot = ?, polled_at = ? WHERE profile = ? AND part_number = ?",
+                    (json.dumps(current, separators=(",", ":")), now, profile, part_number),
+                )
+                if appended:
+                    self._conn.execute(
+                        "DELETE FROM changes WHERE id <= (SELECT MAX(id) FROM changes) - ?", (self.max_changes,)
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return appended
+
+    def touch(self, profile: str, part_number: str) -> None:
+        """Mark a part as polled without a snapshot (failed poll), so it waits a full interval."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE watches SET polled_at = ? WHERE profile = ? AND part_number = ?",
+                (self._clock(), profile, part_number),
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            for table in ("watches", "changes"):
+                self._conn.execute(f"DELETE FROM {table}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # -- reads --------------------------------------------------------------
+
+    def due(self, poll_interval: float, limit: int) -> list[dict]:
+        """Up to `limit` parts never polled or last polled more than poll_interval ago, most overdue first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT profile, part_number, customer_id FROM watches"
+                " WHERE polled_at IS NULL OR polled_at < ?"
+                " ORDER BY polled_at IS NOT NULL, polled_at LIMIT ?",
+                (self._clock() - poll_interval, limit),
+            ).fetchall()
+        return [{"profile": r[0], "part_number": r[1], "customer_id": r[2]} for r in rows]
+
+    def entries(self, profile: str | None = None, part_numbers: list[str] | None = None) -> list[dict]:
+        """Watched parts (optionally of one profile / only these part numbers) with their last snapshot."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT profile, part_number, customer_id, stock_threshold, snapshot, polled_at FROM watches"
+                " WHERE ? IS NULL OR profile = ? ORDER BY profile, part_number",
+                (profile, profile),
+            ).fetchall()
+        wanted = set(part_numbers) if part_numbers is not None else None
+        return [
+            {"profile": r[0], "part_number": r[1], "customer_id": r[2], "stock_threshold": r[3],
+             "snapshot": json.loads(r[4]) if r[4] else None, "polled_at": r[5]}
+            for r in rows
+            if wanted is None or r[1] in wanted
+        ]
+
+    def changes(self, since: int = 0, limit: int = 100, profile: str | None = None, part_number: str | None = None) -> dict:
+        """Feed entries after change ID `since` (oldest first) and the cursor to pass next time."""
+        clauses, params = ["id > ?"], [since]
+        if profile is not None:
+            clauses.append("profile = ?")
+            params.append(profile)
+        if part_number is not None:
+            clauses.append("part_number = ?")
+            params.append(part_number)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, at, profile, part_number, detail FROM changes WHERE {' AND '.join(clauses)}"
+                " ORDER BY id LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+            latest = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM changes").fetchone()[0]
+        changes = [{"id": r[0], "at": r[1], "profile": r[2], "part_number": r[3], **json.loads(r[4])} for r in rows]
+        # A full page resumes after its last entry; otherwise everything up to now was seen
+        cursor = changes[-1]["id"] if len(changes) == limit else max(latest, since)
+        return {"changes": changes, "cursor": cursor}
+
+    def latest_id(self) -> int:
+        """ID of the newest change (0 if none): a cursor that skips everything so far."""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM changes").fetchone()[0]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM watches").fetchone()[0]
+
+    def stats(self) -> dict:
+        with self._lock:
+            watched, polled = self._conn.execute("SELECT COUNT(*), COUNT(snapshot) FROM watches").fetchone()
+            changes = self._conn.execute("SELECT COUNT(*) FROM changes").fetchone()[0]
+        return {"path": self.path, "watched": watched, "with_snapshot": polled, "changes": changes}
@@ -1,3 +1,27 @@
+from contextlib import asynccontextmanager
+
+from dotenv import load_dotenv
 from fastmcp import FastMCP
 
-mcp = FastMCP("DigiKey MCP Server")
+# Imported first by every tool module, so .env is loaded exactly once and
+# before any module reads its settings.
+load_dotenv()
+
+# Callables run on the server's event loop when it starts (see on_startup)
+_startup_hooks = []
+
+
+def on_startup(hook):
+    """Register a callable to run when the server starts, e.g. to resume background tasks."""
+    _startup_hooks.append(hook)
+    return hook
+
+
+@asynccontextmanager
+async def _lifespan(server):
+    for hook in _startup_hooks:
+        hook()
+    yield
+
+
+mcp = FastMCP("DigiKey MCP Server", lifespan=_lifespan)
@@ -0,0 +1,274 @@
+"""Local stand-in for the DigiKey API, used by tests and benchmarks.
+
+Runs a threaded HTTP/1.1 (keep-alive) server on localhost and counts how many
+TCP connections and requests it receives, so tests can assert on connection
+pooling and on the number of upstream calls. `install_catalog` adds canned
+product, pricing, order status and MyList responses for load tests.
+`FakeClock` is a manually advanced clock for time-dependent tests.
+"""
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, mock, *args, **kwargs):
+        self.mock = mock
+        super().__init__(*args, **kwargs)
+
+    def process_request(self, request, client_address):
+        # Called once per accepted TCP connection
+        with self.mock._lock:
+            self.mock.connections_opened += 1
+        super().process_request(request, client_address)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _handle(self):
+        mock = self.server.mock
+        parts = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        with mock._lock:
+            mock.requests.append((self.command, parts.path))
+            fail = mock.error_rate and parts.path != TOKEN_PATH and mock._random.random() < mock.error_rate
+        if mock.latency:
+            time.sleep(mock.latency)
+
+        if fail:
+            status, body, headers = 503, {"ErrorMessage": "Injected failure"}, None
+        else:
+            status, body, headers = mock.dispatch(
+                self.command, parts.path, parse_qs(parts.query), raw, dict(self.headers)
+            )
+        if mock.payload_size and isinstance(body, dict):
+            body = {**body, "Padding": "x" * mock.payload_size}
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = _handle
+    do_POST = _handle
+
+
+TOKEN_PATH = "/v1/oauth2/token"
+
+
+class FakeClock:
+    """Manually advanced time source for the clock= parameters of caches and stores."""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class MockDigiKey:
+    """Mock DigiKey API server.
+
+    Usage:
+        with MockDigiKey() as server:
+            server.url  # http://127.0.0.1:<port>
+
+    Attributes:
+        connections_opened: Number of TCP connections accepted
+        requests: List of (method, path) tuples received
+        latency: Seconds to sleep before answering each request
+        error_rate: Fraction of requests (other than OAuth) answered with 503
+        payload_size: Bytes of padding added to every JSON object response
+    """
+
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0, payload_size: int = 0, seed: int | None = None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.payload_size = payload_size
+        self._random = random.Random(seed)
+        self.connections_opened = 0
+        self.requests = []
+        self._routes = []
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+        self.route("POST", TOKEN_PATH, lambda *_: (
+            200, {"access_token": "mock-token", "expires_in": 1799}, None
+        ))
+
+    def route(self, method: str, path_prefix: str, handler) -> None:
+        """Register a handler(path, query, body, headers) -> (status, json, headers).
+
+        Later registrations take precedence over earlier ones.
+        """
+        self._routes.insert(0, (method, path_prefix, handler))
+
+    def dispatch(self, method, path, query, body, headers):
+        for m, prefix, handler in self._routes:
+            if m == method and path.startswith(prefix):
+                return handler(path, query, body, headers)
+        return 200, {"method": method, "path": path}, None
+
+    def install_catalog(self, products: int = 10) -> "MockDigiKey":
+        """Answer product, pricing, order status and MyList endpoints with canned data.
+
+        Args:
+            products: Products returned per keyword search page
+        """
+        self.route("POST", "/products/v4/search/keyword", lambda path, query, body, headers: (
+            200, _keyword_page(json.loads(body or b"{}"), products), None
+        ))
+        self.route("GET", "/products/v4/search/", lambda path, query, body, headers: _product_route(path))
+        self.route("GET", "/orderstatus/v4/orders", lambda *_: (
+            200, {"Orders": [_order(1000 + i) for i in range(10)], "TotalOrders": 10}, None
+        ))
+        self.route("GET", "/orderstatus/v4/salesorder/", lambda path, *_: (
+            200, _order(int(path.rsplit("/", 1)[1])), None
+        ))
+        self.route("POST", "/mylists/api/thirdparty", lambda *_: (
+            200, {"singleUseUrl": "https://www.digikey.com/mylists/import/mock"}, None
+        ))
+        return self
+
+    def count(self, path_prefix: str = "/") -> int:
+        """Number of requests received whose path starts with `path_prefix`."""
+        with self._lock:
+            return sum(1 for _, p in self.requests if p.startswith(path_prefix))
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockDigiKey":
+        self._server = _Server(self, ("127.0.0.1", 0), _Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+PRICE_BREAKS = [
+    {"BreakQuantity": 1, "UnitPrice": 0.10, "TotalPrice": 0.10},
+    {"BreakQuantity": 10, "UnitPrice": 0.05, "TotalPrice": 0.50},
+    {"BreakQuantity": 100, "UnitPrice": 0.02, "TotalPrice": 2.00},
+    {"BreakQuantity": 1000, "UnitPrice": 0.01, "TotalPrice": 10.00},
+]
+
+
+def _product(part: str) -> dict:
+    return {
+        "ManufacturerProductNumber": part,
+        "Manufacturer": {"Id": 1, "Name": "ACME"},
+        "Description": {"ProductDescription": f"Part {part}", "DetailedDescription": f"Mock part {part}"},
+        "QuantityAvailable": 5000,
+        "UnitPrice": 0.10,
+        "ProductStatus": {"Id": 0, "Status": "Active"},
+        "ProductUrl": f"https://www.digikey.com/en/products/detail/acme/{part}",
+        "DatasheetUrl": f"https://example.com/{part}.pdf",
+        "Parameters": [{"ParameterId": i, "ParameterText": f"Param {i}", "ValueText": str(i)} for i in range(12)],
+        "ProductVariations": [
+            {"DigiKeyProductNumber": f"{part}-CT-ND", "PackageType": {"Id": 2, "Name": "Cut Tape (CT)"},
+             "StandardPricing": PRICE_BREAKS, "MinimumOrderQuantity": 1, "QuantityAvailableforPackageType": 5000},
+            {"DigiKeyProductNumber": f"{part}-TR-ND", "PackageType": {"Id": 1, "Name": "Tape & Reel (TR)"},
+             "StandardPricing": [{"BreakQuantity": 4000, "UnitPrice": 0.005, "TotalPrice": 20.0}],
+             "MinimumOrderQuantity": 4000, "QuantityAvailableforPackageType": 4000},
+        ],
+    }
+
+
+def _keyword_page(body: dict, products: int) -> dict:
+    offset = body.get("Offset", 0)
+    limit = min(body.get("Limit", products), products)
+    keywords = body.get("Keywords", "PART")
+    return {
+        "ProductsCount": 1000,
+        "Products": [_product(f"{keywords}-{offset + i}") for i in range(limit)],
+        "ExactMatches": [],
+    }
+
+
+def _product_route(path: str):
+    # /products/v4/search/{part}/{endpoint}
+    segments = path.split("/")
+    if len(segments) < 6:
+        return 200, {"path": path}, None
+    part, endpoint = segments[4], segments[5]
+    if endpoint == "pricing":
+        return 200, {"ProductPricings": [{"ManufacturerProductNumber": part, "ProductVariations": _product(part)["ProductVariations"]}]}, None
+    if endpoint == "substitutions":
+        return 200, {"ProductSubstitutes": [{"ManufacturerProductNumber": f"{part}-ALT{i}", "DigiKeyProductNumber": f"{part}-ALT{i}-ND"} for i in range(3)]}, None
+    if endpoint == "productdetails":
+        return 200, {"Product": _product(part)}, None
+    return 200, {"path": path}, None
+
+
+def _order(sales_order_id: int) -> dict:
+    return {
+        "SalesOrderId": sales_order_id,
+        "DateEntered": "2026-01-15T10:00:00",
+        "Currency": "USD",
+        "Status": {"SalesOrderStatus": "Delivered"},
+        "LineItems": [
+            {"DigiKeyProductNumber": f"P{i}-CT-ND", "QuantityOrdered": 10, "UnitPrice": 0.05} for i in range(20)
+        ],
+    }
+
+
+@contextmanager
+def pointed_at(server: MockDigiKey):
+    """Point digikey_mcp_server at `server` with fresh credentials, token, pools,
+    cache, catalog index, order store, watchlist and part memo and an
+    effectively unlimited rate limiter with fast retries."""
+    from unittest.mock import patch
+
+    import digikey_http
+    import digikey_mcp_server
+    import digikey_noauth_tools
+    from digikey_auth import TokenManager
+    from digikey_index import CatalogIndex
+    from digikey_ratelimit import RateLimiter
+
+    digikey_http.reset()
+    digikey_mcp_server._response_cache.clear()
+    digikey_mcp_server._order_store.clear()
+    digikey_mcp_server._watchlist.clear()
+    digikey_mcp_server._part_memo.clear()
+    limiter = RateLimiter(products_per_minute=60_000, orders_per_minute=60_000, backoff_base=0.01)
+    tm = TokenManager(digikey_mcp_server.get_access_token, background=False)
+    with patch.object(digikey_mcp_server, "API_BASE", server.url), \
+         patch.object(digikey_mcp_server, "TOKEN_URL", f"{server.url}/v1/oauth2/token"), \
+         patch.object(digikey_mcp_server, "CLIENT_ID", "id"), \
+         patch.object(digikey_mcp_server, "CLIENT_SECRET", "secret"), \
+         patch.object(digikey_mcp_server, "_token_manager", tm), \
+         patch.object(digikey_mcp_server, "_rate_limiter", limiter), \
+         patch.object(digikey_mcp_server, "_catalog_index", CatalogIndex()), \
+         patch.object(digikey_noauth_tools, "MYLIST_THIRDPARTY_URL", f"{server.url}/mylists/api/thirdparty"):
+        try:
+            yield
+        finally:
+            digikey_http.reset()
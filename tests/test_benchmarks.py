@@ -0,0 +1,49 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+
+import httpx
+
+from benchmarks.bench_load import compare, percentile, run_scenario
+from tests.mock_digikey import MockDigiKey
+
+
+def test_percentile_nearest_rank():
+    samples = list(range(1, 101))
+    assert percentile(samples, 0.5) == 50
+    assert percentile(samples, 0.99) == 99
+    assert percentile([7], 0.99) == 7
+    assert percentile([], 0.5) == 0.0
+
+
+def test_compare_flags_regressions_beyond_tolerance():
+    baseline = {"a": {"p50_ms": 10, "p99_ms": 20, "throughput": 100, "failed": 0}}
+    within = {"a": {"p50_ms": 12, "p99_ms": 24, "throughput": 80, "failed": 0}}
+    worse = {"a": {"p50_ms": 13, "p99_ms": 20, "throughput": 70, "failed": 1}}
+    assert compare(within, baseline, 0.25) == []
+    assert len(compare(worse, baseline, 0.25)) == 3
+    assert compare({"new": within["a"]}, baseline, 0.25) == []
+
+
+def test_mock_error_rate_and_payload_size():
+    with MockDigiKey(error_rate=1.0, payload_size=100).install_catalog() as server:
+        token = httpx.post(f"{server.url}/v1/oauth2/token")
+        assert token.status_code == 200  # OAuth is never failed
+        assert httpx.get(f"{server.url}/products/v4/search/P1/productdetails").status_code == 503
+        server.error_rate = 0.0
+        resp = httpx.get(f"{server.url}/products/v4/search/P1/productdetails")
+        assert resp.json()["Product"]["ManufacturerProductNumber"] == "P1"
+        assert len(resp.json()["Padding"]) == 100
+
+
+def test_run_scenario_smoke():
+    opts = argparse.Namespace(
+        calls=10, concurrency=5, latency=0.0, error_rate=0.0, payload_size=0, distinct=0, alloc_calls=5
+    )
+    result = run_scenario("product_details", opts)
+    assert result["failed"] == 0
+    assert result["upstream_requests"] >= 10
+    assert result["p99_ms"] >= result["p50_ms"] > 0
+    assert "retained_kib_per_call" in result
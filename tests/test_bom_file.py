@@ -0,0 +1,133 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import tracemalloc
+from unittest.mock import patch
+
+import pytest
+
+import digikey_mcp_server
+from digikey_bom import bom_path, map_columns, merge_lines, read_rows
+from tests.mock_digikey import MockDigiKey, pointed_at
+
+KICAD = """\
+"Source:","/home/me/board.kicad_sch"
+"Date:","2026-10-01"
+
+"Refs","Value","Footprint","Qty","DNP","MPN","Manufacturer"
+"R1-R3, R7","10k","R_0603","4","","RC0603FR-0710KL","Yageo"
+"C1,C2","100n","C_0603","2","","CL10B104KB8NNNC","Samsung"
+"R9","10k","R_0603","1","","rc0603fr-0710kl","Yageo"
+"U1","LM358","SOIC-8","1","DNP","LM358DR","TI"
+"J1","CONN","","1","","",""
+"""
+
+ALTIUM = (
+    "Comment\tDesignator\tQuantity\tManufacturer 1\tManufacturer Part Number 1\tSupplier 1\tSupplier Part Number 1\n"
+    "10k\tR1, R2\t2\tYageo\tRC0603FR-0710KL\tDigi-Key\t311-10.0KHRCT-ND\n"
+    "LM358\tU1\t1\tTI\tLM358DR\t\t\n"
+)
+
+
+def _write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def test_kicad_rows_merge_and_skip(tmp_path):
+    stats = {}
+    rows = list(read_rows(_write(tmp_path, "board.csv", KICAD), "kicad", stats=stats))
+    assert stats["columns"]["manufacturer_part_number"] == "MPN"
+    assert stats["rows"] == 5 and stats["skipped"] == 1  # DNP row not counted as skipped; J1 has no part
+    assert rows[0]["references"] == ["R1", "R2", "R3", "R7"]
+
+    lines = merge_lines(rows, boards=10)
+    assert lines == [
+        {"part_number": "RC0603FR-0710KL", "quantity": 50, "manufacturer_part_number": "RC0603FR-0710KL",
+         "manufacturer": "Yageo", "reference": "R1,R2,R3,R7,R9"},
+        {"part_number": "CL10B104KB8NNNC", "quantity": 20, "manufacturer_part_number": "CL10B104KB8NNNC",
+         "manufacturer": "Samsung", "reference": "C1,C2"},
+    ]
+
+
+def test_altium_prefers_digikey_part_number(tmp_path):
+    rows = list(read_rows(_write(tmp_path, "bom.tsv", ALTIUM), "altium"))
+    assert [(r["part_number"], r["quantity"]) for r in rows] == [("311-10.0KHRCT-ND", 2), ("LM358DR", 1)]
+    assert rows[0]["manufacturer_part_number"] == "RC0603FR-0710KL"
+
+
+def test_quantity_from_references_and_column_overrides(tmp_path):
+    text = "Designators;Mfr. #\nR1-R4;ABC\nC1 C2;XYZ\n"
+    path = _write(tmp_path, "semi.csv", text)
+    rows = list(read_rows(path, columns={"manufacturer_part_number": "Mfr. #"}))
+    assert [(r["part_number"], r["quantity"]) for r in rows] == [("ABC", 4), ("XYZ", 2)]
+
+    with pytest.raises(ValueError, match="No header"):
+        list(read_rows(_write(tmp_path, "notes.csv", "hello,world\n1,2\n")))
+    with pytest.raises(ValueError, match="Unknown BOM field"):
+        map_columns(["MPN", "Qty"], columns={"price": "Qty"})
+
+
+def test_bom_path_stays_inside_base_dir(tmp_path):
+    assert bom_path("a/bom.csv", str(tmp_path)) == str(tmp_path / "a" / "bom.csv")
+    with pytest.raises(ValueError):
+        bom_path("../etc/passwd", str(tmp_path))
+    with pytest.raises(ValueError):
+        bom_path("/etc/passwd", str(tmp_path))
+
+
+def _large_bom(path, lines):
+    with open(path, "w") as f:
+        f.write("Reference,MPN,Qty\n")
+        for i in range(lines):
+            f.write(f"R{i},PART-{i % (lines // 2)},{i % 7 + 1}\n")  # every part appears twice
+
+
+def test_large_bom_streams_with_bounded_memory(tmp_path):
+    path = str(tmp_path / "big.csv")
+    _large_bom(path, 20_000)
+    tracemalloc.start()
+    count = sum(1 for _ in read_rows(path))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert count == 20_000
+    assert peak < 512 * 1024  # rows are not accumulated
+
+
+def test_process_bom_file_targets(tmp_path):
+    path = str(tmp_path / "big.csv")
+    _large_bom(path, 600)
+
+    async def run():
+        await digikey_mcp_server._ensure_token()
+        summary = await digikey_mcp_server.process_bom_file.fn("big.csv")
+        cart = await digikey_mcp_server.process_bom_file.fn("big.csv", target="cart")
+        resolved = await digikey_mcp_server.process_bom_file.fn("big.csv", target="resolve", boards=2)
+        return summary, cart, resolved
+
+    with MockDigiKey().install_catalog() as server, pointed_at(server), \
+         patch.object(digikey_mcp_server, "BOM_DIR", str(tmp_path)):
+        summary, cart, resolved = asyncio.run(run())
+        lookups = server.count("/products/v4/search/")
+
+    assert summary["bom"]["rows"] == 600 and summary["bom"]["lines"] == 300
+    assert len(summary["preview"]) == 10
+    assert sum(b["parts"] for b in cart["result"]["batches"]) == 300
+    assert resolved["result"]["summary"]["lines"] == 300
+    assert resolved["result"]["issues"] == [] and "lines" not in resolved["result"]
+    assert lookups == 300  # merged lines: one lookup per distinct part
+
+
+def test_process_bom_file_requires_bom_dir_and_positive_boards(tmp_path):
+    _write(tmp_path, "bom.csv", KICAD)
+    with patch.object(digikey_mcp_server, "BOM_DIR", None):
+        with pytest.raises(ValueError, match="DIGIKEY_BOM_DIR"):
+            asyncio.run(digikey_mcp_server.process_bom_file.fn(str(tmp_path / "bom.csv")))
+    with patch.object(digikey_mcp_server, "BOM_DIR", str(tmp_path)):
+        for boards in (0, -2):
+            with pytest.raises(ValueError, match="boards"):
+                asyncio.run(digikey_mcp_server.process_bom_file.fn("bom.csv", target="cart", boards=boards))
+        assert asyncio.run(digikey_mcp_server.process_bom_file.fn("bom.csv"))["bom"]["lines"] == 2
@@ -0,0 +1,70 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+
+import digikey_mcp_server
+from digikey_cache import TTLCache, cache_key, ttl_for
+from tests.mock_digikey import FakeClock, MockDigiKey, pointed_at
+
+BASE = "https://api.digikey.com/products/v4/search"
+
+
+def test_ttl_expiry_and_stats():
+    clock = FakeClock(0.0)
+    cache = TTLCache(maxsize=10, clock=clock)
+    cache.set("a", {"x": 1}, ttl=60)
+    assert cache.get("a") == {"x": 1}
+    clock.now = 61
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert len(cache) == 0
+
+
+def test_lru_eviction():
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1, 60)
+    cache.set("b", 2, 60)
+    cache.get("a")  # "b" is now least recently used
+    cache.set("c", 3, 60)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_endpoint_ttls():
+    assert ttl_for(f"{BASE}/manufacturers") == 24 * 3600
+    assert ttl_for(f"{BASE}/categories/123") == 24 * 3600
+    assert ttl_for(f"{BASE}/X/pricing?requestedQuantity=1") == 60
+    assert ttl_for("https://api.digikey.com/orderstatus/v4/orders?PageSize=10") is None
+
+
+def test_cache_key_normalization():
+    headers = {"X-DIGIKEY-Locale-Currency": "USD", "X-DIGIKEY-Customer-Id": "0", "Authorization": "Bearer a"}
+    a = cache_key("GET", f"{BASE}/X/pricing?a=1&b=2", headers)
+    b = cache_key("get", f"{BASE}/X/pricing?b=2&a=1", {**headers, "Authorization": "Bearer b"})
+    assert a == b
+    assert a != cache_key("GET", f"{BASE}/X/pricing?a=1&b=2", {**headers, "X-DIGIKEY-Locale-Currency": "EUR"})
+    assert a != cache_key("GET", f"{BASE}/X/pricing?a=1&b=2", {**headers, "X-DIGIKEY-Customer-Id": "42"})
+    assert cache_key("POST", f"{BASE}/keyword", headers, {"Keywords": "x", "Limit": 5}) == \
+        cache_key("POST", f"{BASE}/keyword", headers, {"Limit": 5, "Keywords": "x"})
+
+
+def test_tools_served_from_cache():
+    async def calls():
+        await digikey_mcp_server.product_details.fn("R1K")
+        await digikey_mcp_server.product_details.fn("R1K")
+        await digikey_mcp_server.product_details.fn("R1K", customer_id="42")
+        await digikey_mcp_server.product_details.fn("R1K", bypass_cache=True)
+        await digikey_mcp_server.list_orders.fn()
+        await digikey_mcp_server.list_orders.fn()
+
+    with MockDigiKey() as server, pointed_at(server):
+        asyncio.run(calls())
+        stats = digikey_mcp_server.cache_stats.fn()
+        assert server.count("/products/v4/search/R1K/productdetails") == 3
+        assert server.count("/orderstatus") == 2
+    assert stats["hits"] == 1
@@ -0,0 +1,65 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+
+import httpx
+
+import digikey_mcp_server
+from tests.mock_digikey import MockDigiKey, pointed_at
+
+
+def test_identical_concurrent_requests_share_one_call():
+    async def calls():
+        await digikey_mcp_server._ensure_token()
+        return await asyncio.gather(*(
+            digikey_mcp_server.product_details.fn("STM32F405RGT6", bypass_cache=True) for _ in range(10)
+        ))
+
+    with MockDigiKey(latency=0.1) as server, pointed_at(server):
+        results = asyncio.run(calls())
+        assert server.count("/products/v4/search/STM32F405RGT6") == 1
+        assert digikey_mcp_server.cache_stats.fn()["coalesced_requests"] >= 9
+    assert all(r == results[0] for r in results)
+
+
+def test_uncached_endpoints_coalesced():
+    async def calls():
+        await digikey_mcp_server._ensure_token()
+        await asyncio.gather(*(digikey_mcp_server.get_order_status.fn(7) for _ in range(5)))
+
+    with MockDigiKey(latency=0.1) as server, pointed_at(server):
+        asyncio.run(calls())
+        assert server.count("/orderstatus/v4/salesorder/7") == 1
+
+
+def test_different_headers_not_coalesced():
+    async def calls():
+        await digikey_mcp_server._ensure_token()
+        await asyncio.gather(
+            digikey_mcp_server.get_product_pricing.fn("X", customer_id="1"),
+            digikey_mcp_server.get_product_pricing.fn("X", customer_id="2"),
+            digikey_mcp_server.get_product_pricing.fn("X", customer_id="1"),
+        )
+
+    with MockDigiKey(latency=0.1) as server, pointed_at(server):
+        asyncio.run(calls())
+        assert server.count("/products/v4/search/X/pricing") == 2
+
+
+def test_errors_shared_and_cancellation_isolated():
+    async def calls():
+        await digikey_mcp_server._ensure_token()
+        first = asyncio.ensure_future(digikey_mcp_server.get_product_media.fn("MISSING"))
+        others = [asyncio.ensure_future(digikey_mcp_server.get_product_media.fn("MISSING")) for _ in range(3)]
+        await asyncio.sleep(0.02)
+        first.cancel()
+        return await asyncio.gather(*others, return_exceptions=True)
+
+    with MockDigiKey(latency=0.1) as server, pointed_at(server):
+        server.route("GET", "/products/v4/search/MISSING", lambda *_: (404, {"detail": "nope"}, None))
+        results = asyncio.run(calls())
+        assert server.count("/products/v4/search/MISSING") == 1
+        assert not digikey_mcp_server._inflight
+    assert all(isinstance(r, httpx.HTTPStatusError) for r in results)
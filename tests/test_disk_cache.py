@@ -0,0 +1,119 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import subprocess
+import time
+from unittest.mock import patch
+
+import digikey_mcp_server
+from digikey_cache import SQLiteCache, is_persistent
+from tests.mock_digikey import FakeClock, MockDigiKey, pointed_at
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WRITER = """
+import sys
+from digikey_cache import SQLiteCache
+path, worker = sys.argv[1], int(sys.argv[2])
+cache = SQLiteCache(path, compact_every=10)
+for i in range(50):
+    cache.set(f"w{worker}-{i}", {"worker": worker, "i": i}, ttl=60)
+"""
+
+
+def test_shared_between_instances(tmp_path):
+    path = str(tmp_path / "cache.db")
+    a = SQLiteCache(path)
+    b = SQLiteCache(path)
+    a.set("k", {"Product": {"QuantityAvailable": 5}}, ttl=60)
+    value, remaining = b.lookup("k")
+    assert value == {"Product": {"QuantityAvailable": 5}}
+    assert 0 < remaining <= 60
+    assert b.stats()["hits"] == 1
+
+
+def test_ttl_and_compaction(tmp_path):
+    clock = FakeClock(1_000_000.0)
+    cache = SQLiteCache(str(tmp_path / "cache.db"), clock=clock)
+    cache.set("old", 1, ttl=10)
+    cache.set("new", 2, ttl=100)
+    clock.now += 50
+    assert cache.get("old") is None
+    cache.compact()
+    assert len(cache) == 1
+    assert cache.get("new") == 2
+
+
+def test_size_cap_evicts_least_recently_used(tmp_path):
+    clock = FakeClock(1_000_000.0)
+    cache = SQLiteCache(str(tmp_path / "cache.db"), max_bytes=1000, clock=clock)
+    for i in range(10):
+        clock.now += 100  # distinct access times
+        cache.set(f"k{i}", "x" * 198, ttl=3600)  # 200 bytes serialized
+    cache.compact()
+    assert cache.stats()["bytes"] <= 900
+    assert cache.get("k0") is None
+    assert cache.get("k9") is not None
+
+
+def test_concurrent_processes(tmp_path):
+    path = str(tmp_path / "cache.db")
+    SQLiteCache(path).close()  # create schema / WAL mode up front
+    procs = [
+        subprocess.Popen([sys.executable, "-c", WRITER, path, str(w)], cwd=ROOT)
+        for w in range(4)
+    ]
+    assert [p.wait(60) for p in procs] == [0, 0, 0, 0]
+    cache = SQLiteCache(path)
+    assert len(cache) == 200
+    assert cache.get("w3-49") == {"worker": 3, "i": 49}
+
+
+def test_persistent_endpoints():
+    base = "https://api.digikey.com/products/v4/search"
+    assert is_persistent(f"{base}/manufacturers")
+    assert is_persistent(f"{base}/categories/42")
+    assert is_persistent(f"{base}/X/productdetails?manufacturerId=1")
+    assert not is_persistent(f"{base}/X/pricing?requestedQuantity=1")
+
+
+def test_restart_served_from_disk(tmp_path):
+    disk = SQLiteCache(str(tmp_path / "cache.db"))
+    with MockDigiKey() as server, pointed_at(server), \
+         patch.object(digikey_mcp_server, "_disk_cache", disk):
+        asyncio.run(digikey_mcp_server.search_categories.fn())
+        digikey_mcp_server._response_cache.clear()  # simulate a restart
+        asyncio.run(digikey_mcp_server.search_categories.fn())
+        asyncio.run(digikey_mcp_server.search_categories.fn())
+        assert server.count("/products/v4/search/categories") == 1
+    assert disk.stats()["hits"] == 1
+
+
+def test_slow_disk_lookup_does_not_block_event_loop(tmp_path):
+    disk = SQLiteCache(str(tmp_path / "cache.db"))
+    lookup = disk.lookup
+
+    def locked_lookup(key):
+        time.sleep(0.3)  # another replica holding the write lock
+        return lookup(key)
+
+    async def run():
+        gaps = []
+
+        async def ticker():
+            last = time.monotonic()
+            for _ in range(10):
+                await asyncio.sleep(0.02)
+                gaps.append(time.monotonic() - last)
+                last = time.monotonic()
+
+        await asyncio.gather(digikey_mcp_server.search_categories.fn(), ticker())
+        return max(gaps)
+
+    with MockDigiKey() as server, pointed_at(server), \
+         patch.object(digikey_mcp_server, "_disk_cache", disk), \
+         patch.object(disk, "lookup", locked_lookup):
+        assert asyncio.run(run()) < 0.2
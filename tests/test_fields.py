@@ -0,0 +1,75 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+
+from digikey_fields import parse_fields, project
+from digikey_mcp_server import keyword_search, product_details
+from tests.mock_digikey import MockDigiKey, pointed_at
+
+DETAILS = {
+    "Product": {
+        "ManufacturerProductNumber": "STM32F405RGT6",
+        "Manufacturer": {"Id": 497, "Name": "STMicroelectronics"},
+        "Description": {"ProductDescription": "IC MCU 32BIT 1MB FLASH 64LQFP", "DetailedDescription": "..."},
+        "QuantityAvailable": 1234,
+        "PhotoUrl": "https://example.com/photo.jpg",
+        "MediaLinks": [{"Url": "https://example.com/ds.pdf"}] * 20,
+        "ProductVariations": [
+            {"DigiKeyProductNumber": "497-11767-ND", "PackageType": {"Id": 1, "Name": "Tray"},
+             "StandardPricing": [{"BreakQuantity": 1, "UnitPrice": 14.5}], "MinimumOrderQuantity": 1,
+             "MarketPlace": False},
+        ],
+    },
+    "SearchLocaleUsed": {"Site": "US"},
+}
+
+
+def test_parse_and_project():
+    tree = parse_fields("Product.QuantityAvailable, Product.ProductVariations.PackageType.Name,Missing.Field")
+    assert project(DETAILS, tree) == {"Product": {
+        "QuantityAvailable": 1234,
+        "ProductVariations": [{"PackageType": {"Name": "Tray"}}],
+    }}
+
+
+def test_project_references_values_without_copying():
+    selected = project(DETAILS, parse_fields("Product.ProductVariations.StandardPricing"))
+    original = DETAILS["Product"]["ProductVariations"][0]["StandardPricing"]
+    assert selected["Product"]["ProductVariations"][0]["StandardPricing"] is original
+
+
+def test_product_details_compact_by_default():
+    with MockDigiKey() as server, pointed_at(server):
+        server.route("GET", "/products/v4/search/", lambda *_: (200, DETAILS, None))
+
+        async def calls():
+            return (
+                await product_details.fn("STM32F405RGT6"),
+                await product_details.fn("STM32F405RGT6", compact=False),
+                await product_details.fn("STM32F405RGT6", fields="Product.QuantityAvailable"),
+            )
+
+        summary, full, picked = asyncio.run(calls())
+        assert server.count("/products/v4/search/") == 1  # one upstream call, three projections
+
+    assert "MediaLinks" not in summary["Product"]
+    assert summary["Product"]["ProductVariations"][0]["StandardPricing"] == [{"BreakQuantity": 1, "UnitPrice": 14.5}]
+    assert full == DETAILS
+    assert picked == {"Product": {"QuantityAvailable": 1234}}
+
+
+def test_keyword_search_summary():
+    search = {"ProductsCount": 1, "Products": [DETAILS["Product"]], "FilterOptions": {"Manufacturers": [{}] * 50}}
+    with MockDigiKey() as server, pointed_at(server):
+        server.route("POST", "/products/v4/search/keyword", lambda *_: (200, search, None))
+        result = asyncio.run(keyword_search.fn("STM32F405"))
+
+    assert result == {"ProductsCount": 1, "Products": [{
+        "ManufacturerProductNumber": "STM32F405RGT6",
+        "Manufacturer": {"Name": "STMicroelectronics"},
+        "Description": {"ProductDescription": "IC MCU 32BIT 1MB FLASH 64LQFP"},
+        "QuantityAvailable": 1234,
+        "ProductVariations": [{"DigiKeyProductNumber": "497-11767-ND", "PackageType": {"Name": "Tray"}}],
+    }]}
@@ -0,0 +1,109 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+import digikey_http
+import digikey_mcp_server
+from digikey_noauth_tools import create_mylist_link
+from tests.mock_digikey import MockDigiKey, pointed_at
+
+
+@pytest.fixture
+def server():
+    digikey_http.reset()
+    with MockDigiKey() as srv:
+        yield srv
+    digikey_http.reset()
+
+
+def test_requests_reuse_one_connection(server):
+    for _ in range(5):
+        resp = digikey_http.request("GET", f"{server.url}/products/v4/search/X/media")
+        assert resp.status_code == 200
+    assert server.count() == 5
+    assert server.connections_opened == 1
+
+
+def test_tools_and_token_share_pool(server):
+    async def calls():
+        await digikey_mcp_server.get_product_media.fn("296-8875-1-ND")
+        await digikey_mcp_server.get_order_status.fn(12345)
+        await digikey_mcp_server.search_categories.fn()
+
+    with pointed_at(server):
+        asyncio.run(calls())
+
+    assert server.count("/v1/oauth2/token") == 1
+    assert server.count() == 4
+    # One pooled connection for the token request, one for the tool calls
+    assert server.connections_opened == 2
+
+
+def test_mylist_uses_shared_pool(server):
+    server.route("POST", "/mylists/api/thirdparty", lambda *_: (200, "https://example.com/x", None))
+
+    async def calls():
+        return [await create_mylist_link("Test", [{"part_number": "X", "quantity": 1}]) for _ in range(3)]
+
+    with patch("digikey_noauth_tools.MYLIST_THIRDPARTY_URL", f"{server.url}/mylists/api/thirdparty"):
+        results = asyncio.run(calls())
+    assert results[-1] == {"url": "https://example.com/x"}
+    assert server.connections_opened == 1
+
+
+def test_concurrent_tool_calls_overlap():
+    with MockDigiKey(latency=0.2) as server, pointed_at(server):
+        async def calls():
+            await digikey_mcp_server._ensure_token()
+            start = time.perf_counter()
+            await asyncio.gather(*(digikey_mcp_server.get_product_pricing.fn(f"P{i}") for i in range(10)))
+            return time.perf_counter() - start
+
+        elapsed = asyncio.run(calls())
+    # Ten 200 ms requests would take 2 s if they blocked each other
+    assert elapsed < 1.0
+
+
+def test_configure_pool_and_timeout():
+    digikey_http.configure(pool_size=3, timeout=2.5, http2=False)
+    try:
+        client = digikey_http.get_client()
+        assert client.timeout.read == 2.5
+        assert client._transport._pool._max_connections == 3
+        assert digikey_http.get_client() is client
+    finally:
+        digikey_http.reset()
+
+
+def test_per_request_timeout():
+    seen = {}
+
+    def handler(request):
+        seen.update(request.extensions["timeout"])
+        return httpx.Response(200, json={})
+
+    digikey_http.configure(transport=httpx.MockTransport(handler))
+    try:
+        digikey_http.request("GET", "https://api.digikey.com/x", timeout=1.5)
+    finally:
+        digikey_http.reset()
+    assert seen["read"] == 1.5
+
+
+def test_async_client_rebuilt_per_event_loop():
+    async def get():
+        return digikey_http.get_async_client()
+
+    try:
+        first = asyncio.run(get())
+        second = asyncio.run(get())
+    finally:
+        digikey_http.reset()
+    assert first is not second
@@ -0,0 +1,185 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import digikey_mcp_server
+from digikey_index import CatalogIndex, normalize
+from tests.mock_digikey import MockDigiKey, pointed_at
+
+CATEGORIES = {
+    "ProductCount": 300,
+    "Categories": [
+        {"CategoryId": 3, "ParentId": 0, "Name": "Capacitors", "ProductCount": 200, "ChildCategories": [
+            {"CategoryId": 60, "ParentId": 3, "Name": "Ceramic Capacitors", "ProductCount": 150, "ChildCategories": []},
+            {"CategoryId": 61, "ParentId": 3, "Name": "Tantalum Capacitors", "ProductCount": 50, "ChildCategories": []},
+        ]},
+        {"CategoryId": 2, "ParentId": 0, "Name": "Resistors", "ProductCount": 100, "ChildCategories": [
+            {"CategoryId": 52, "ParentId": 2, "Name": "Chip Resistor - Surface Mount", "ProductCount": 100, "ChildCategories": []},
+        ]},
+    ],
+}
+
+MANUFACTURERS = {
+    "Manufacturers": [
+        {"Id": 296, "Name": "Texas Instruments"},
+        {"Id": 497, "Name": "STMicroelectronics"},
+        {"Id": 505, "Name": "Analog Devices Inc."},
+        {"Id": 1, "Name": "ACME Corp"},
+        {"Id": 2, "Name": "ACME Electronics GmbH"},
+    ]
+}
+
+
+def _index() -> CatalogIndex:
+    index = CatalogIndex()
+    index.load_categories(CATEGORIES)
+    index.load_manufacturers(MANUFACTURERS)
+    return index
+
+
+def _mock() -> MockDigiKey:
+    server = MockDigiKey()
+    server.route("GET", "/products/v4/search/categories", lambda *_: (200, CATEGORIES, None))
+    server.route("GET", "/products/v4/search/manufacturers", lambda *_: (200, MANUFACTURERS, None))
+    return server
+
+
+def test_normalize():
+    assert normalize("Analog Devices Inc.", strip_suffixes=True) == "analog devices"
+    assert normalize("Chip Resistor - Surface Mount") == "chip resistor surface mount"
+
+
+def test_category_tree():
+    index = _index()
+    assert index.get_category(60)["Category"]["Name"] == "Ceramic Capacitors"
+    assert index.get_category(999) is None
+    assert index.category_path(60) == ["Capacitors", "Ceramic Capacitors"]
+
+
+def test_manufacturer_matching():
+    index = _index()
+    assert index.search_manufacturers("texas instruments")[0] == {"Id": 296, "Name": "Texas Instruments", "score": 1.0}
+    assert index.search_manufacturers("TI")[0]["Id"] == 296  # alias
+    assert index.search_manufacturers("Analog Devices, Inc")[0]["Id"] == 505  # suffix ignored
+    assert {m["Id"] for m in index.search_manufacturers("acme")} == {1, 2}  # prefix
+    assert index.search_manufacturers("STMicroelectronic")[0]["Id"] == 497  # fuzzy
+    assert index.search_manufacturers("zzzz") == []
+
+
+def test_category_matching():
+    index = _index()
+    best = index.search_categories("ceramic capacitors")[0]
+    assert best["CategoryId"] == 60
+    assert best["Path"] == "Capacitors > Ceramic Capacitors"
+    assert best["score"] == 1.0
+    assert index.search_categories("surface mount")[0]["CategoryId"] == 52  # word match
+    assert index.search_categories("tantalum capacitor")[0]["CategoryId"] == 61  # fuzzy
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "index.json")
+    _index().save(path)
+    restored = CatalogIndex()
+    assert restored.load(path)
+    assert restored.get_category(61)["Category"]["Name"] == "Tantalum Capacitors"
+    assert restored.search_manufacturers("ti")[0]["Id"] == 296
+    assert not CatalogIndex().load(str(tmp_path / "missing.json"))
+
+
+def test_resolvers_fetch_lists_once():
+    with _mock() as server, pointed_at(server):
+        async def run():
+            await asyncio.gather(*(digikey_mcp_server.resolve_manufacturer.fn("TI") for _ in range(5)))
+            for cid in (60, 61, 52):
+                assert (await digikey_mcp_server.get_category_by_id.fn(cid))["Category"]["CategoryId"] == cid
+            return await digikey_mcp_server.resolve_category.fn("ceramic")
+
+        result = asyncio.run(run())
+        assert result["matches"][0]["CategoryId"] == 60
+        assert server.count("/products/v4/search/manufacturers") == 1
+        assert server.count("/products/v4/search/categories") == 1
+
+
+def test_unknown_category_falls_back_to_api():
+    with _mock() as server, pointed_at(server):
+        server.route("GET", "/products/v4/search/categories/999", lambda *_: (
+            200, {"Category": {"CategoryId": 999, "Name": "New"}}, None
+        ))
+        result = asyncio.run(digikey_mcp_server.get_category_by_id.fn(999))
+        assert result["Category"]["Name"] == "New"
+        assert server.count("/products/v4/search/categories/999") == 1
+
+
+def test_stale_index_serves_while_refreshing(tmp_path):
+    path = str(tmp_path / "index.json")
+    with _mock() as server, pointed_at(server), \
+         patch.object(digikey_mcp_server, "INDEX_SNAPSHOT_PATH", path), \
+         patch.object(digikey_mcp_server, "INDEX_MAX_AGE", 60):
+        index = digikey_mcp_server._catalog_index
+        index.load_manufacturers({"Manufacturers": [{"Id": 296, "Name": "Texas Instruments"}]}, built_at=1.0)
+
+        async def run():
+            # Answered from the stale index; the refresh runs in the background
+            first = await digikey_mcp_server.resolve_manufacturer.fn("acme")
+            await asyncio.gather(*digikey_mcp_server._index_refreshes.values())
+            return first, await digikey_mcp_server.resolve_manufacturer.fn("acme")
+
+        stale, fresh = asyncio.run(run())
+        assert stale["matches"] == []
+        assert {m["Id"] for m in fresh["matches"]} == {1, 2}
+        assert server.count("/products/v4/search/manufacturers") == 1
+
+    restored = CatalogIndex()
+    assert restored.load(path)
+    assert restored.stats()["manufacturers"] == 5
+
+
+def test_snapshot_loaded_on_first_use(tmp_path):
+    path = str(tmp_path / "index.json")
+    _index().save(path)
+    with _mock() as server, pointed_at(server), \
+         patch.object(digikey_mcp_server, "INDEX_SNAPSHOT_PATH", path), \
+         patch.object(digikey_mcp_server, "_index_snapshot_checked", False):
+        assert not digikey_mcp_server._catalog_index.has("manufacturers")
+        result = asyncio.run(digikey_mcp_server.resolve_manufacturer.fn("TI"))
+        assert result["matches"][0]["Id"] == 296
+        assert server.count("/products/v4/search/manufacturers") == 0
+
+
+def test_snapshot_does_not_replace_fresher_index(tmp_path):
+    path = str(tmp_path / "index.json")
+    _index().save(path)
+    index = CatalogIndex()
+    index.load_manufacturers({"Manufacturers": [{"Id": 7, "Name": "Newer Corp"}]})
+    assert index.load(path)
+    assert index.stats()["manufacturers"] == 1  # built while the snapshot was read: kept
+    assert index.stats()["categories"] == 5  # not indexed yet: taken from the snapshot
+
+
+def test_prewarm_and_first_call_load_snapshot_once(tmp_path):
+    path = str(tmp_path / "index.json")
+    _index().save(path)
+    loads = []
+    original = CatalogIndex.load
+
+    def slow_load(self, p):
+        loads.append(p)
+        time.sleep(0.1)
+        return original(self, p)
+
+    with patch.object(digikey_mcp_server, "INDEX_SNAPSHOT_PATH", path), \
+         patch.object(digikey_mcp_server, "_index_snapshot_checked", False), \
+         patch.object(digikey_mcp_server, "_catalog_index", CatalogIndex()), \
+         patch.object(CatalogIndex, "load", slow_load):
+        threads = [threading.Thread(target=digikey_mcp_server._load_index_snapshot) for _ in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert digikey_mcp_server._catalog_index.has("manufacturers")
+    assert loads == [path]
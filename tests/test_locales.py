@@ -0,0 +1,75 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+import digikey_mcp_server
+from digikey_mcp_server import _locale_headers, _parse_locale
+from digikey_noauth_tools import generate_cart_url, generate_cart_urls
+from tests.mock_digikey import MockDigiKey, pointed_at
+
+PRICES = {"USD": 1.00, "EUR": 0.90, "GBP": 0.85}
+
+
+def _details(path, query, body, headers):
+    headers = {k.lower(): v for k, v in headers.items()}
+    site = headers["x-digikey-locale-site"]
+    currency = headers.get("x-digikey-locale-currency") or {"US": "USD", "DE": "EUR", "UK": "GBP"}[site]
+    return 200, {
+        "SearchLocaleUsed": {"Site": site, "Currency": currency, "Language": "en"},
+        "Product": {
+            "ManufacturerProductNumber": "LM358",
+            "QuantityAvailable": 100,
+            "ProductVariations": [{"DigiKeyProductNumber": "LM358-CT-ND", "PackageType": {"Name": "Cut Tape"},
+                                   "StandardPricing": [{"BreakQuantity": 1, "UnitPrice": PRICES[currency]}]}],
+        },
+    }, None
+
+
+def test_locale_headers_defaults():
+    with patch.dict(os.environ, {"DIGIKEY_LOCALE_SITE": "AT", "DIGIKEY_LOCALE_CURRENCY": "EUR", "DIGIKEY_LOCALE_LANGUAGE": "de"}):
+        assert _locale_headers() == {
+            "X-DIGIKEY-Locale-Site": "AT", "X-DIGIKEY-Locale-Language": "de", "X-DIGIKEY-Locale-Currency": "EUR",
+        }
+        # A per-call site uses that site's defaults, not the server's
+        assert _locale_headers(site="uk") == {"X-DIGIKEY-Locale-Site": "UK"}
+        assert _locale_headers(currency="usd")["X-DIGIKEY-Locale-Currency"] == "USD"
+
+
+def test_parse_locale():
+    assert _parse_locale("de:eur") == {"site": "DE", "currency": "EUR", "language": None}
+    assert _parse_locale("US") == {"site": "US", "currency": None, "language": None}
+    with pytest.raises(ValueError):
+        _parse_locale(":EUR")
+
+
+def test_compare_locales_concurrent_and_cached_per_locale():
+    async def run():
+        await digikey_mcp_server._ensure_token()
+        plain = await digikey_mcp_server.compare_locales.fn("LM358", ["US", "DE:EUR", "UK"], quantity=10)
+        again = await digikey_mcp_server.compare_locales.fn(
+            "LM358", ["US", "DE:EUR", "UK"], quantity=10, exchange_rates={"USD": 1.0, "EUR": 1.1, "GBP": 1.3}
+        )
+        return plain, again
+
+    with MockDigiKey(latency=0.05) as server, pointed_at(server):
+        server.route("GET", "/products/v4/search/LM358/productdetails", _details)
+        plain, converted = asyncio.run(run())
+        assert server.count("/products/v4/search/LM358/productdetails") == 3  # second call cached per locale
+
+    assert [r["currency"] for r in plain["locales"]] == ["USD", "EUR", "GBP"]
+    assert [r["unit_price"] for r in plain["locales"]] == [1.00, 0.90, 0.85]
+    assert plain["locales"][1]["extended_cost"] == 9.0
+    assert plain["cheapest"] is None  # different currencies, no exchange rates
+    assert converted["locales"][1]["unit_price_converted"] == 0.99
+    assert converted["cheapest"] == "DE:EUR"
+
+
+def test_cart_and_mylist_urls_per_site():
+    parts = [{"part_number": "X", "quantity": 1}]
+    assert generate_cart_url(parts, site="DE")["url"].startswith("https://www.digikey.de/classic/ordering/fastadd.aspx?")
+    assert generate_cart_urls(parts, site="UK")["urls"][0].startswith("https://www.digikey.co.uk/")
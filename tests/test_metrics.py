@@ -0,0 +1,74 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+
+import httpx
+
+import digikey_mcp_server
+from digikey_metrics import Metrics, endpoint_label
+from tests.mock_digikey import MockDigiKey, pointed_at
+
+
+def test_endpoint_label_collapses_ids():
+    base = "https://api.digikey.com"
+    assert endpoint_label(f"{base}/products/v4/search/keyword") == "/products/v4/search/keyword"
+    assert endpoint_label(f"{base}/products/v4/search/497-11767-ND/productdetails") == "/products/v4/search/{product}/productdetails"
+    assert endpoint_label(f"{base}/products/v4/search/categories/12") == "/products/v4/search/categories/{id}"
+    assert endpoint_label(f"{base}/orderstatus/v4/salesorder/1234") == "/orderstatus/v4/salesorder/{id}"
+
+
+def test_render_prometheus_text():
+    m = Metrics()
+    m.inc("digikey_tool_calls_total", tool="keyword_search", outcome="ok")
+    m.inc("digikey_tool_calls_total", tool="keyword_search", outcome="ok")
+    m.observe("digikey_tool_duration_seconds", 0.02, tool="keyword_search")
+    text = m.render()
+    assert "# TYPE digikey_tool_calls_total counter" in text
+    assert 'digikey_tool_calls_total{outcome="ok",tool="keyword_search"} 2' in text
+    assert 'digikey_tool_duration_seconds_bucket{tool="keyword_search",le="0.01"} 0' in text
+    assert 'digikey_tool_duration_seconds_bucket{tool="keyword_search",le="0.025"} 1' in text
+    assert 'digikey_tool_duration_seconds_bucket{tool="keyword_search",le="+Inf"} 1' in text
+    assert 'digikey_tool_duration_seconds_count{tool="keyword_search"} 1' in text
+
+
+def test_observe_response_counts_status_and_bytes():
+    m = Metrics()
+    request = httpx.Request("POST", "https://api.digikey.com/products/v4/search/keyword", json={"Keywords": "x"})
+    resp = httpx.Response(429, content=b"slow down", request=request)
+    m.observe_response(str(request.url), resp, 0.1)
+    snap = m.snapshot()
+    assert snap["digikey_upstream_requests_total"]["endpoint=/products/v4/search/keyword,status=429"] == 1
+    assert snap["digikey_upstream_bytes_received_total"]["endpoint=/products/v4/search/keyword"] == len(b"slow down")
+    assert snap["digikey_upstream_bytes_sent_total"]["endpoint=/products/v4/search/keyword"] == len(request.content)
+    assert snap["digikey_upstream_duration_seconds"]["endpoint=/products/v4/search/keyword"]["p50_s"] == 0.1
+
+
+def test_disabled_records_nothing():
+    m = Metrics(enabled=False)
+    m.inc("digikey_tool_calls_total", tool="x", outcome="ok")
+    m.observe("digikey_tool_duration_seconds", 1.0, tool="x")
+    m.cache_lookup("https://api.digikey.com/products/v4/search/keyword", True)
+    assert m.snapshot() == {}
+    with m.span("noop"):
+        pass
+
+
+def test_server_records_upstream_and_cache_lookups():
+    digikey_mcp_server._metrics.reset()
+
+    async def calls():
+        await digikey_mcp_server._ensure_token()
+        await digikey_mcp_server.product_details.fn("STM32F405RGT6", bypass_cache=True)
+        await digikey_mcp_server.product_details.fn("STM32F405RGT6")
+
+    with MockDigiKey() as server, pointed_at(server):
+        asyncio.run(calls())
+
+    snap = digikey_mcp_server.metrics_snapshot.fn()
+    endpoint = "/products/v4/search/{product}/productdetails"
+    assert snap["digikey_upstream_requests_total"][f"endpoint={endpoint},status=200"] == 1
+    assert snap["digikey_cache_lookups_total"][f"endpoint={endpoint},result=hit"] == 1
+    assert "digikey_token_refreshes_total" in snap
+    assert "digikey_upstream_duration_seconds" in digikey_mcp_server.prometheus_metrics.fn()
@@ -1,3 +1,4 @@
+import asyncio
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -77,15 +78,15 @@ def test_mylist_link_builds_correct_payload():
         "singleUseUrl": "https://www.digikey.com/mylists/singleuse/abc123"
     }
 
-    with patch("digikey_noauth_tools.requests.post", return_value=mock_resp) as mock_post:
-        result = create_mylist_link("TestList", [
+    with patch("digikey_http.arequest", return_value=mock_resp) as mock_post:
+        result = asyncio.run(create_mylist_link("TestList", [
             {"part_number": "296-8875-1-ND", "quantity": 10, "reference": "R1"},
-        ])
+        ]))
 
     assert result == {"url": "https://www.digikey.com/mylists/singleuse/abc123"}
 
     call_args = mock_post.call_args
-    assert "listName=TestList" in call_args[0][0]
+    assert "listName=TestList" in call_args[0][1]
     payload = call_args[1]["json"]
     assert len(payload) == 1
     assert payload[0]["requestedPartNumber"] == "296-8875-1-ND"
@@ -99,10 +100,10 @@ def test_mylist_link_with_tags():
     mock_resp.headers = {"Content-Type": "application/json"}
     mock_resp.json.return_value = {"singleUseUrl": "https://example.com/x"}
 
-    with patch("digikey_noauth_tools.requests.post", return_value=mock_resp) as mock_post:
-        create_mylist_link("Test", [{"part_number": "X", "quantity": 1}], tags="KiCad,ProjectX")
+    with patch("digikey_http.arequest", return_value=mock_resp) as mock_post:
+        asyncio.run(create_mylist_link("Test", [{"part_number": "X", "quantity": 1}], tags="KiCad,ProjectX"))
 
-    assert "tags=KiCad%2CProjectX" in mock_post.call_args[0][0]
+    assert "tags=KiCad%2CProjectX" in mock_post.call_args[0][1]
 
 
 def test_mylist_link_cloudflare_block():
@@ -111,8 +112,114 @@ def test_mylist_link_cloudflare_block():
     mock_resp.headers = {"Content-Type": "text/html"}
     mock_resp.text = "<html>Cloudflare challenge</html>"
 
-    with patch("digikey_noauth_tools.requests.post", return_value=mock_resp):
-        result = create_mylist_link("Test", [{"part_number": "X", "quantity": 1}])
+    with patch("digikey_http.arequest", return_value=mock_resp):
+        result = asyncio.run(create_mylist_link("Test", [{"part_number": "X", "quantity": 1}]))
 
     assert "error" in result
     assert "Cloudflare" in result["error"] or "blocked" in result["error"].lower()
+
+
+import json
+
+import digikey_noauth_tools
+from digikey_noauth_tools import _mylist_body, create_mylist_links
+from tests.mock_digikey import MockDigiKey, pointed_at
+
+
+def test_mylist_body_matches_json_payload():
+    parts = [{"part_number": "A", "quantity": 1, "reference": "R1"}, {"part_number": "B", "quantity": 2}]
+    body = json.loads(_mylist_body(parts))
+    assert [e["requestedPartNumber"] for e in body] == ["A", "B"]
+    assert body[1]["quantities"] == [{"quantity": 2}]
+    assert json.loads(_mylist_body([])) == []
+
+
+def test_mylist_links_chunks_and_retries_failed_chunk():
+    attempts = {}
+
+    def handler(path, query, body, headers):
+        name = query["listName"][0]
+        attempts[name] = attempts.get(name, 0) + 1
+        if name.endswith("(2/3)") and attempts[name] == 1:
+            return 503, {"error": "busy"}, None
+        return 200, {"singleUseUrl": f"https://example.com/{len(json.loads(body))}"}, None
+
+    parts = [{"part_number": f"P{i}", "quantity": 1} for i in range(250)]
+    with MockDigiKey() as server, pointed_at(server), \
+         patch.object(digikey_noauth_tools, "MYLIST_BACKOFF_BASE", 0.01):
+        server.route("POST", "/mylists/api/thirdparty", handler)
+        result = asyncio.run(create_mylist_links("BOM", parts, chunk_size=100))
+
+    assert result["failed"] == 0
+    assert result["urls"] == ["https://example.com/100", "https://example.com/100", "https://example.com/50"]
+    assert [r["list_name"] for r in result["lists"]] == ["BOM (1/3)", "BOM (2/3)", "BOM (3/3)"]
+    assert attempts == {"BOM (1/3)": 1, "BOM (2/3)": 2, "BOM (3/3)": 1}
+
+
+def test_mylist_links_reports_chunk_that_keeps_failing():
+    with MockDigiKey() as server, pointed_at(server), \
+         patch.object(digikey_noauth_tools, "MYLIST_BACKOFF_BASE", 0.01):
+        server.route("POST", "/mylists/api/thirdparty", lambda *_: (503, {}, None))
+        result = asyncio.run(create_mylist_links("BOM", [{"part_number": "X", "quantity": 1}], max_retries=1))
+
+    assert result["failed"] == 1 and result["urls"] == []
+    assert result["lists"][0]["list_name"] == "BOM"
+    assert server.count("/mylists/api/thirdparty") == 2
+
+
+from urllib.parse import parse_qsl, urlsplit
+
+from digikey_noauth_tools import generate_cart_urls
+
+
+def _synthetic_bom(lines):
+    return [
+        {"part_number": f"{i:05d}-RES 10K/1%-ND", "quantity": (i * 37) % 5000 + 1,
+         **({"customer_ref": f"R{i}, R{i + 1}"} if i % 3 == 0 else {})}
+        for i in range(lines)
+    ]
+
+
+def _decoded(url):
+    params = dict(parse_qsl(urlsplit(url).query))
+    parts = []
+    n = 1
+    while f"part{n}" in params:
+        part = {"part_number": params[f"part{n}"], "quantity": int(params[f"qty{n}"])}
+        if f"cref{n}" in params:
+            part["customer_ref"] = params[f"cref{n}"]
+        parts.append(part)
+        n += 1
+    return parts, params.get("newcart")
+
+
+def test_cart_urls_pack_large_bom_within_limit():
+    bom = _synthetic_bom(5000)
+    result = generate_cart_urls(bom, max_url_length=1700)
+
+    assert "warning" not in result
+    assert all(len(url) <= 1700 for url in result["urls"])
+    decoded = [_decoded(url) for url in result["urls"]]
+    assert [p for parts, _ in decoded for p in parts] == bom  # order and refs preserved
+    assert [newcart for _, newcart in decoded] == ["true"] + [None] * (len(decoded) - 1)
+
+    # Packed tightly: the next line would not have fit in any batch
+    for batch in result["batches"][:-1]:
+        grown = bom[batch["first_line"] - 1:batch["last_line"] + 1]
+        assert len(generate_cart_url(grown, new_cart=batch["first_line"] == 1)["url"]) > 1700
+
+
+def test_cart_urls_small_limits_and_no_new_cart():
+    bom = _synthetic_bom(1200)
+    for limit in (250, 4000):
+        result = generate_cart_urls(bom, new_cart=False, max_url_length=limit)
+        assert all(len(url) <= limit for url in result["urls"])
+        assert sum(b["parts"] for b in result["batches"]) == len(bom)
+        assert not any("newcart" in url for url in result["urls"])
+
+
+def test_cart_urls_oversize_part_gets_own_url():
+    bom = [{"part_number": "A", "quantity": 1}, {"part_number": "X" * 300, "quantity": 1}, {"part_number": "B", "quantity": 1}]
+    result = generate_cart_urls(bom, max_url_length=200)
+    assert [b["parts"] for b in result["batches"]] == [1, 1, 1]
+    assert "warning" in result and "[2]" in result["warning"]
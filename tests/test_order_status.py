@@ -1,3 +1,4 @@
+import asyncio
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -12,10 +13,10 @@ def test_list_orders_default_params():
     mock_resp.json.return_value = {"Orders": [], "TotalCount": 0}
 
     with patch("digikey_mcp_server._ensure_token", return_value="fake_token"), \
-         patch("digikey_mcp_server.requests.get", return_value=mock_resp) as mock_get:
-        result = list_orders.fn()
+         patch("digikey_http.arequest", return_value=mock_resp) as mock_get:
+        result = asyncio.run(list_orders.fn())
 
-    call_url = mock_get.call_args[0][0]
+    call_url = mock_get.call_args[0][1]
     assert f"{API_BASE}/orderstatus/v4/orders" in call_url
     assert "PageSize=10" in call_url
     assert result == {"Orders": [], "TotalCount": 0}
@@ -27,10 +28,10 @@ def test_list_orders_with_dates():
     mock_resp.json.return_value = {"Orders": [], "TotalCount": 0}
 
     with patch("digikey_mcp_server._ensure_token", return_value="fake_token"), \
-         patch("digikey_mcp_server.requests.get", return_value=mock_resp) as mock_get:
-        list_orders.fn(start_date="2026-01-01", end_date="2026-02-01")
+         patch("digikey_http.arequest", return_value=mock_resp) as mock_get:
+        asyncio.run(list_orders.fn(start_date="2026-01-01", end_date="2026-02-01"))
 
-    call_url = mock_get.call_args[0][0]
+    call_url = mock_get.call_args[0][1]
     assert "StartDate=2026-01-01" in call_url
     assert "EndDate=2026-02-01" in call_url
 
@@ -41,9 +42,9 @@ def test_get_order_status():
     mock_resp.json.return_value = {"SalesOrderId": 12345, "Status": "Shipped"}
 
     with patch("digikey_mcp_server._ensure_token", return_value="fake_token"), \
-         patch("digikey_mcp_server.requests.get", return_value=mock_resp) as mock_get:
-        result = get_order_status.fn(12345)
+         patch("digikey_http.arequest", return_value=mock_resp) as mock_get:
+        result = asyncio.run(get_order_status.fn(12345))
 
-    call_url = mock_get.call_args[0][0]
+    call_url = mock_get.call_args[0][1]
     assert f"{API_BASE}/orderstatus/v4/salesorder/12345" in call_url
     assert result == {"SalesOrderId": 12345, "Status": "Shipped"}
@@ -0,0 +1,120 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+
+import digikey_mcp_server
+from digikey_orders import OrderStore
+from tests.mock_digikey import FakeClock, MockDigiKey, pointed_at
+
+
+def _detail(oid, status, date, items):
+    return {
+        "SalesOrderId": oid,
+        "DateEntered": date,
+        "Currency": "USD",
+        "Status": {"SalesOrderStatus": status},
+        "LineItems": [
+            {"DigiKeyProductNumber": pn, "ManufacturerProductNumber": pn.split("-")[0], "QuantityOrdered": qty, "UnitPrice": price}
+            for pn, qty, price in items
+        ],
+    }
+
+
+def test_query_and_aggregate():
+    store = OrderStore()
+    store.upsert_detail(_detail(1, "Shipped", "2026-01-10T09:00:00", [("R1K-CT-ND", 100, 0.01), ("C100N-CT-ND", 50, 0.02)]))
+    store.upsert_detail(_detail(2, "Processing", "2026-04-02T09:00:00", [("R1K-CT-ND", 10, 0.05)]))
+    store.upsert_detail(_detail(3, "Delivered", "2026-02-20T09:00:00", [("LED-CT-ND", 5, 0.30)]))
+
+    open_orders = store.query(open_only=True)
+    assert [o["SalesOrderId"] for o in open_orders["orders"]] == [2, 1]  # shipped is still in transit
+
+    q1 = store.query(start_date="2026-01-01", end_date="2026-03-31")
+    assert q1["matched"] == 2
+    assert q1["total_spend"] == 3.5
+
+    by_quarter = store.aggregate("quarter")
+    assert by_quarter == [
+        {"quarter": "2026-Q1", "orders": 2, "spend": 3.5, "quantity": 155},
+        {"quarter": "2026-Q2", "orders": 1, "spend": 0.5, "quantity": 10},
+    ]
+    assert store.query(part_number="R1K")["matched"] == 2
+    with pytest.raises(ValueError):
+        store.aggregate("nope")
+
+
+def test_closed_orders_kept_open_orders_due():
+    clock = FakeClock()
+    store = OrderStore(clock=clock)
+    store.upsert_headers([{"SalesOrderId": 1, "Status": "Delivered"}, {"SalesOrderId": 2, "Status": "Processing"}])
+    assert sorted(store.due_for_detail(900)) == [1, 2]  # never fetched
+
+    store.upsert_detail(_detail(1, "Delivered", "2026-01-10", []))
+    store.upsert_detail(_detail(2, "Processing", "2026-01-11", []))
+    assert store.due_for_detail(900) == []
+    assert store.closed_detail(1)["SalesOrderId"] == 1
+    assert store.closed_detail(2) is None
+
+    clock.now += 901
+    assert store.due_for_detail(900) == [2]
+
+
+def test_shipped_order_polled_until_delivered():
+    clock = FakeClock()
+    store = OrderStore(clock=clock)
+    store.upsert_detail(_detail(1, "Shipped", "2026-01-10", []))
+    assert store.closed_detail(1) is None
+    assert [o["SalesOrderId"] for o in store.query(open_only=True)["orders"]] == [1]
+
+    clock.now += 901
+    assert store.due_for_detail(900) == [1]
+    store.upsert_detail(_detail(1, "Delivered", "2026-01-10", []))
+    assert store.closed_detail(1)["Status"]["SalesOrderStatus"] == "Delivered"
+    assert store.query(open_only=True)["matched"] == 0
+
+    clock.now += 901
+    assert store.due_for_detail(900) == []
+
+
+def test_sync_fetches_each_closed_order_once():
+    async def run():
+        await digikey_mcp_server._ensure_token()
+        first = await digikey_mcp_server.sync_orders.fn(start_date="2026-01-01")
+        second = await digikey_mcp_server.sync_orders.fn(start_date="2026-01-01")
+        detail = await digikey_mcp_server.get_order_status.fn(1003)
+        return first, second, detail
+
+    with MockDigiKey().install_catalog() as server, pointed_at(server):
+        first, second, detail = asyncio.run(run())
+        assert first["listed"] == 10 and first["fetched"] == 10
+        assert second["fetched"] == 0
+        assert detail["SalesOrderId"] == 1003
+        assert server.count("/orderstatus/v4/salesorder/") == 10
+
+        result = asyncio.run(digikey_mcp_server.query_orders.fn(group_by="month"))
+        assert result["matched"] == 10
+        assert result["groups"] == [{"month": "2026-01", "orders": 10, "spend": 100.0, "quantity": 2000}]
+
+
+def test_store_failure_does_not_fail_order_tools():
+    def locked(*args):
+        raise sqlite3.OperationalError("database is locked")
+
+    async def run():
+        listed = await digikey_mcp_server.list_orders.fn(start_date="2026-01-01")
+        detail = await digikey_mcp_server.get_order_status.fn(1003)
+        return listed, detail
+
+    with MockDigiKey().install_catalog() as server, pointed_at(server), \
+         patch.object(OrderStore, "upsert_headers", locked), \
+         patch.object(OrderStore, "closed_detail", locked), \
+         patch.object(OrderStore, "upsert_detail", locked):
+        listed, detail = asyncio.run(run())
+    assert len(listed["Orders"]) == 10
+    assert detail["SalesOrderId"] == 1003
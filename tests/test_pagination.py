@@ -0,0 +1,87 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import json
+
+from digikey_mcp_server import keyword_search_all, list_orders_all
+from tests.mock_digikey import MockDigiKey, pointed_at
+
+PRODUCTS = [
+    {
+        "ManufacturerProductNumber": f"MPN-{i}",
+        "Manufacturer": {"Id": 1, "Name": "ACME"},
+        "Description": {"ProductDescription": f"Resistor {i}", "DetailedDescription": "x" * 200},
+        "QuantityAvailable": i,
+        "UnitPrice": 0.1,
+        "ProductStatus": {"Id": 0, "Status": "Active"},
+        "ProductVariations": [{"DigiKeyProductNumber": f"DK-{i}-ND"}],
+        "Parameters": [{"ParameterText": "Resistance", "ValueText": "1k"}] * 10,
+    }
+    for i in range(120)
+]
+
+ORDERS = [
+    {"SalesOrderId": i, "DateEntered": "2026-01-01", "Status": {"SalesOrderStatus": "Shipped", "ShortDescription": "Shipped"},
+     "LineItems": [{"ProductNumber": "X"}] * 3, "ShippingAddress": {"City": "Thief River Falls"}}
+    for i in range(60)
+]
+
+
+def _search(path, query, body, headers):
+    req = json.loads(body)
+    offset, limit = req.get("Offset", 0), req["Limit"]
+    return 200, {"Products": PRODUCTS[offset:offset + limit], "ProductsCount": len(PRODUCTS)}, None
+
+
+def _orders(path, query, body, headers):
+    size = int(query["PageSize"][0])
+    page = int(query.get("PageNumber", ["1"])[0])
+    return 200, {"Orders": ORDERS[(page - 1) * size:page * size], "TotalOrders": len(ORDERS)}, None
+
+
+def test_keyword_search_all_walks_offsets():
+    with MockDigiKey() as server, pointed_at(server):
+        server.route("POST", "/products/v4/search/keyword", _search)
+        result = asyncio.run(keyword_search_all.fn("resistor", max_results=1000))
+        assert server.count("/products/v4/search/keyword") == 3
+
+    assert result["Returned"] == 120
+    assert result["ProductsCount"] == 120
+    assert result["Products"][119] == {
+        "ManufacturerProductNumber": "MPN-119", "Manufacturer": {"Name": "ACME"},
+        "Description": {"ProductDescription": "Resistor 119"}, "QuantityAvailable": 119,
+        "UnitPrice": 0.1, "ProductStatus": {"Status": "Active"},
+        "ProductVariations": [{"DigiKeyProductNumber": "DK-119-ND"}],
+    }
+
+
+def test_keyword_search_all_stops_at_cap():
+    with MockDigiKey() as server, pointed_at(server):
+        server.route("POST", "/products/v4/search/keyword", _search)
+        result = asyncio.run(keyword_search_all.fn("resistor", max_results=60, compact=False))
+        assert server.count("/products/v4/search/keyword") == 2
+
+    assert result["Returned"] == 60
+    assert result["Products"][0]["Parameters"]
+
+
+def test_keyword_search_all_fields():
+    with MockDigiKey() as server, pointed_at(server):
+        server.route("POST", "/products/v4/search/keyword", _search)
+        result = asyncio.run(keyword_search_all.fn("resistor", max_results=5, fields="ManufacturerProductNumber"))
+
+    assert result["Products"][4] == {"ManufacturerProductNumber": "MPN-4"}
+
+
+def test_list_orders_all_walks_pages():
+    with MockDigiKey() as server, pointed_at(server):
+        server.route("GET", "/orderstatus/v4/orders", _orders)
+        result = asyncio.run(list_orders_all.fn("2025-01-01", "2026-01-01"))
+        assert server.count("/orderstatus/v4/orders") == 3
+
+    assert result["Returned"] == 60
+    assert result["Orders"][59] == {
+        "SalesOrderId": 59, "DateEntered": "2026-01-01", "Status": "Shipped", "LineItemCount": 3,
+    }
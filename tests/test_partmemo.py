@@ -0,0 +1,192 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import json
+import sqlite3
+from unittest.mock import patch
+
+import digikey_mcp_server
+from digikey_partmemo import PartMemo
+from tests.mock_digikey import FakeClock, MockDigiKey, pointed_at
+
+
+def _product(mpn, manufacturer="Texas Instruments", variants=("CT", "DKR")):
+    names = {"CT": "Cut Tape (CT)", "TR": "Tape & Reel (TR)", "DKR": "Digi-Reel®"}
+    return {
+        "ManufacturerProductNumber": mpn,
+        "Manufacturer": {"Id": 296, "Name": manufacturer},
+        "ProductStatus": {"Status": "Active"},
+        "ProductVariations": [
+            {"DigiKeyProductNumber": f"{mpn}-{v}-ND", "PackageType": {"Name": names[v]},
+             "MinimumOrderQuantity": 4000 if v == "TR" else 1}
+            for v in variants
+        ],
+    }
+
+
+def test_lookup_by_mpn_and_digikey_part_number():
+    memo = PartMemo()
+    assert memo.learn([_product("LM358DR"), {"ManufacturerProductNumber": "NO-VARIANTS"}]) == 1
+
+    [match] = memo.lookup("lm358dr ")
+    assert match["manufacturer"] == "Texas Instruments"
+    assert [v["digikey_part_number"] for v in match["variants"]] == ["LM358DR-CT-ND", "LM358DR-DKR-ND"]
+    assert memo.lookup("LM358DR-DKR-ND") == [match]
+
+    assert memo.digikey_part_number("LM358DR") == "LM358DR-CT-ND"
+    assert memo.digikey_part_number("LM358DR", digi_reel=True) == "LM358DR-DKR-ND"
+    assert memo.digikey_part_number("LM358DR-CT-ND", digi_reel=True) == "LM358DR-DKR-ND"
+    assert memo.digikey_part_number("LM358DR-DKR-ND") == "LM358DR-CT-ND"
+    assert memo.lookup("NO-VARIANTS") == []
+    assert memo.stats()["hits"] == 6 and memo.stats()["misses"] == 1
+
+
+def test_same_mpn_from_two_manufacturers_is_ambiguous():
+    memo = PartMemo()
+    memo.learn([_product("2N7002"), _product("2N7002", "onsemi", ("TR",))])
+    assert len(memo.lookup("2N7002")) == 2
+    assert memo.digikey_part_number("2N7002") is None
+    assert memo.digikey_part_number("2N7002", manufacturer="Nexperia") is None
+    assert memo.digikey_part_number("2N7002", manufacturer="ON Semi") == "2N7002-TR-ND"
+    assert memo.digikey_part_number("2N7002", manufacturer="Texas Instruments Inc.") == "2N7002-CT-ND"
+    assert memo.digikey_part_number("2N7002", manufacturer="TI") == "2N7002-CT-ND"
+
+
+def test_invalidation_rules():
+    clock = FakeClock()
+    memo = PartMemo(max_entries=2, max_age=100, clock=clock)
+    memo.learn([_product("A")])
+    memo.learn([_product("A", variants=("TR",))])  # packaging changed upstream
+    assert memo.lookup("A-CT-ND") == []
+    assert memo.digikey_part_number("A") == "A-TR-ND"
+
+    assert memo.invalidate("A-TR-ND") == 1
+    assert memo.lookup("A") == []
+
+    memo.learn([_product("B")])
+    clock.now += 10
+    memo.learn([_product("C")])
+    clock.now += 10
+    memo.lookup("B")  # B is now more recently used than C
+    memo.learn([_product("D")])
+    assert memo.stats()["products"] == 2
+    assert memo.lookup("C") == [] and memo.lookup("B") and memo.lookup("D")
+
+    clock.now += 101
+    assert memo.lookup("D") == []
+    assert memo.stats()["products"] == 1 and memo.stats()["variants"] == 2
+
+
+def _exact_search(path, query, body, headers):
+    keywords = json.loads(body)["Keywords"]
+    if keywords.startswith("UNKNOWN"):
+        return 200, {"Products": [], "ExactMatches": [], "ProductsCount": 0}, None
+    return 200, {"Products": [_product(keywords)], "ExactMatches": [_product(keywords)], "ProductsCount": 1}, None
+
+
+def test_resolve_part_numbers_searches_each_mpn_once():
+    async def run():
+        first = await digikey_mcp_server.resolve_part_numbers.fn(["LM358DR", "NE555P", "UNKNOWN-1", "LM358DR"])
+        again = await digikey_mcp_server.resolve_part_numbers.fn(["LM358DR", "ne555p", "NE555P-CT-ND"])
+        await digikey_mcp_server.product_details.fn("OPA2134")  # learned from details too
+        learned = await digikey_mcp_server.resolve_part_numbers.fn(["OPA2134"])
+        return first, again, learned
+
+    with MockDigiKey() as server, pointed_at(server):
+        server.route("POST", "/products/v4/search/keyword", _exact_search)
+        server.route("GET", "/products/v4/search/", lambda path, *_: (
+            200, {"Product": _product(path.split("/")[4])}, None
+        ))
+        first, again, learned = asyncio.run(run())
+        searches = server.count("/products/v4/search/keyword")
+        stats = digikey_mcp_server.cache_stats.fn()["part_memo"]
+
+    assert first["searches"] == 3 and first["unresolved"] == ["UNKNOWN-1"]
+    assert first["resolved"]["LM358DR"]["variants"][0]["digikey_part_number"] == "LM358DR-CT-ND"
+    assert again["searches"] == 0 and set(again["resolved"]) == {"LM358DR", "ne555p", "NE555P-CT-ND"}
+    assert learned["searches"] == 0
+    assert searches == 3
+    assert stats["products"] == 3
+
+
+def test_digi_reel_pricing_by_mpn_and_404_fallback():
+    requested = []
+
+    def digi_reel(path, query, body, headers):
+        part = path.split("/")[4]
+        requested.append(part)
+        if part == "TPS54331DR-DKR-ND":
+            return 404, {"ErrorMessage": "Not found"}, None
+        return 200, {"ReelingFee": 7.0, "DigiKeyProductNumber": part}, None
+
+    async def run():
+        await digikey_mcp_server.keyword_search.fn("LM358DR")
+        await digikey_mcp_server.keyword_search.fn("TPS54331DR")
+        found = await digikey_mcp_server.get_digi_reel_pricing.fn("LM358DR", requested_quantity=100)
+        fallback = await digikey_mcp_server.get_digi_reel_pricing.fn("TPS54331DR", requested_quantity=100)
+        return found, fallback
+
+    with MockDigiKey() as server, pointed_at(server):
+        server.route("POST", "/products/v4/search/keyword", _exact_search)
+        server.route("GET", "/products/v4/search/", digi_reel)
+        found, fallback = asyncio.run(run())
+
+    assert found["DigiKeyProductNumber"] == "LM358DR-DKR-ND"
+    assert fallback["DigiKeyProductNumber"] == "TPS54331DR"
+    assert requested == ["LM358DR-DKR-ND", "TPS54331DR-DKR-ND", "TPS54331DR"]
+    assert digikey_mcp_server._part_memo.lookup("TPS54331DR") == []
+
+
+def test_bom_cart_urls_use_known_digikey_part_numbers(tmp_path):
+    (tmp_path / "bom.csv").write_text("Refs,MPN,Manufacturer\nU1,LM358DR,TI\nU2,NE555P,Texas Instruments\nU3,NEW-PART,ACME\nU4,OPA2134,Analog Devices\n")
+
+    async def run():
+        await digikey_mcp_server.resolve_part_numbers.fn(["LM358DR", "NE555P", "OPA2134"])
+        return await digikey_mcp_server.process_bom_file.fn("bom.csv", target="cart")
+
+    with MockDigiKey() as server, pointed_at(server), \
+         patch.object(digikey_mcp_server, "BOM_DIR", str(tmp_path)):
+        server.route("POST", "/products/v4/search/keyword", _exact_search)
+        result = asyncio.run(run())
+
+    url = result["result"]["batches"][0]["url"]
+    assert "part1=LM358DR-CT-ND" in url and "part2=NE555P-CT-ND" in url and "part3=NEW-PART&" in url
+    assert "part4=OPA2134&" in url  # known, but made by another manufacturer than the BOM says
+
+
+def test_memo_failure_does_not_fail_lookup():
+    def locked(products):
+        raise sqlite3.OperationalError("database is locked")
+
+    with MockDigiKey().install_catalog() as server, pointed_at(server), \
+         patch.object(digikey_mcp_server._part_memo, "learn", locked):
+        result = asyncio.run(digikey_mcp_server.product_details.fn("LM358DR"))
+    assert result["Product"]["ManufacturerProductNumber"] == "LM358DR"
+
+
+def test_memo_read_failure_is_a_miss(tmp_path):
+    (tmp_path / "bom.csv").write_text("Refs,MPN,Manufacturer\nU1,LM358DR,TI\n")
+
+    def locked(*args):
+        raise sqlite3.OperationalError("database is locked")
+
+    async def run():
+        resolved = await digikey_mcp_server.resolve_part_numbers.fn(["LM358DR"])
+        pricing = await digikey_mcp_server.get_digi_reel_pricing.fn("LM358DR", requested_quantity=100)
+        cart = await digikey_mcp_server.process_bom_file.fn("bom.csv", target="cart")
+        return resolved, pricing, cart
+
+    with MockDigiKey() as server, pointed_at(server), \
+         patch.object(digikey_mcp_server, "BOM_DIR", str(tmp_path)), \
+         patch.object(digikey_mcp_server._part_memo, "lookup", locked):
+        server.route("POST", "/products/v4/search/keyword", _exact_search)
+        server.route("GET", "/products/v4/search/", lambda path, *_: (
+            200, {"ReelingFee": 7.0, "DigiKeyProductNumber": path.split("/")[4]}, None
+        ))
+        resolved, pricing, cart = asyncio.run(run())
+
+    assert resolved["searches"] == 1 and resolved["unresolved"] == ["LM358DR"]
+    assert pricing["DigiKeyProductNumber"] == "LM358DR"
+    assert "part1=LM358DR&" in cart["result"]["batches"][0]["url"]
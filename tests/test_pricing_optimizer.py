@@ -0,0 +1,85 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+
+from digikey_mcp_server import optimize_bom_pricing
+from digikey_pricing import optimize, packaging_options
+from tests.mock_digikey import MockDigiKey, pointed_at
+
+CUT_TAPE_BREAKS = [
+    {"BreakQuantity": 1, "UnitPrice": 0.10},
+    {"BreakQuantity": 10, "UnitPrice": 0.05},
+    {"BreakQuantity": 100, "UnitPrice": 0.02},
+    {"BreakQuantity": 1000, "UnitPrice": 0.015},
+]
+
+PRICING = {"ProductPricings": [{
+    "ManufacturerProductNumber": "RC0603",
+    "QuantityAvailable": 100_000,
+    "ProductVariations": [
+        {"DigiKeyProductNumber": "RC-CT-ND", "PackageType": {"Name": "Cut Tape (CT)"},
+         "StandardPricing": CUT_TAPE_BREAKS, "MinimumOrderQuantity": 1, "StandardPackage": 1000},
+        {"DigiKeyProductNumber": "RC-TR-ND", "PackageType": {"Name": "Tape & Reel (TR)"},
+         "StandardPricing": [{"BreakQuantity": 1000, "UnitPrice": 0.011}],
+         "MinimumOrderQuantity": 1000, "StandardPackage": 1000},
+        {"DigiKeyProductNumber": "RC-DKR-ND", "PackageType": {"Name": "Digi-Reel®"},
+         "StandardPricing": CUT_TAPE_BREAKS, "MinimumOrderQuantity": 1, "StandardPackage": 1000},
+    ],
+}]}
+
+
+def test_rounds_up_to_cheaper_break():
+    result = optimize(packaging_options(PRICING), 8)
+    assert result["plan"][0]["digikey_part_number"] == "RC-CT-ND"
+    assert result["order_quantity"] == 10
+    assert result["total_cost"] == 0.5
+    assert result["savings"] == 0.3
+    assert result["next_break"] == {
+        "break_quantity": 100, "buy_more": 90, "unit_price": 0.02, "cost": 2.0, "extra_cost": 1.5,
+    }
+
+
+def test_full_reels_topped_up_with_cut_tape():
+    result = optimize(packaging_options(PRICING), 2500)
+    assert [(p["digikey_part_number"], p["quantity"]) for p in result["plan"]] == [
+        ("RC-TR-ND", 2000), ("RC-CT-ND", 500),
+    ]
+    assert result["total_cost"] == 32.0
+    assert result["cost_without_optimization"] == 33.0  # three full reels
+    assert result["surplus"] == 0
+
+
+def test_digi_reel_needs_a_fee():
+    assert "RC-DKR-ND" not in {o["digikey_part_number"] for o in packaging_options(PRICING)}
+    options = packaging_options(PRICING, digi_reel_fee=7.0)
+    digi_reel = next(o for o in options if o["digikey_part_number"] == "RC-DKR-ND")
+    assert digi_reel["fee"] == 7.0
+
+
+def test_optimize_bom_fetches_each_part_once():
+    lines = [
+        {"part_number": "RC0603", "quantity": 8, "customer_ref": "R1"},
+        {"part_number": "RC0603", "quantity": 2500},
+        {"part_number": "MISSING", "quantity": 1},
+    ]
+    with MockDigiKey() as server, pointed_at(server):
+        server.route("GET", "/products/v4/search/", lambda *_: (404, {"detail": "not found"}, None))
+        server.route("GET", "/products/v4/search/RC0603/pricing", lambda *_: (200, PRICING, None))
+        server.route("GET", "/products/v4/search/RC-DKR-ND/digireelpricing", lambda *_: (
+            200, {"ReelingFee": 7.0, "UnitPrice": 0.015, "ExtendedPrice": 37.5}, None
+        ))
+        result = asyncio.run(optimize_bom_pricing.fn(lines))
+        assert server.count("/products/v4/search/RC0603/pricing") == 1
+        assert server.count("/products/v4/search/RC-DKR-ND/digireelpricing") == 1
+
+    small, large, missing = result["lines"]
+    assert small["customer_ref"] == "R1"
+    assert small["order_quantity"] == 10
+    assert large["total_cost"] == 32.0
+    assert "error" in missing
+    assert result["summary"] == {
+        "lines": 3, "unique_parts": 2, "errors": 1,
+        "total_cost": 32.5, "cost_without_optimization": 33.8, "savings": 1.3,
+    }
@@ -0,0 +1,99 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+from unittest.mock import patch
+from urllib.parse import parse_qs
+
+import pytest
+
+import digikey_mcp_server
+from digikey_auth import TokenManager
+from digikey_orders import OrderStore
+from digikey_profiles import Profile, profile_store_path, profiles_from_env
+from digikey_ratelimit import RateLimiter
+from tests.mock_digikey import TOKEN_PATH, MockDigiKey, pointed_at
+
+
+def _token(path, query, body, headers):
+    client_id = parse_qs(body.decode())["client_id"][0]
+    return 200, {"access_token": f"token-{client_id}", "expires_in": 1799}, None
+
+
+def _details(path, query, body, headers):
+    headers = {k.lower(): v for k, v in headers.items()}
+    return 200, {
+        "Authorization": headers["authorization"],
+        "ClientId": headers["x-digikey-client-id"],
+        "AccountId": headers.get("x-digikey-account-id"),
+    }, None
+
+
+def _acme() -> Profile:
+    return Profile(
+        "acme", "acme-id", "acme-secret", "12345",
+        TokenManager(lambda: digikey_mcp_server.get_access_token("acme-id", "acme-secret"), background=False),
+        RateLimiter(products_per_minute=60_000, orders_per_minute=60_000, backoff_base=0.01),
+        OrderStore(),
+    )
+
+
+def test_profiles_from_env():
+    env = {
+        "CLIENT_ID": "global-id",
+        "CLIENT_SECRET": "global-secret",
+        "DIGIKEY_PROFILES": "acme, globex-eu,default",
+        "DIGIKEY_PROFILE_ACME_CLIENT_ID": "acme-id",
+        "DIGIKEY_PROFILE_ACME_CLIENT_SECRET": "acme-secret",
+        "DIGIKEY_PROFILE_GLOBEX_EU_ACCOUNT_ID": "987",
+    }
+    assert profiles_from_env(env) == {
+        "acme": {"client_id": "acme-id", "client_secret": "acme-secret", "account_id": None},
+        "globex-eu": {"client_id": "global-id", "client_secret": "global-secret", "account_id": "987"},
+    }
+    assert profiles_from_env({}) == {}
+
+
+def test_profile_store_path():
+    assert profile_store_path("/data/orders.db", "acme") == "/data/orders-acme.db"
+    assert profile_store_path("/data/orders.db", "default") == "/data/orders.db"
+    assert profile_store_path(":memory:", "acme") == ":memory:"
+
+
+def test_profiles_use_own_token_headers_and_cache_namespace():
+    acme = _acme()
+
+    async def run():
+        default = await digikey_mcp_server.product_details.fn("P1", compact=False)
+        other = await digikey_mcp_server.product_details.fn("P1", compact=False, profile="acme")
+        await digikey_mcp_server.product_details.fn("P1", compact=False, profile="acme")
+        return default, other
+
+    with MockDigiKey() as server, pointed_at(server), \
+         patch.object(digikey_mcp_server, "_profiles", {"acme": acme}):
+        server.route("POST", TOKEN_PATH, _token)
+        server.route("GET", "/products/v4/search/P1/productdetails", _details)
+        default, other = asyncio.run(run())
+        details_requests = server.count("/products/v4/search/P1")
+
+    assert default["Authorization"] == "Bearer token-id"
+    assert other == {"Authorization": "Bearer token-acme-id", "ClientId": "acme-id", "AccountId": "12345"}
+    # Same URL and headers otherwise, but each profile has its own cache entry
+    assert details_requests == 2
+    assert acme.token_manager.refresh_count == 1
+    assert acme.rate_limiter.stats()["budgets"]["products"]["acquired"] == 1
+
+
+def test_unknown_profile_rejected():
+    with MockDigiKey() as server, pointed_at(server):
+        with pytest.raises(ValueError, match="Unknown profile"):
+            asyncio.run(digikey_mcp_server.product_details.fn("P1", profile="nope"))
+
+
+def test_list_profiles():
+    with patch.object(digikey_mcp_server, "_profiles", {"acme": _acme()}):
+        listed = digikey_mcp_server.list_profiles.fn()
+    assert listed["default"] == "default"
+    assert [p["name"] for p in listed["profiles"]] == ["default", "acme"]
+    assert listed["profiles"][1]["account_id"] == "12345"
@@ -0,0 +1,110 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import time
+from email.utils import formatdate
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+import digikey_mcp_server
+from digikey_ratelimit import RateLimiter, TokenBucket, parse_retry_after
+from tests.mock_digikey import MockDigiKey, pointed_at
+
+
+def _flaky(statuses, headers=None):
+    """Route handler answering with `statuses` in turn, then 200."""
+    calls = []
+
+    def handler(*_):
+        calls.append(1)
+        status = statuses[len(calls) - 1] if len(calls) <= len(statuses) else 200
+        return status, {"attempt": len(calls)}, headers if status != 200 else None
+
+    return handler, calls
+
+
+def test_token_bucket_queues_beyond_burst():
+    bucket = TokenBucket(rate=20, capacity=2)
+
+    async def run():
+        start = time.perf_counter()
+        for _ in range(4):
+            await bucket.acquire()
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(run())
+    assert elapsed >= 0.09  # two tokens at 20/s
+    stats = bucket.stats()
+    assert stats["acquired"] == 4
+    assert stats["queued"] == 2
+    assert stats["max_wait_s"] > 0
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert 50 < parse_retry_after(formatdate(time.time() + 60, usegmt=True)) <= 60
+    assert parse_retry_after("garbage") is None
+
+
+def test_budget_selection():
+    limiter = RateLimiter()
+    assert limiter.budget_for("https://api.digikey.com/orderstatus/v4/orders") == "orders"
+    assert limiter.budget_for("https://api.digikey.com/products/v4/search/keyword") == "products"
+
+
+def test_429_retried_after_retry_after():
+    handler, calls = _flaky([429], {"Retry-After": "0.2"})
+    with MockDigiKey() as server, pointed_at(server):
+        server.route("GET", "/products/v4/search/X/media", handler)
+        start = time.perf_counter()
+        result = asyncio.run(digikey_mcp_server.get_product_media.fn("X"))
+        elapsed = time.perf_counter() - start
+        stats = digikey_mcp_server.rate_limit_stats.fn()
+
+    assert result == {"attempt": 2}
+    assert elapsed >= 0.2
+    assert stats["throttled"] == 1
+    assert stats["retries"] == 1
+
+
+def test_5xx_gives_up_after_max_retries():
+    handler, calls = _flaky([503] * 10)
+    with MockDigiKey() as server, pointed_at(server):
+        server.route("GET", "/orderstatus/v4/salesorder", handler)
+        with pytest.raises(httpx.HTTPStatusError):
+            asyncio.run(digikey_mcp_server.get_order_status.fn(1))
+        stats = digikey_mcp_server.rate_limit_stats.fn()
+
+    assert len(calls) == 4  # first attempt + 3 retries
+    assert stats["server_errors"] == 4
+    assert stats["budgets"]["orders"]["acquired"] == 4
+    assert stats["budgets"]["products"]["acquired"] == 0
+
+
+def test_retry_budget_exhausted():
+    handler, calls = _flaky([500] * 10)
+    limiter = RateLimiter(products_per_minute=60_000, backoff_base=0.001)
+    limiter.retry_budget.balance = 0
+    with MockDigiKey() as server, pointed_at(server), \
+         patch.object(digikey_mcp_server, "_rate_limiter", limiter):
+        server.route("GET", "/products/v4/search/X/media", handler)
+        with pytest.raises(httpx.HTTPStatusError):
+            asyncio.run(digikey_mcp_server.get_product_media.fn("X"))
+
+    assert len(calls) == 1
+    assert limiter.retries_denied == 1
+
+
+def test_exhausted_quota_header_pauses_budget():
+    limiter = RateLimiter()
+    bucket = limiter.buckets["products"]
+    limiter.observe(bucket, httpx.Headers({"X-BurstLimit-Remaining": "0", "X-BurstLimit-Reset": "0.2"}))
+
+    start = time.perf_counter()
+    asyncio.run(bucket.acquire())
+    assert time.perf_counter() - start >= 0.15
@@ -0,0 +1,105 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import threading
+
+from fastmcp import Client
+
+from digikey_mcp_server import mcp, resolve_bom, _unit_price_at
+from tests.mock_digikey import MockDigiKey, pointed_at
+
+BREAKS = [
+    {"BreakQuantity": 1, "UnitPrice": 0.10, "TotalPrice": 0.10},
+    {"BreakQuantity": 10, "UnitPrice": 0.05, "TotalPrice": 0.50},
+    {"BreakQuantity": 100, "UnitPrice": 0.02, "TotalPrice": 2.00},
+]
+
+
+def _details(path, query, body, headers):
+    part = path.split("/")[4]
+    if part == "MISSING":
+        return 404, {"detail": "not found"}, None
+    return 200, {"Product": {
+        "ManufacturerProductNumber": part,
+        "Manufacturer": {"Name": "ACME"},
+        "Description": {"ProductDescription": f"Part {part}"},
+        "QuantityAvailable": 50,
+        "ProductVariations": [
+            {"DigiKeyProductNumber": f"{part}-CT-ND", "PackageType": {"Name": "Cut Tape"},
+             "StandardPricing": BREAKS},
+        ],
+    }}, None
+
+
+def test_unit_price_at():
+    assert _unit_price_at(BREAKS, 1) == 0.10
+    assert _unit_price_at(BREAKS, 9) == 0.10
+    assert _unit_price_at(BREAKS, 10) == 0.05
+    assert _unit_price_at(BREAKS, 5000) == 0.02
+
+
+def test_resolve_bom_dedupes_and_isolates_errors():
+    lines = [
+        {"part_number": "R1K", "quantity": 10, "customer_ref": "R1"},
+        {"part_number": "MISSING", "quantity": 1},
+        {"part_number": "R1K", "quantity": 100, "customer_ref": "R2"},
+        {"part_number": "C100N", "quantity": 60},
+    ]
+    with MockDigiKey() as server, pointed_at(server):
+        server.route("GET", "/products/v4/search/", _details)
+        result = asyncio.run(resolve_bom.fn(lines))
+        assert server.count("/products/v4/search/") == 3
+
+    r1, missing, r2, cap = result["lines"]
+    assert r1["customer_ref"] == "R1"
+    assert r1["digikey_part_number"] == "R1K-CT-ND"
+    assert r1["extended_cost"] == 0.5
+    assert r2["extended_cost"] == 2.0
+    assert r2["in_stock"] is False
+    assert cap["unit_price"] == 0.05
+    assert "404" in missing["error"]
+    assert result["summary"] == {
+        "lines": 4, "unique_parts": 3, "resolved": 3, "errors": 1,
+        "out_of_stock": 2, "total_cost": 5.5,
+    }
+
+
+def test_resolve_bom_bounded_concurrency_and_progress():
+    active, peak = 0, 0
+    lock = threading.Lock()
+
+    def slow_details(*args):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        try:
+            return _details(*args)
+        finally:
+            with lock:
+                active -= 1
+
+    progress = []
+
+    async def on_progress(done, total, message):
+        progress.append((done, total))
+
+    async def run():
+        async with Client(mcp) as client:
+            return await client.call_tool(
+                "resolve_bom",
+                {"lines": [{"part_number": f"P{i}", "quantity": 1} for i in range(12)],
+                 "max_concurrency": 3},
+                progress_handler=on_progress,
+            )
+
+    with MockDigiKey(latency=0.05) as server, pointed_at(server):
+        server.route("GET", "/products/v4/search/", slow_details)
+        result = asyncio.run(run())
+
+    assert result.data["summary"]["resolved"] == 12
+    assert peak <= 3
+    assert len(progress) == 12
+    assert progress[-1] == (12, 12)
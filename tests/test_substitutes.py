@@ -0,0 +1,75 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+
+from digikey_mcp_server import find_substitutes_bulk
+from tests.mock_digikey import MockDigiKey, pointed_at
+
+# Candidate -> (stock, unit price at any quantity)
+CANDIDATES = {
+    "CHEAP-ND": (5, 0.01),
+    "STOCKED-ND": (10_000, 0.05),
+    "PRICEY-ND": (10_000, 0.50),
+    "BROKEN-ND": None,
+}
+
+SUBSTITUTES = {
+    "OBSOLETE-A": ["PRICEY-ND", "CHEAP-ND", "STOCKED-ND"],
+    "OBSOLETE-B": ["STOCKED-ND", "BROKEN-ND"],
+}
+
+
+def _handler(path, query, body, headers):
+    part, endpoint = path.split("/")[4:6]
+    if endpoint == "substitutions":
+        if part not in SUBSTITUTES:
+            return 404, {"detail": "not found"}, None
+        return 200, {"ProductSubstitutes": [
+            {"DigiKeyProductNumber": pn, "SubstituteType": "Direct"} for pn in SUBSTITUTES[part]
+        ]}, None
+    if CANDIDATES.get(part) is None:
+        return 500, {"detail": "boom"}, None
+    stock, price = CANDIDATES[part]
+    return 200, {"Product": {
+        "ManufacturerProductNumber": part.removesuffix("-ND"),
+        "QuantityAvailable": stock,
+        "ProductVariations": [
+            {"DigiKeyProductNumber": part, "StandardPricing": [{"BreakQuantity": 1, "UnitPrice": price}]},
+        ],
+    }}, None
+
+
+def test_ranks_alternates_and_memoizes_candidates():
+    lines = [
+        {"part_number": "OBSOLETE-A", "quantity": 100, "customer_ref": "U1"},
+        {"part_number": "OBSOLETE-B", "quantity": 100},
+        {"part_number": "UNKNOWN", "quantity": 1},
+        {"part_number": "OBSOLETE-A", "quantity": 1},
+    ]
+    with MockDigiKey() as server, pointed_at(server):
+        server.route("GET", "/products/v4/search/", _handler)
+        result = asyncio.run(find_substitutes_bulk.fn(lines))
+        # STOCKED-ND is a candidate for both parts but fetched once
+        for pn in ("CHEAP-ND", "STOCKED-ND", "PRICEY-ND"):
+            assert server.count(f"/products/v4/search/{pn}/productdetails") == 1
+
+    a100, b, unknown, a1 = result["lines"]
+    assert a100["customer_ref"] == "U1"
+    # CHEAP-ND has too little stock for 100, so it ranks after the stocked ones
+    assert [alt["digikey_part_number"] for alt in a100["alternates"]] == ["STOCKED-ND", "PRICEY-ND", "CHEAP-ND"]
+    assert a100["alternates"][0]["extended_cost"] == 5.0
+    assert [alt["digikey_part_number"] for alt in a1["alternates"]] == ["CHEAP-ND", "STOCKED-ND", "PRICEY-ND"]
+    # A failed candidate lookup is reported on that alternate only
+    assert b["alternates"][0]["digikey_part_number"] == "STOCKED-ND"
+    assert "error" in b["alternates"][1]
+    assert "error" in unknown
+
+    assert result["summary"] == {
+        "lines": 4,
+        "unique_parts": 3,
+        "candidates_looked_up": 4,
+        "errors": 1,
+        "with_in_stock_alternate": 3,
+    }
@@ -0,0 +1,119 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import threading
+import time
+
+import digikey_mcp_server
+from digikey_auth import TokenManager
+from tests.mock_digikey import FakeClock, MockDigiKey, pointed_at
+
+
+def _counting_fetch(expires_in=1800, delay=0.0):
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        if delay:
+            time.sleep(delay)
+        return {"access_token": f"token-{len(calls)}", "expires_in": expires_in}
+
+    return fetch, calls
+
+
+def test_token_cached_until_expiry():
+    clock = FakeClock()
+    fetch, calls = _counting_fetch(expires_in=1800)
+    tm = TokenManager(fetch, expiry_skew=30, background=False, clock=clock)
+
+    assert tm.get_token() == "token-1"
+    clock.now += 1700
+    assert tm.get_token() == "token-1"
+    clock.now += 100  # within the expiry skew
+    assert tm.get_token() == "token-2"
+    assert len(calls) == 2
+
+
+def test_concurrent_callers_share_one_fetch():
+    fetch, calls = _counting_fetch(delay=0.05)
+    tm = TokenManager(fetch, background=False)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(tm.get_token())) for _ in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert results == ["token-1"] * 10
+
+
+def test_refresh_if_current_refreshes_once():
+    fetch, calls = _counting_fetch()
+    tm = TokenManager(fetch, background=False)
+    stale = tm.get_token()
+    assert tm.refresh_if_current(stale) == "token-2"
+    # A second caller holding the same stale token reuses the new one
+    assert tm.refresh_if_current(stale) == "token-2"
+    assert len(calls) == 2
+
+
+def test_background_refresh_before_expiry():
+    fetch, calls = _counting_fetch(expires_in=0.2)
+    tm = TokenManager(fetch, refresh_margin=0.1, min_refresh_delay=0.05, expiry_skew=0)
+    try:
+        assert tm.get_token() == "token-1"
+        time.sleep(0.3)
+        assert len(calls) >= 2
+        assert tm.token != "token-1"
+    finally:
+        tm.close()
+
+
+def test_short_lived_tokens_do_not_refresh_in_a_loop():
+    # expires_in below the 300 s default margin: refresh at half the lifetime
+    fetch, calls = _counting_fetch(expires_in=120)
+    tm = TokenManager(fetch)
+    try:
+        tm.get_token()
+        assert tm._timer.interval == 60
+        time.sleep(0.2)
+        assert len(calls) == 1
+    finally:
+        tm.close()
+
+    fetch, calls = _counting_fetch(expires_in=0.001)
+    tm = TokenManager(fetch, min_refresh_delay=0.1, expiry_skew=0)
+    try:
+        tm.get_token()
+        time.sleep(0.35)
+        assert 2 <= len(calls) <= 4  # one refresh per min_refresh_delay, not thousands
+    finally:
+        tm.close()
+
+
+def test_401_triggers_single_refresh_and_retry():
+    with MockDigiKey() as server:
+        issued = []
+
+        def token(*_):
+            issued.append(1)
+            return 200, {"access_token": f"t{len(issued)}", "expires_in": 1800}, None
+
+        def media(path, query, body, headers):
+            if headers.get("Authorization") == "Bearer t1":
+                return 401, {"detail": "expired"}, None
+            return 200, {"ok": True}, None
+
+        server.route("POST", "/v1/oauth2/token", token)
+        server.route("GET", "/products/v4/search", media)
+
+        async def calls():
+            # Concurrent 401s with the same stale token share one refresh
+            return await asyncio.gather(*(digikey_mcp_server.get_product_media.fn("X") for _ in range(5)))
+
+        with pointed_at(server):
+            assert asyncio.run(calls()) == [{"ok": True}] * 5
+
+        assert len(issued) == 2
@@ -15,6 +15,27 @@ def test_all_tools_registered():
     # New no-auth tools (registered via import)
     assert "generate_cart_url" in tool_names
     assert "create_mylist_link" in tool_names
+    assert "generate_cart_urls" in tool_names
+    assert "create_mylist_links" in tool_names
     # New order status tools
     assert "list_orders" in tool_names
     assert "get_order_status" in tool_names
+    assert "sync_orders" in tool_names
+    assert "query_orders" in tool_names
+    # Catalog index resolvers
+    assert "resolve_manufacturer" in tool_names
+    assert "resolve_category" in tool_names
+    assert "resolve_part_numbers" in tool_names
+    # Bulk tools
+    assert "resolve_bom" in tool_names
+    assert "find_substitutes_bulk" in tool_names
+    assert "optimize_bom_pricing" in tool_names
+    assert "compare_locales" in tool_names
+    assert "process_bom_file" in tool_names
+    # Server introspection
+    assert "cache_stats" in tool_names
+    assert "metrics_snapshot" in tool_names
+    assert "list_profiles" in tool_names
+    # Watchlist
+    assert "watch_parts" in tool_names
+    assert "watch_changes" in tool_names
@@ -0,0 +1,182 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import json
+import sqlite3
+from unittest.mock import patch
+
+import digikey_mcp_server
+from digikey_watchlist import Watchlist, diff, snapshot
+from tests.mock_digikey import FakeClock, MockDigiKey, pointed_at
+
+
+def _snap(stock, status="Active", prices=None):
+    return {"stock": stock, "status": status, "prices": prices or {"P-CT-ND": {"1": 0.10, "100": 0.05}}}
+
+
+def test_snapshot_from_product_details():
+    details = {"Product": {
+        "QuantityAvailable": 42,
+        "ProductStatus": {"Status": "Active"},
+        "ProductVariations": [{"DigiKeyProductNumber": "P-CT-ND", "StandardPricing": [
+            {"BreakQuantity": 1, "UnitPrice": 0.1}, {"BreakQuantity": 100, "UnitPrice": 0.05},
+        ]}],
+    }}
+    assert snapshot(details) == _snap(42)
+
+
+def test_diff_reports_thresholds_large_moves_status_and_price_breaks():
+    assert diff(_snap(1000), _snap(990)) == []  # small stock move
+    assert diff(_snap(1000), _snap(400))[0] == {"kind": "stock_changed", "old": 1000, "new": 400}
+    assert diff(_snap(600), _snap(450), stock_threshold=500) == [
+        {"kind": "stock_below_threshold", "old": 600, "new": 450, "threshold": 500}
+    ]
+    assert diff(_snap(450), _snap(900), stock_threshold=500)[0]["kind"] == "stock_above_threshold"
+    assert diff(_snap(3), _snap(0))[0]["kind"] == "stock_changed"
+    assert diff(_snap(10), _snap(10, "Obsolete")) == [{"kind": "status_changed", "old": "Active", "new": "Obsolete"}]
+
+    repriced = _snap(10, prices={"P-CT-ND": {"1": 0.10, "100": 0.06, "1000": 0.04}})
+    assert diff(_snap(10), repriced) == [
+        {"kind": "price_changed", "digikey_part_number": "P-CT-ND", "break_quantity": 100, "old": 0.05, "new": 0.06},
+        {"kind": "price_changed", "digikey_part_number": "P-CT-ND", "break_quantity": 1000, "old": None, "new": 0.04},
+    ]
+
+
+def test_store_feed_cursor_due_and_trim():
+    clock = FakeClock()
+    store = Watchlist(max_changes=3, clock=clock)
+    assert store.add("default", "A", stock_threshold=500)
+    assert store.add("default", "B")
+    assert not store.add("default", "A", stock_threshold=100)  # update keeps the entry
+    assert [e["part_number"] for e in store.due(900, 10)] == ["A", "B"]
+
+    assert store.record("default", "A", _snap(1000)) == []  # baseline
+    assert [e["part_number"] for e in store.due(900, 10)] == ["B"]
+    changes = store.record("default", "A", _snap(50))
+    assert [c["kind"] for c in changes] == ["stock_below_threshold"]
+    assert changes[0]["threshold"] == 100
+
+    feed = store.changes()
+    assert [c["id"] for c in feed["changes"]] == [changes[0]["id"]]
+    assert store.changes(since=feed["cursor"]) == {"changes": [], "cursor": feed["cursor"]}
+
+    for stock in (5000, 50, 5000, 50):
+        store.record("default", "A", _snap(stock))
+    assert store.stats()["changes"] == 3
+    assert store.latest_id() == store.changes(limit=10)["changes"][-1]["id"]
+
+    clock.now += 901
+    store.touch("default", "B")
+    assert [e["part_number"] for e in store.due(900, 10)] == ["A"]
+    assert store.remove("default", ["A", "B"]) == 2
+    assert store.count() == 0
+
+
+def _stateful_details(state):
+    def handler(path, query, body, headers):
+        part = path.split("/")[4]
+        return 200, {"Product": {
+            "ManufacturerProductNumber": part,
+            "QuantityAvailable": state["stock"],
+            "ProductStatus": {"Status": "Active"},
+            "ProductVariations": [{"DigiKeyProductNumber": f"{part}-CT-ND", "StandardPricing": [
+                {"BreakQuantity": 1, "UnitPrice": state["price"]},
+            ]}],
+        }}, None
+    return handler
+
+
+def test_watch_tools_report_only_deltas():
+    state = {"stock": 1000, "price": 0.10}
+
+    async def run():
+        watched = await digikey_mcp_server.watch_parts.fn([
+            {"part_number": "LM358", "stock_threshold": 500}, {"part_number": "NE555"},
+        ])
+        unchanged = await digikey_mcp_server.poll_watchlist.fn()
+        state.update(stock=300, price=0.12)
+        polled = await digikey_mcp_server.poll_watchlist.fn(["LM358"])
+        feed = await digikey_mcp_server.watch_changes.fn()
+        later = await digikey_mcp_server.watch_changes.fn(since=feed["cursor"])
+        return watched, unchanged, polled, feed, later
+
+    with MockDigiKey() as server, pointed_at(server):
+        server.route("GET", "/products/v4/search/", _stateful_details(state))
+        watched, unchanged, polled, feed, later = asyncio.run(run())
+        resource = json.loads(digikey_mcp_server.watchlist_changes.fn())
+        requests = server.count("/products/v4/search/")
+
+    assert watched["added"] == ["LM358", "NE555"]
+    assert watched["snapshots"]["LM358"] == {"stock": 1000, "status": "Active"}
+    assert unchanged["changes"] == [] and unchanged["polled"] == 2
+    assert polled["polled"] == 1
+    assert [(c["part_number"], c["kind"]) for c in feed["changes"]] == [
+        ("LM358", "stock_below_threshold"), ("LM358", "price_changed"),
+    ]
+    assert later["changes"] == []
+    assert resource["changes"] == feed["changes"]
+    assert requests == 5  # 2 baselines + 2 + 1 polls; every poll bypasses the cache
+
+
+
+def test_watchlist_failure_does_not_fail_poll():
+    state = {"stock": 1000, "price": 0.10}
+    details = _stateful_details(state)
+
+    def locked(*args):
+        raise sqlite3.OperationalError("database is locked")
+
+    async def run():
+        await digikey_mcp_server.watch_parts.fn([{"part_number": "LM358"}, {"part_number": "MISSING"}])
+        with patch.object(Watchlist, "record", locked), patch.object(Watchlist, "touch", locked):
+            return await digikey_mcp_server.poll_watchlist.fn()
+
+    with MockDigiKey() as server, pointed_at(server):
+        server.route("GET", "/products/v4/search/", lambda path, *args: (
+            (404, {"ErrorMessage": "Not found"}, None) if "MISSING" in path else details(path, *args)
+        ))
+        polled = asyncio.run(run())
+
+    assert polled["polled"] == 2 and polled["changes"] == []
+    assert [e["part_number"] for e in polled["errors"]] == ["MISSING"]
+
+def test_background_poller_spreads_batches():
+    async def run():
+        await digikey_mcp_server._ensure_token()
+        with patch.object(digikey_mcp_server, "WATCH_INTERVAL", 0.4), \
+             patch.object(digikey_mcp_server, "WATCH_BATCH", 1):
+            for part in ("A", "B"):
+                digikey_mcp_server._watchlist.add("default", part)
+            await digikey_mcp_server.watch_changes.fn()  # starts the poller
+            await asyncio.sleep(0.1)
+            first = server.count("/products/v4/search/")
+            await asyncio.sleep(0.2)
+            return first, server.count("/products/v4/search/")
+
+    with MockDigiKey().install_catalog() as server, pointed_at(server):
+        first, second = asyncio.run(run())
+
+    # One part per batch, batches 0.2 s apart (0.4 s interval / 2 batches)
+    assert first == 1
+    assert second == 2
+
+
+def test_poller_resumes_at_startup_for_stored_parts():
+    from fastmcp import Client
+
+    async def run():
+        digikey_mcp_server._watchlist.add("default", "A")
+        async with Client(digikey_mcp_server.mcp):  # runs the server lifespan
+            poller = digikey_mcp_server._watch_poller
+            await asyncio.sleep(0.2)
+        poller.cancel()
+        return poller
+
+    with MockDigiKey().install_catalog() as server, pointed_at(server):
+        poller = asyncio.run(run())
+        polled = server.count("/products/v4/search/")
+
+    assert poller is not None
+    assert polled == 1